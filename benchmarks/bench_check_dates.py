@@ -0,0 +1,66 @@
+"""
+Benchmark for check_dates(), to confirm the time scales linearly with the number of rows in the inventory.
+Optional argument: the largest number of rows to test (default 800000). Results are printed as JSON.
+"""
+import datetime
+import json
+import os
+import pandas as pd
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from hub_audit import check_dates
+
+
+def make_inventory(rows):
+    """Make an inventory dataframe with a typical mix of Review_Date values
+
+    @param
+    rows (int): the number of rows in the inventory
+
+    @return
+    df_inventory (pandas dataframe): inventory with the columns used by check_dates()
+    """
+    review_values = [datetime.datetime(2020, 1, 1), datetime.datetime(2130, 1, 1), 'Permanent', 'permanent',
+                     '6 months', None]
+    review_dates = [review_values[row % len(review_values)] for row in range(rows)]
+    df_inventory = pd.DataFrame({'Share': [f'share_{row % 50}' for row in range(rows)],
+                                 'Folder': [f'folder_{row}' for row in range(rows)],
+                                 'Review_Date': pd.Series(review_dates, dtype=object),
+                                 'Audit_Dates': 'TBD'})
+    return df_inventory
+
+
+def time_check_dates(rows, repeat=3):
+    """Time check_dates() on an inventory with the given number of rows, keeping the fastest of several runs
+
+    @param
+    rows (int): the number of rows in the inventory
+    repeat (int): the number of times to run check_dates()
+
+    @return
+    seconds (float): the fastest time
+    """
+    times = []
+    for _ in range(repeat):
+        df_inventory = make_inventory(rows)
+        start = time.perf_counter()
+        check_dates(df_inventory)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 800000
+
+    # Doubles the number of rows each time. For linear scaling, microseconds per row stays about the same.
+    results = []
+    rows = max(max_rows // 64, 1)
+    while rows <= max_rows:
+        seconds = time_check_dates(rows)
+        results.append({'rows': rows, 'seconds': round(seconds, 4),
+                        'microseconds_per_row': round(seconds / rows * 1000000, 3)})
+        rows *= 2
+    print(json.dumps({'benchmark': 'check_dates', 'results': results}, indent=2))
@@ -0,0 +1,117 @@
+"""
+Benchmark suite for each stage of hub_audit.py, using a synthetic Hub (see synthetic_hub.py).
+Each stage is timed and memory-profiled separately: read_inventory(), make_shares_inventory(),
+check_required(), check_dates(), check_inventory(), audit(), suggest_matches(), and the CSV write.
+Results are printed as JSON (and saved with --output), with the Hub parameters and versions,
+so results from different runs and machines can be compared.
+Optional arguments: the synthetic_hub.py arguments, plus --repeat, --workers, --keep, and --output
+"""
+import argparse
+from functools import partial
+import json
+import os
+import pandas as pd
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from hub_audit import (audit, check_dates, check_inventory, check_required, make_shares_inventory, read_inventory,
+                       suggest_matches, write_csv)
+from synthetic_hub import add_arguments, hub_arguments, make_hub
+
+
+def measure(function, make_input, repeat):
+    """Measure the time and peak memory for one stage, with new input that is made before measuring
+
+    Time is the fastest of several runs without tracemalloc, which slows down allocations,
+    and peak memory is measured in a separate run.
+
+    @param
+    function (function): the stage to measure, which is called with the input
+    make_input (function): makes a tuple with the input for the stage, since stages can change their input
+    repeat (int): the number of runs to time
+
+    @return
+    result (dict): seconds and peak memory in MB, above the memory used by the input
+    """
+    times = []
+    for _ in range(repeat):
+        stage_input = make_input()
+        start = time.perf_counter()
+        function(*stage_input)
+        times.append(time.perf_counter() - start)
+
+    stage_input = make_input()
+    tracemalloc.start()
+    function(*stage_input)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': round(min(times), 4), 'peak_mb': round(peak / 1024 / 1024, 2)}
+
+
+def run_stages(paths, repeat=3, workers=1):
+    """Measure every stage of the audit for one synthetic Hub
+
+    The output of each stage is made once, outside of the measurements, to use as the input to the next stage.
+
+    @param
+    paths (dict): paths from make_hub()
+    repeat (int): the number of runs to time for each stage
+    workers (int): the number of workers for make_shares_inventory()
+
+    @return
+    stages (dict): keys are the stage names and values are the results from measure()
+    """
+    df_info = pd.read_csv(paths['shares_csv'])
+    df_inventory = read_inventory(paths['inventory'])
+    df_shares = make_shares_inventory(df_info, workers=workers)
+    df_checked = audit(df_inventory.copy(), df_shares)
+    csv_path = os.path.join(os.path.dirname(paths['inventory']), 'audit.csv')
+
+    scan = partial(make_shares_inventory, workers=workers)
+    stages = {'read_inventory': measure(read_inventory, lambda: (paths['inventory'],), repeat),
+              'make_shares_inventory': measure(scan, lambda: (df_info,), repeat),
+              'check_required': measure(check_required, lambda: (df_inventory.copy(),), repeat),
+              'check_dates': measure(check_dates, lambda: (df_inventory.copy(),), repeat),
+              'check_inventory': measure(check_inventory, lambda: (df_inventory.copy(), df_shares), repeat),
+              'audit': measure(audit, lambda: (df_inventory.copy(), df_shares), repeat),
+              'suggest_matches': measure(suggest_matches, lambda: (df_checked.copy(),), repeat),
+              'write_csv': measure(write_csv, lambda: (df_checked, csv_path), repeat)}
+    os.remove(csv_path)
+    return stages
+
+
+if __name__ == '__main__':
+
+    arg_parser = argparse.ArgumentParser(description='Benchmark each stage of hub_audit.py with a synthetic Hub')
+    add_arguments(arg_parser)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of runs to time for each stage')
+    arg_parser.add_argument('--workers', type=int, default=1, help='workers for make_shares_inventory()')
+    arg_parser.add_argument('--keep', help='folder to make the Hub in and keep, instead of a temporary folder')
+    arg_parser.add_argument('--output', help='path to save the JSON results')
+    parsed = arg_parser.parse_args()
+
+    # Makes the synthetic Hub, which is deleted after the benchmark unless --keep is used.
+    hub_root = parsed.keep or tempfile.mkdtemp(prefix='synthetic_hub_')
+    try:
+        start_time = time.perf_counter()
+        hub_paths = make_hub(hub_root, **hub_arguments(parsed))
+        results = {'benchmark': 'stages',
+                   'parameters': dict(hub_arguments(parsed), repeat=parsed.repeat, workers=parsed.workers),
+                   'environment': {'python': platform.python_version(), 'pandas': pd.__version__,
+                                   'platform': platform.platform()},
+                   'hub': {'rows': hub_paths['rows'], 'folders': hub_paths['folders'],
+                           'make_seconds': round(time.perf_counter() - start_time, 4)},
+                   'stages': run_stages(hub_paths, parsed.repeat, parsed.workers)}
+    finally:
+        if parsed.keep is None:
+            shutil.rmtree(hub_root)
+
+    print(json.dumps(results, indent=2))
+    if parsed.output:
+        with open(parsed.output, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
@@ -0,0 +1,210 @@
+"""
+Makes a synthetic Digital Production Hub for benchmarks: a folder of shares, the share information CSV,
+and an inventory (Excel spreadsheet) with one sheet per share, like the real inventory.
+The same arguments and seed always make the same Hub, so benchmark results can be compared across runs.
+Required argument: path to the folder to make the Hub in, which should not already exist.
+Optional arguments: --shares, --fan-out, --depth, --files, --patterns, --mismatch-rate, --expired-rate, --seed
+"""
+import argparse
+import datetime
+import openpyxl
+import os
+import random
+
+# Headers for each inventory sheet, with the row that describes each column under the headers.
+INVENTORY_HEADER = ['Share (required)', 'Folder Name (required if not share)', 'Use Policy Category (required)',
+                    'Person Responsible (required)', 'Date to review for deletion (required)',
+                    'Additional information (optional)', 'Deleted (date) (optional)']
+INVENTORY_DESCRIPTION = ['Name of the Hub share.', 'Use the highest-level folder that has the same information.',
+                         'Assign the category at the time of upload to Hub.', 'Who the Hub manager should contact.',
+                         'This is the date for review.', 'Any additional information.',
+                         'If you want a record of everything that has ever been in the share.']
+
+
+def make_tree(path, depth, fan_out, files):
+    """Make the contents of one inventoried folder, which are below the level the audit looks at
+
+    @param
+    path (string): path to the folder, which is made if it does not exist
+    depth (int): the number of levels of subfolders to make
+    fan_out (int): the number of subfolders in each folder
+    files (int): the number of files in each folder
+
+    @return
+    None
+    """
+    os.makedirs(path, exist_ok=True)
+    for number in range(files):
+        with open(os.path.join(path, f'file_{number}.txt'), 'w') as file:
+            file.write('synthetic hub file\n')
+    if depth > 0:
+        for number in range(fan_out):
+            make_tree(os.path.join(path, f'sub_{number}'), depth - 1, fan_out, files)
+
+
+def make_share(root, name, pattern, fan_out, depth, files):
+    """Make one share with the given pattern and return its row for the share information CSV and its folders
+
+    Shares with the second pattern have a born-digital folder with backlogged, closed, and other status folders,
+    plus department folders, where half of the department folders are in the folders list.
+
+    @param
+    root (string): path to the folder with all the shares
+    name (string): share name
+    pattern (string): top, share, or second
+    fan_out (int): the number of folders at each level the audit looks at
+    depth (int): the number of levels below each inventoried folder
+    files (int): the number of files in each folder
+
+    @return
+    share_row (list): name, path, pattern, and folders for the share information CSV
+    folders (list): the folders the audit should find in the share, with the same names as make_shares_inventory()
+    """
+    share_path = os.path.join(root, name)
+    os.makedirs(share_path, exist_ok=True)
+    folders = []
+    folders_list = ''
+
+    if pattern == 'share':
+        folders.append(name)
+        make_tree(os.path.join(share_path, 'content'), depth, fan_out, files)
+
+    elif pattern == 'top':
+        for number in range(fan_out):
+            folders.append(f'{name}_folder_{number:04d}')
+            make_tree(os.path.join(share_path, folders[-1]), depth, fan_out, files)
+        with open(os.path.join(share_path, 'Hub Documentation.txt'), 'w') as file:
+            file.write('not part of the inventory\n')
+
+    elif pattern == 'second':
+        departments = [f'dept_{number:02d}' for number in range(max(fan_out // 10, 2))]
+        listed = departments[:len(departments) // 2]
+        folders_list = '|'.join(['born-digital'] + listed)
+        for status in ('backlogged', 'closed'):
+            for number in range(fan_out):
+                folders.append(f'born-digital\\{status}\\collection_{number:04d}')
+                make_tree(os.path.join(share_path, 'born-digital', status, f'collection_{number:04d}'),
+                          depth, fan_out, files)
+        folders.append('born-digital\\processing')
+        make_tree(os.path.join(share_path, 'born-digital', 'processing'), depth, fan_out, files)
+        for department in departments:
+            for number in range(fan_out):
+                make_tree(os.path.join(share_path, department, f'project_{number:04d}'), depth, fan_out, files)
+                if department in listed:
+                    folders.append(f'{department}\\project_{number:04d}')
+            if department not in listed:
+                folders.append(department)
+
+    return [name, share_path, pattern, folders_list], folders
+
+
+def make_inventory(path, share_folders, mismatch_rate, expired_rate, seed):
+    """Make an inventory spreadsheet for the shares, with some folders that do not match and some expired dates
+
+    Each share has its own sheet, plus an Examples sheet, and the sheets are written in write-only mode
+    so a large inventory does not need to be kept in memory.
+
+    @param
+    path (string): path to save the inventory
+    share_folders (dict): keys are share names and values are the folders in that share
+    mismatch_rate (float): the share of folders (0 to 1) that have a different name in the inventory
+    expired_rate (float): the share of rows (0 to 1) with a date to review that is already past
+    seed (int): seed for the random choices, so the same arguments make the same inventory
+
+    @return
+    rows (int): the number of inventory rows, not including headers
+    """
+    choices = random.Random(seed)
+    today = datetime.datetime(2024, 1, 1)
+    rows = 0
+    workbook = openpyxl.Workbook(write_only=True)
+    for share_name, folders in share_folders.items():
+        sheet = workbook.create_sheet(share_name[:31])
+        sheet.append(INVENTORY_HEADER)
+        sheet.append(INVENTORY_DESCRIPTION)
+        for folder in folders:
+            if choices.random() < mismatch_rate:
+                folder = f'{folder}_renamed'
+            value = choices.random()
+            if value < expired_rate:
+                review_date = today - datetime.timedelta(days=choices.randint(1, 3650))
+            elif value < expired_rate + (1 - expired_rate) / 2:
+                review_date = 'Permanent'
+            else:
+                review_date = today.replace(year=2124) + datetime.timedelta(days=choices.randint(1, 3650))
+            sheet.append([share_name, folder, 'Backlog', f'Person {choices.randint(1, 25)}', review_date, None, None])
+            rows += 1
+    sheet = workbook.create_sheet('Examples')
+    sheet.append(INVENTORY_HEADER)
+    sheet.append(['Example', 'Example', 'Backlog', 'E. X. Ample', datetime.datetime(2025, 1, 31), 'Info', None])
+    workbook.save(path)
+    return rows
+
+
+def make_hub(root, shares=10, fan_out=20, depth=1, files=2, patterns=('top', 'share', 'second'),
+             mismatch_rate=0.05, expired_rate=0.1, seed=0):
+    """Make a synthetic Hub, its share information CSV, and its inventory
+
+    @param
+    root (string): path to the folder to make the Hub in
+    shares (int): the number of shares, which use the patterns in turn
+    fan_out (int): the number of folders at each level the audit looks at, and in each level below that
+    depth (int): the number of levels of subfolders below each inventoried folder
+    files (int): the number of files in each folder below an inventoried folder
+    patterns (tuple): share patterns to use
+    mismatch_rate (float): the share of inventory folders (0 to 1) that do not match the share
+    expired_rate (float): the share of inventory rows (0 to 1) with an expired date to review
+    seed (int): seed for the random choices
+
+    @return
+    paths (dict): paths to the "inventory", "shares_csv", and "hub" folder, plus the number of "rows" and "folders"
+    """
+    hub_path = os.path.join(root, 'hub')
+    share_rows = []
+    share_folders = {}
+    for number in range(shares):
+        pattern = patterns[number % len(patterns)]
+        share_row, folders = make_share(hub_path, f'share_{number:03d}_{pattern}', pattern, fan_out, depth, files)
+        share_rows.append(share_row)
+        share_folders[share_row[0]] = folders
+
+    shares_csv = os.path.join(root, 'shares.csv')
+    with open(shares_csv, 'w', newline='') as file:
+        file.write('name,path,pattern,folders\n')
+        for share_row in share_rows:
+            file.write(','.join(share_row) + '\n')
+
+    inventory = os.path.join(root, 'inventory.xlsx')
+    rows = make_inventory(inventory, share_folders, mismatch_rate, expired_rate, seed)
+    return {'hub': hub_path, 'shares_csv': shares_csv, 'inventory': inventory, 'rows': rows,
+            'folders': sum(len(folders) for folders in share_folders.values())}
+
+
+def add_arguments(parser):
+    """Add the arguments for make_hub() to an argument parser, which are shared with the benchmark suite"""
+    parser.add_argument('--shares', type=int, default=10, help='number of shares')
+    parser.add_argument('--fan-out', type=int, default=20, help='number of folders at each level')
+    parser.add_argument('--depth', type=int, default=1, help='levels of subfolders below each inventoried folder')
+    parser.add_argument('--files', type=int, default=2, help='number of files in each folder below the inventory')
+    parser.add_argument('--patterns', default='top,share,second', help='comma-separated share patterns')
+    parser.add_argument('--mismatch-rate', type=float, default=0.05, help='share of folders that do not match')
+    parser.add_argument('--expired-rate', type=float, default=0.1, help='share of rows with an expired date')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random choices')
+
+
+def hub_arguments(args):
+    """Get the keyword arguments for make_hub() from the parsed arguments"""
+    return {'shares': args.shares, 'fan_out': args.fan_out, 'depth': args.depth, 'files': args.files,
+            'patterns': tuple(args.patterns.split(',')), 'mismatch_rate': args.mismatch_rate,
+            'expired_rate': args.expired_rate, 'seed': args.seed}
+
+
+if __name__ == '__main__':
+
+    arg_parser = argparse.ArgumentParser(description='Make a synthetic Digital Production Hub for benchmarks')
+    arg_parser.add_argument('root', help='folder to make the Hub in')
+    add_arguments(arg_parser)
+    parsed = arg_parser.parse_args()
+    if os.path.exists(parsed.root):
+        arg_parser.error(f'Provided folder "{parsed.root}" already exists')
+    print(make_hub(parsed.root, **hub_arguments(parsed)))
@@ -2,11 +2,507 @@
 Experiment into automating the majority of the analysis for the Digital Production Hub audit.
 Required arguments: paths to the Digital Production Hub Inventory (Excel spreadsheet) and a CSV with share information.
 """
+from collections import ChainMap, Counter
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from contextlib import closing, contextmanager
+import csv
+import ctypes
 import datetime
-import numpy as np
+import fnmatch
+from functools import partial
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import ntpath
 import os
-import pandas as pd
+import queue
+import re
+import shutil
+import sqlite3
+from stat import S_ISDIR
+import struct
 import sys
+import threading
+import time
+from types import SimpleNamespace
+import unicodedata
+
+
+def import_dependencies():
+    """Import pandas, numpy, openpyxl, pyarrow, and asyncio, which take most of the time to start the script
+
+    When the script is run, they are imported in the main block after the arguments and shares are checked,
+    so a problem is reported without waiting for them. When this module is imported, they are imported right away.
+    pyarrow is optional and only used for the inventory cache and Parquet output, so pa is None if it is not installed.
+
+    @return
+    None
+    """
+    global asyncio, np, openpyxl, pa, pd
+    import asyncio
+    import numpy as np
+    import openpyxl
+    import openpyxl.cell
+    import openpyxl.styles
+    import pandas as pd
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        pa = None
+
+
+if __name__ != '__main__':
+    import_dependencies()
+
+# resource is only on Linux and macOS and is used for the peak memory with --profile (see peak_rss()).
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# inotify events (from sys/inotify.h) used by ShareWatcher: something in the directory was added, removed, or renamed,
+# or the directory itself was removed or renamed. Also, a watch was removed, or events were lost because too many
+# happened before they were read.
+INOTIFY_CHANGES = 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+INOTIFY_IGNORED = 0x8000
+INOTIFY_OVERFLOW = 0x4000
+
+# Seconds between checking every watched directory with a stat in watch mode (see ShareWatcher),
+# which finds changes that inotify does not, like changes made by another computer to a network share.
+WATCH_POLL_SECONDS = 60
+
+# Seconds to wait for every share path to respond when checking the shares before the audit (see check_shares()).
+SHARE_CHECK_TIMEOUT = 10
+
+# Included in inventory cache file names, so files made by an earlier version of read_inventory() are not used.
+INVENTORY_CACHE_VERSION = 2
+
+# Output formats for the audit results (see write_outputs()), with the file extension for each.
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'xlsx': '.xlsx'}
+
+# Items in the shares that are always ignored (see IgnoreRules), as (share, action, items, pattern) like a rules CSV:
+# Mac and Windows system files and Hub documentation files at the top of a share.
+DEFAULT_IGNORE_RULES = [('', 'ignore', 'file', '.DS_Store'), ('', 'ignore', 'file', 'Thumbs.db'),
+                        ('', 'ignore', 'file', '*Hub*')]
+
+# Columns the audit results can be split by (see write_split()), with the name of the folder for each.
+SPLIT_COLUMNS = {'responsible': 'Responsible', 'share': 'Share'}
+
+# Names Windows reserves for devices, which cannot be used as file names even with an extension (see write_split()).
+WINDOWS_RESERVED_NAMES = {'CON', 'PRN', 'AUX', 'NUL', *(f'COM{number}' for number in range(1, 10)),
+                          *(f'LPT{number}' for number in range(1, 10))}
+
+# Fill colors for Audit cells in the XLSX output that are not Correct, by the value of the cell.
+# Values that are not listed use the default color.
+AUDIT_FILLS = {'Expired': 'FFC7CE', 'Missing': 'FFC7CE', 'Not in share': 'FFC7CE', 'Not in inventory': 'FFC7CE',
+               'Review': 'FFEB9C', 'Scan incomplete': 'FFEB9C', 'default': 'FFEB9C'}
+
+# Questions that can be answered with the query subcommand (see query_history()),
+# with the SQL query and the names of the arguments for the query.
+HISTORY_QUERIES = {
+    # Folders that are Not in inventory or Not in share in the latest run, with the first run in a row with that result.
+    # The last run with a different result is found once for each folder, with the index on Share, Folder,
+    # Audit_Inventory, and run_id, and only the later runs with the same result are counted.
+    'mismatches': ("""WITH current AS (SELECT Share, Folder, Audit_Inventory FROM results
+                                    WHERE run_id = (SELECT MAX(run_id) FROM runs)
+                                      AND Audit_Inventory IN ('Not in inventory', 'Not in share')),
+                           changed AS (SELECT Share, Folder, Audit_Inventory,
+                                              COALESCE((SELECT MAX(other.run_id) FROM results AS other
+                                                        WHERE other.Share = current.Share
+                                                          AND other.Folder = current.Folder
+                                                          AND other.Audit_Inventory != current.Audit_Inventory), 0)
+                                              AS run_id
+                                       FROM current)
+                      SELECT changed.Share, changed.Folder, changed.Audit_Inventory, MIN(runs.run_date) AS since,
+                      COUNT(*) AS runs
+                      FROM changed
+                      JOIN results AS past ON past.Share = changed.Share AND past.Folder = changed.Folder
+                                           AND past.Audit_Inventory = changed.Audit_Inventory
+                                           AND past.run_id > changed.run_id
+                      JOIN runs ON runs.run_id = past.run_id
+                      GROUP BY changed.Share, changed.Folder, changed.Audit_Inventory
+                      ORDER BY since, changed.Share, changed.Folder""", []),
+    # Folders that were expired in more than one run, for each person responsible.
+    'expired': ("""SELECT Responsible, Share, Folder, COUNT(*) AS runs, MIN(run_date) AS first_expired,
+                   MAX(run_date) AS last_expired
+                   FROM results JOIN runs USING (run_id)
+                   WHERE Audit_Dates = 'Expired'
+                   GROUP BY Responsible, Share, Folder HAVING COUNT(*) > 1
+                   ORDER BY Responsible, runs DESC, Share, Folder""", []),
+    # Every result for one folder.
+    'folder': ("""SELECT run_date, Share, Folder, Responsible, Review_Date, Audit_Dates, Audit_Inventory, Audit_Required
+                  FROM results JOIN runs USING (run_id)
+                  WHERE Share = ? AND Folder = ?
+                  ORDER BY run_id""", ['share', 'folder']),
+    # Every folder for one person responsible in the latest run that is not correct.
+    'responsible': ("""SELECT Share, Folder, Review_Date, Audit_Dates, Audit_Inventory, Audit_Required
+                       FROM results
+                       WHERE run_id = (SELECT MAX(run_id) FROM runs) AND Responsible = ?
+                         AND (Audit_Dates != 'Correct' OR Audit_Inventory != 'Correct' OR Audit_Required != 'Correct')
+                       ORDER BY Share, Folder""", ['responsible'])}
+
+# Tables and indexes in the audit history (see save_history()), which are added to a history that does not have them
+# when it is saved or queried. The index on Share, Folder, Audit_Inventory, and run_id answers mismatches
+# from the index alone.
+HISTORY_SCHEMA = ['CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY, run_date TEXT)',
+                  'CREATE TABLE IF NOT EXISTS results (run_id INTEGER, Share TEXT, Folder TEXT, Responsible TEXT, '
+                  'Review_Date TEXT, Audit_Dates TEXT, Audit_Inventory TEXT, Audit_Required TEXT)',
+                  *(f'CREATE INDEX IF NOT EXISTS results_{columns.replace(", ", "_")} ON results ({columns})'
+                    for columns in ('run_id', 'Share, Folder, Audit_Inventory, run_id', 'Responsible', 'Audit_Dates',
+                                    'Audit_Inventory', 'Audit_Required'))]
+
+# Values for each Audit column, in the order of their category codes. TBD is the value before the audit.
+AUDIT_VALUES = {'Audit_Dates': ['TBD', 'Correct', 'Expired', 'Review'],
+                'Audit_Inventory': ['TBD', 'Correct', 'Not in share', 'Scan incomplete', 'Not in inventory'],
+                'Audit_Required': ['TBD', 'Correct', 'Missing']}
+
+
+class AuditResult:
+    """Results from run_audit(), which are None or empty for anything that was not done
+
+    @param
+    inventory (pandas dataframe, None): the inventory with the audit columns, which is None with the shard option
+    inventory_rows (int): the number of rows in the inventory after cleanup, before rows for folders only in the shares
+    shares (pandas dataframe, None): the contents of the shares, from make_shares_inventory()
+    share_information (pandas dataframe, None): data from the shares information csv, if it was used
+    incomplete (list): names of the shares that were not completely read
+    duplicates (dict): keys (share and folder) in the inventory or the shares more than once (see check_inventory())
+    changes (pandas dataframe, None): rows that changed since the previous audit (see compare_audits())
+    paths (list): paths to the files saved by write_outputs()
+    cache (dict, None): the scan cache, with the contents of every directory read, or None if no scan cache is used
+    errors (list): list with error messages, which is empty if there are no errors
+    """
+
+    def __init__(self):
+        self.inventory = None
+        self.inventory_rows = 0
+        self.shares = None
+        self.share_information = None
+        self.incomplete = []
+        self.duplicates = {'inventory': [], 'shares': []}
+        self.changes = None
+        self.paths = []
+        self.cache = None
+        self.errors = []
+
+
+class DaemonThreadExecutor(Executor):
+    """Executor that runs each call in a new daemon thread
+
+    Used for reading directories with a timeout: unlike ThreadPoolExecutor, which waits for its threads when
+    the script ends, a directory read that never returns does not keep the script open after the audit is saved.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as error:
+                future.set_exception(error)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+
+class IgnoreRules:
+    """Rules for items in the shares to ignore, which are never included in the share inventory or read
+
+    Each rule is (share, action, items, pattern): the share name, or blank for every share; ignore or include,
+    where include keeps an item that matches an ignore rule; file, folder, or blank for both; and a glob pattern,
+    or re: and a regular expression, which is matched against the name of each item.
+    The glob patterns are compiled once into one regular expression for each share, action, and type of item.
+    Each regular expression is compiled on its own, since flags like (?i) and numbered backreferences
+    only work at the start of their own expression.
+
+    @param
+    rules (list): (share, action, items, pattern) tuples, from DEFAULT_IGNORE_RULES and read_ignore_rules()
+    """
+
+    def __init__(self, rules):
+        self.matchers = {}
+        for share_name in {''} | {rule[0] for rule in rules}:
+            share_rules = [rule for rule in rules if rule[0] in ('', share_name)]
+            matchers = {}
+            for is_dir, item_type in ((False, 'file'), (True, 'folder')):
+                for action in ('ignore', 'include'):
+                    patterns = [pattern for _, rule_action, items, pattern in share_rules
+                                if rule_action == action and items in ('', item_type)]
+                    globs = [self.compile_pattern(pattern).pattern for pattern in patterns
+                             if not pattern.startswith('re:')]
+                    compiled = [re.compile('|'.join(f'(?:{glob})' for glob in globs))] if globs else []
+                    compiled.extend(self.compile_pattern(pattern) for pattern in patterns if pattern.startswith('re:'))
+                    matchers[(is_dir, action)] = compiled
+            self.matchers[share_name] = matchers
+
+    @staticmethod
+    def compile_pattern(pattern):
+        """Compile the pattern from one rule, which read_ignore_rules() also uses to check the pattern is valid
+
+        @param
+        pattern (string): glob pattern, or re: and a regular expression
+
+        @return
+        regex (re.Pattern): the compiled pattern, which raises re.error if the pattern is not valid
+        """
+        if pattern.startswith('re:'):
+            return re.compile(pattern[3:])
+        return re.compile('\\A' + fnmatch.translate(pattern))
+
+    def filter(self, share_name, entries):
+        """Remove the items that are ignored from the contents of a directory
+
+        @param
+        share_name (string): name of the share the directory is in
+        entries (list): list of (name, is_dir) from list_directory()
+
+        @return
+        entries (list): list of (name, is_dir) that are not ignored, in the same order
+        """
+        matchers = self.matchers.get(share_name, self.matchers[''])
+        kept = []
+        for name, is_dir in entries:
+            if any(matcher.search(name) for matcher in matchers[(is_dir, 'ignore')]):
+                if not any(matcher.search(name) for matcher in matchers[(is_dir, 'include')]):
+                    continue
+            kept.append((name, is_dir))
+        return kept
+
+
+class ShareWatcher:
+    """Keep the scan cache current in watch mode, so the shares can be audited again without reading them
+
+    On Linux, every directory in the cache is watched with inotify, and a directory is removed from the cache as soon
+    as something in it is added, removed, or renamed, so only that directory is read by the next audit.
+    inotify does not see changes made by another computer to a network share, so every directory is also checked
+    with a stat every poll_seconds, the same way list_directory() checks the scan cache.
+    Where inotify is not available, that is the only check.
+
+    @param
+    cache (dict): scan cache used by make_shares_inventory(), which is updated as the directories change
+    poll_seconds (int): seconds between checking every directory with a stat
+    use_inotify (bool): False to only check with a stat
+    """
+
+    def __init__(self, cache, poll_seconds=WATCH_POLL_SECONDS, use_inotify=True):
+        self.cache = cache
+        self.poll_seconds = poll_seconds
+        self.last_poll = time.monotonic()
+        self.libc = None
+        self.inotify = None
+        self.watches = {}
+        self.watched = set()
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            except (AttributeError, OSError):
+                descriptor = -1
+            if descriptor >= 0:
+                self.libc = libc
+                self.inotify = descriptor
+        self.watch_new()
+
+    def close(self):
+        """Stop watching every directory"""
+        if self.inotify is not None:
+            os.close(self.inotify)
+            self.inotify = None
+
+    def poll(self):
+        """Check every directory in the cache with a stat and remove the ones that changed or are gone
+
+        @return
+        changed (list): paths of the directories removed from the cache
+        """
+        changed = []
+        for path, cached in list(self.cache.items()):
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime_ns == cached[0] and stat.st_ino == cached[1]:
+                    continue
+            except OSError:
+                pass
+            del self.cache[path]
+            changed.append(path)
+        self.last_poll = time.monotonic()
+        return changed
+
+    def update(self):
+        """Remove the directories that changed from the cache and start watching directories added to the cache
+
+        Reads every inotify event that is waiting, and checks every directory with a stat if it has been poll_seconds
+        since the last check, or if inotify events were lost.
+
+        @return
+        changed (list): paths of the directories removed from the cache
+        """
+        changed = []
+        overflow = False
+        while self.inotify is not None:
+            try:
+                data = os.read(self.inotify, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                descriptor, mask, _, name_length = struct.unpack_from('iIII', data, offset)
+                offset += struct.calcsize('iIII') + name_length
+                overflow = overflow or bool(mask & INOTIFY_OVERFLOW)
+                paths = self.watches.get(descriptor, [])
+                for path in paths:
+                    if self.cache.pop(path, None) is not None:
+                        changed.append(path)
+                if mask & INOTIFY_IGNORED:
+                    self.watched.difference_update(self.watches.pop(descriptor, []))
+
+        if overflow or time.monotonic() - self.last_poll >= self.poll_seconds:
+            changed.extend(self.poll())
+        self.watch_new()
+        return changed
+
+    def watch_new(self):
+        """Start watching the directories in the cache that are not watched yet
+
+        A directory that cannot be watched, for example if there are too many watches, is only checked with a stat.
+        After the watch starts, the directory is checked with a stat once, in case it changed after it was read.
+
+        @return
+        None
+        """
+        if self.inotify is None:
+            return
+        for path in [path for path in self.cache if path not in self.watched]:
+            self.watched.add(path)
+            descriptor = self.libc.inotify_add_watch(self.inotify, os.fsencode(path), INOTIFY_CHANGES)
+            if descriptor < 0:
+                continue
+            self.watches.setdefault(descriptor, []).append(path)
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime_ns == self.cache[path][0] and stat.st_ino == self.cache[path][1]:
+                    continue
+            except OSError:
+                pass
+            del self.cache[path]
+
+
+def add_metrics(df_inventory, df_info, workers=1, cache=None):
+    """Add the size, number of files, and newest modification time of each folder found in the shares
+
+    Each folder is walked to full depth (see folder_metrics()), with several folders walked at the same time
+    if there is more than one worker. Rows that are not in the shares, or that cannot be read, are left blank.
+    Expired rows are flagged if anything in the folder was modified after the date to review for deletion,
+    which means the folder is still being used.
+
+    @param
+    df_inventory (pandas dataframe): data from inventory after audit() or check_inventory()
+    df_info (pandas dataframe): data from the shares information csv, for the path to each share
+    workers (int): the number of folders to walk at the same time
+    cache (dict, None): metrics cache from read_metrics_cache(), to reuse the contents of unchanged directories
+
+    @return
+    df_inventory (pandas dataframe): data from inventory with Size_Bytes, File_Count, Last_Modified,
+    and Modified_After_Review columns
+    """
+    # Finds the path to every folder that is in the shares.
+    # The folder is the share itself for shares with the share pattern.
+    share_info = {share.name: share for share in df_info.itertuples()}
+    in_share = df_inventory['Audit_Inventory'].isin(['Correct', 'Not in inventory'])
+    paths = {}
+    for row, share_name, folder in zip(df_inventory.index[in_share], df_inventory.loc[in_share, 'Share'],
+                                       df_inventory.loc[in_share, 'Folder']):
+        share = share_info.get(share_name)
+        if share is None:
+            continue
+        paths[row] = share.path if share.pattern == 'share' else os.path.join(share.path, *str(folder).split('\\'))
+
+    def walk(path):
+        try:
+            return folder_metrics(path, cache)
+        except OSError:
+            return None
+
+    # Walks the folders, with the totals for each folder in the same order as paths.
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        map_function = executor.map if workers > 1 else map
+        results = list(map_function(walk, paths.values()))
+
+    # Adds the metrics columns, which are blank for rows that were not walked.
+    rows = [row for row, result in zip(paths, results) if result is not None]
+    totals = [result for result in results if result is not None]
+    df_inventory['Size_Bytes'] = pd.Series([total[0] for total in totals], index=rows, dtype='Int64')
+    df_inventory['File_Count'] = pd.Series([total[1] for total in totals], index=rows, dtype='Int64')
+    df_inventory['Last_Modified'] = pd.Series([datetime.datetime.fromtimestamp(total[2] / 1e9) for total in totals],
+                                              index=rows, dtype='datetime64[us]')
+
+    # Flags expired folders that were modified after the date to review for deletion.
+    # The flag is the nullable boolean type, so it is blank for other rows and stays a boolean in Parquet.
+    review_date = pd.to_datetime(df_inventory['Review_Date'].where(df_inventory['Audit_Dates'] == 'Expired'),
+                                 errors='coerce')
+    modified = (df_inventory['Last_Modified'] > review_date).astype('boolean')
+    df_inventory['Modified_After_Review'] = modified.where(review_date.notna())
+
+    return df_inventory
+
+
+def add_rows(df_inventory, df_new):
+    """Add rows to the end of the inventory, keeping the columns that are categorical as categorical
+
+    The categories of each categorical column are combined first, since pandas changes a column to text
+    when dataframes with different categories are combined. Combined categories are sorted,
+    so sorting by the category codes is the same as sorting by the text.
+
+    @param
+    df_inventory (pandas dataframe): data from the inventory
+    df_new (pandas dataframe): rows to add, which may only have some of the inventory columns
+
+    @return
+    df_inventory (pandas dataframe): data from the inventory with the new rows
+    """
+    df_new = df_new.copy()
+    for column in df_new.columns:
+        if column not in df_inventory.columns or not isinstance(df_inventory[column].dtype, pd.CategoricalDtype):
+            continue
+        categories = df_inventory[column].cat.categories
+        if column not in AUDIT_VALUES:
+            categories = categories.union(df_new[column].dropna().unique())
+            df_inventory[column] = df_inventory[column].cat.set_categories(categories)
+        df_new[column] = pd.Categorical(df_new[column], categories=categories)
+    df_inventory = pd.concat([df_inventory, df_new], ignore_index=True)
+    return df_inventory
+
+
+def audit(df_inventory, df_shares, incomplete_shares=(), duplicates=None):
+    """Find blank required cells, dates to review, and inventory/share mismatches
+
+    Runs check_required(), check_dates(), and check_inventory() in that order, which is the audit step
+    of the script and run_audit().
+
+    @param
+    df_inventory (pandas dataframe): data from the inventory after cleanup
+    df_shares (pandas dataframe): contents of all shares
+    incomplete_shares (list): names of shares that were not completely read, so folders not found in the share
+                              are "Scan incomplete" instead of "Not in share"
+    duplicates (dict, None): if a dictionary is provided, it is updated with lists of the (Share, Folder) keys
+                             that are in the inventory ("inventory") or the shares ("shares") more than once
+
+    @return
+    df_inventory (pandas dataframe): data from inventory with updated Audit columns,
+    plus rows for folders that are in the share but not the inventory
+    """
+    # Runs each check, so Audit_Required and Audit_Dates are set before the rows for new folders are added.
+    df_inventory = check_required(df_inventory)
+    df_inventory = check_dates(df_inventory)
+    df_inventory = check_inventory(df_inventory, df_shares, incomplete_shares, duplicates)
+    return df_inventory
 
 
 def check_arguments(arg_list):
@@ -47,33 +543,63 @@ def check_arguments(arg_list):
     return inventory, share_info, errors
 
 
+def check_query_arguments(arg_list):
+    """Check if the arguments for the query subcommand are present and valid
+
+    The arguments are query, the path to the audit history, the question, and any arguments for the question.
+
+    @param
+    arg_list (list): the contents of sys.argv after the script is run
+
+    @return
+    history (string, None): path to the audit history, or None if error
+    question (string, None): the name of the question from HISTORY_QUERIES, or None if error
+    query_args (list): the arguments for the question
+    errors (list): list with error messages, which is empty if there are no errors
+    """
+    history = None
+    question = None
+    query_args = arg_list[4:]
+    errors = []
+
+    if len(arg_list) < 4:
+        errors.append('Missing arguments for query, which needs the audit history and question')
+        return history, question, query_args, errors
+    if os.path.exists(arg_list[2]):
+        history = arg_list[2]
+    else:
+        errors.append(f'Provided audit history "{arg_list[2]}" does not exist')
+    if arg_list[3] not in HISTORY_QUERIES:
+        errors.append(f'Unknown question "{arg_list[3]}", which should be one of: {", ".join(HISTORY_QUERIES)}')
+    elif len(query_args) != len(HISTORY_QUERIES[arg_list[3]][1]):
+        names = ' '.join(HISTORY_QUERIES[arg_list[3]][1]) or 'no arguments'
+        errors.append(f'Question "{arg_list[3]}" needs {names}')
+    else:
+        question = arg_list[3]
+
+    return history, question, query_args, errors
+
+
 def check_dates(df_inventory):
     """Find dates to review for deletion that are expired or need manual review
 
     A date needs manual review if it is text (e.g., 6 months) instead of a specific day,
     but not if it is "Permanent" or "permanent".
 
+    Each row is classified in one vectorized pass over the Review_Date column
+    and Audit_Dates is updated in place, without changing the order of the rows.
+
     @param
     df_inventory (pandas dataframe): data from the inventory
 
     @return
     df_inventory (pandas dataframe): data from inventory with updated Audit_Dates column
     """
-    # For the portion of the dataframe where the date is a day,
-    # updates Audit_Result if the date is earlier than today.
-    df_date = df_inventory[(df_inventory['Review_Date'].apply(type) == datetime.datetime) | (df_inventory['Review_Date'].apply(type) == pd.Timestamp)].copy()
-    today = datetime.datetime.today()
-    df_date.loc[df_date['Review_Date'] < today, 'Audit_Dates'] = 'Expired'
-
-    # For the portion of the dataframe where the date is not a day (not datetime),
-    # updates Audit_Result if it isn't 'permanent' (case-insensitive).
-    df_nondate = df_inventory[(df_inventory['Review_Date'].apply(type) != datetime.datetime) & (df_inventory['Review_Date'].apply(type) != pd.Timestamp)].copy()
-    if len(df_nondate.index) > 0:
-        df_nondate.loc[df_nondate['Review_Date'].str.lower() != 'permanent', 'Audit_Dates'] = 'Review'
-
-    # Recombines the dataframes with the updated Audit_Result column.
-    df_inventory = pd.concat([df_date, df_nondate])
-    df_inventory = df_inventory.sort_values(['Share', 'Folder'])
+    # Updates Audit_Dates if the date is a day earlier than today,
+    # or if the date is not a day and isn't 'permanent' (case-insensitive), including blanks.
+    is_expired, is_review = date_masks(df_inventory['Review_Date'])
+    df_inventory.loc[is_expired, 'Audit_Dates'] = 'Expired'
+    df_inventory.loc[is_review, 'Audit_Dates'] = 'Review'
 
     # Updates the value of any cells that are still 'TBD' (have no errors) with "Correct".
     df_inventory.loc[df_inventory['Audit_Dates'] == 'TBD', 'Audit_Dates'] = 'Correct'
@@ -81,12 +607,19 @@ def check_dates(df_inventory):
     return df_inventory
 
 
-def check_inventory(df_inventory, df_shares):
+def check_inventory(df_inventory, df_shares, incomplete_shares=(), duplicates=None):
     """Find folders in the share but not the inventory or in the inventory but not the share
 
+    Rows are matched with a hash index of the (Share, Folder) keys from each dataframe (see match_keys()),
+    so only the keys are compared instead of merging every column.
+
     @param
     df_inventory (pandas dataframe): data from the inventory after cleanup
     df_shares (pandas dataframe): contents of all shares
+    incomplete_shares (list): names of shares that were not completely read, so folders not found in the share
+                              are "Scan incomplete" instead of "Not in share"
+    duplicates (dict, None): if a dictionary is provided, it is updated with lists of the (Share, Folder) keys
+                             that are in the inventory ("inventory") or the shares ("shares") more than once
 
     @return
     df_inventory (pandas dataframe): data from inventory updated with inventory match error
@@ -94,29 +627,111 @@ def check_inventory(df_inventory, df_shares):
     Folders are added to the dataframe if they are in the share but not the inventory
     """
 
-    # Aligns with the original inventory dataframe with the shares dataframe.
-    # Both the share and folder name need to be the same for a row to match in both dataframes.
-    # indicator=True adds a new column, "_merge", which shows if the row was in one or both dataframes.
-    df_inventory = df_inventory.merge(df_shares, on=['Share', 'Folder'], how='outer', indicator=True)
-
-    # TODO: temp fix for error until I find the source
-    df_inventory = df_inventory.drop_duplicates()
+    # Matches the keys (share and folder) in each dataframe.
+    in_share, new_keys = match_keys(df_inventory, df_shares, duplicates)
 
-    # Updates the "Audit_Result" column for rows that are not in both shares.
-    df_inventory.loc[df_inventory['_merge'] == 'left_only', 'Audit_Inventory'] = 'Not in share'
-    df_inventory.loc[df_inventory['_merge'] == 'right_only', 'Audit_Inventory'] = 'Not in inventory'
+    # Updates the "Audit_Inventory" column for rows that are not in the shares.
+    df_inventory.loc[~in_share, 'Audit_Inventory'] = 'Not in share'
+    df_inventory.loc[~in_share & df_inventory['Share'].isin(incomplete_shares), 'Audit_Inventory'] = 'Scan incomplete'
 
     # Updates the value of any cells that are still TBD (have no errors) with "Correct".
     df_inventory.loc[df_inventory['Audit_Inventory'] == 'TBD', 'Audit_Inventory'] = 'Correct'
 
-    # Cleans up and returns the dataframe.
-    # The temporary column '_merge' is removed and the rows are sorted.
-    df_inventory = df_inventory.drop(['_merge'], axis=1)
+    # Adds rows for folders that are in the shares but not the inventory.
+    df_new = new_keys.assign(Audit_Inventory='Not in inventory')
+    df_inventory = add_rows(df_inventory, df_new)
+
+    # Sorts and returns the dataframe.
     df_inventory = df_inventory.sort_values(['Share', 'Folder'])
 
     return df_inventory
 
 
+def check_options(arg_list):
+    """Separate the optional arguments from the required arguments and check if they are valid
+
+    Optional arguments start with "--" and are followed by their value, except for flags which have no value.
+
+    @param
+    arg_list (list): the contents of sys.argv after the script is run
+
+    @return
+    required_list (list): the contents of arg_list without the optional arguments, to use with check_arguments()
+    options (dict): keys are the option names (without "--") and values are the option value or the default
+    errors (list): list with error messages, which is empty if there are no errors
+    """
+
+    # Variables for option validation results, starting with the default value for every option.
+    # Options with a default of False are flags, which are True if present and do not have a value.
+    # Options with a default of 0 or a blank string are not used unless provided.
+    # Options with a string default are paths, which must exist, unless they have choices or are shard.
+    # Options with choices must be one or more of the choices, separated by commas.
+    # Shard is the shard number and number of shards, separated by a slash, like 2/4.
+    required_list = []
+    options = {'cache': False, 'cache_size': 100000, 'format': 'csv', 'interval': 0, 'manifest': '', 'merge': '',
+               'metrics': False, 'no_history': False, 'preflight': False, 'previous': '', 'profile': False,
+               'rescan': False, 'rules': '', 'server_workers': 0, 'shard': '', 'sheets': 'share', 'split': '',
+               'timeout': 0, 'watch': False, 'workers': 1}
+    choices = {'format': list(OUTPUT_FORMATS), 'sheets': ['share', 'responsible'], 'split': list(SPLIT_COLUMNS)}
+    errors = []
+
+    # Tests each optional argument and updates the value in options if it is valid,
+    # and the errors list with each error found.
+    arg_iter = iter(arg_list)
+    for arg in arg_iter:
+        if not arg.startswith('--'):
+            required_list.append(arg)
+            continue
+        name = arg[2:].replace('-', '_')
+        if name not in options:
+            errors.append(f'Unknown optional argument "{arg}"')
+            continue
+        if isinstance(options[name], bool):
+            options[name] = True
+            continue
+        value = next(arg_iter, None)
+        if value is None:
+            errors.append(f'Optional argument "{arg}" is missing a value')
+        elif isinstance(options[name], int):
+            if value.isdigit() and int(value) > 0:
+                options[name] = int(value)
+            else:
+                errors.append(f'Provided {arg[2:]} "{value}" is not a positive number')
+        elif name in choices:
+            if all(choice in choices[name] for choice in value.split(',')):
+                options[name] = value
+            else:
+                errors.append(f'Provided {arg[2:]} "{value}" is not one of {", ".join(choices[name])}')
+        elif name == 'shard':
+            match = re.fullmatch(r'(\d+)/(\d+)', value)
+            if match and 0 < int(match.group(1)) <= int(match.group(2)):
+                options[name] = value
+            else:
+                errors.append(f'Provided shard "{value}" is not a shard number and number of shards, like 2/4')
+        elif os.path.exists(value):
+            options[name] = value
+        else:
+            errors.append(f'Provided {arg[2:]} "{value}" does not exist')
+
+    # Parquet output needs pyarrow, which is optional.
+    if 'parquet' in options['format'].split(',') and importlib.util.find_spec('pyarrow') is None:
+        errors.append('Provided format "parquet" needs pyarrow, which is not installed')
+
+    # A shard only scans, so it cannot also merge the shard listings.
+    if options['shard'] and options['merge']:
+        errors.append('Cannot use both shard and merge')
+
+    # The rules are used by each shard when it reads its shares, since the shard listings only have the folder paths.
+    if options['rules'] and options['merge']:
+        errors.append('Cannot use rules with merge, use rules with shard instead')
+
+    # Watch keeps the shares read by this computer current, so it cannot be used if they are read somewhere else.
+    if options['watch'] and (options['manifest'] or options['merge'] or options['shard']):
+        errors.append('Cannot use watch with manifest, merge, or shard')
+
+    return required_list, options, errors
+
+
 def check_required(df_inventory):
     """Find blank cells in required columns
 
@@ -141,143 +756,1911 @@ def check_required(df_inventory):
     return df_inventory
 
 
-def make_shares_inventory(df_info):
+def check_shares(share_info, check_paths=True, shard=None, timeout=SHARE_CHECK_TIMEOUT, warnings=None):
+    """Check that the share information can be read and every share that is read can be reached, before the audit starts
+
+    Only uses the standard library, so problems are found before pandas is imported.
+    Every share path is opened at the same time, each in its own daemon thread (see DaemonThreadExecutor),
+    so a server that is not responding only delays the check until the timeout,
+    and every share that cannot be reached is reported at once.
+
+    @param
+    share_info (string): path to the share information csv
+    check_paths (bool): False to only read the csv, if the shares are not read on this computer (manifest or merge)
+    shard (tuple, None): the shard number and number of shards, to only check the shares read by this shard
+    timeout (int): seconds to wait for every share path to respond
+    warnings (list, None): if a list is provided, shares that do not respond within the timeout are added to it
+                           instead of the errors, for when the audit uses a timeout and can continue without them
+
+    @return
+    errors (list): list with error messages, which is empty if there are no errors
+    """
+    try:
+        with open(share_info, newline='', encoding='utf-8-sig') as share_file:
+            reader = csv.DictReader(share_file)
+            shares = [SimpleNamespace(**row) for row in reader]
+            columns = reader.fieldnames or []
+    except (OSError, UnicodeDecodeError, csv.Error, TypeError) as error:
+        return [f'Provided share information "{share_info}" cannot be read: {error}']
+    missing = [column for column in ('name', 'path', 'pattern') if column not in columns]
+    if len(missing) > 0:
+        return [f'Provided share information "{share_info}" is missing the column(s) {", ".join(missing)}']
+    if not check_paths:
+        return []
+
+    # Only the shares that would be read are checked. Shares with the share pattern are not read,
+    # and shares with an unexpected pattern are printed as an error during the audit instead.
+    shares = [share for share in shares if share.pattern in ('second', 'top')]
+    if shard is not None:
+        shares = [share for share in shares if share_shard(share, shard[1]) in (0, shard[0])]
+
+    def open_share(path):
+        with os.scandir(path):
+            pass
+
+    executor = DaemonThreadExecutor()
+    checks = {}
+    for share in shares:
+        if share.path not in checks:
+            checks[share.path] = executor.submit(open_share, share.path)
+    wait(checks.values(), timeout=timeout)
+
+    errors = []
+    for share in shares:
+        check = checks[share.path]
+        if not check.done():
+            message = f'Share {share.name} "{share.path}" did not respond within {timeout} seconds'
+            (errors if warnings is None else warnings).append(message)
+        elif check.exception() is not None:
+            reason = getattr(check.exception(), 'strerror', None) or check.exception()
+            errors.append(f'Share {share.name} "{share.path}" cannot be reached: {reason}')
+    return errors
+
+
+def compare_audits(df_previous, df_current):
+    """Find the rows that changed since the previous audit, matched by share and folder
+
+    Rows are changed if the person responsible, date to review, or any Audit column is different,
+    new if they are only in the current audit, and gone if they are only in the previous audit.
+    Values are compared as text, the same as they are saved in the audit CSV.
+    If the same share and folder is in an audit more than once, the first is matched to the first and so on.
+
+    @param
+    df_previous (pandas dataframe): the previous audit CSV, read with every column as text and blanks as ""
+    df_current (pandas dataframe): data from inventory after all the checks
+
+    @return
+    df_changes (pandas dataframe): the current values for the rows that changed or are new, and the previous values
+    for the rows that are gone, with Change_Type, Changed_Columns, and the previous value of each compared column
+    """
+    # Converts the current audit to text by saving it as a CSV and reading it back,
+    # so every value, including dates, is formatted the same as it is in the previous audit CSV.
+    csv_text = io.StringIO()
+    df_current.to_csv(csv_text, index=False)
+    csv_text.seek(0)
+    df_current = pd.read_csv(csv_text, dtype=str, keep_default_na=False)
+
+    # Joins the audits on the share, folder, and which time the share and folder is in the audit.
+    columns = [column for column in ('Responsible', 'Review_Date', 'Audit_Dates', 'Audit_Inventory', 'Audit_Required')
+               if column in df_previous.columns and column in df_current.columns]
+    keys = ['Share', 'Folder', 'Occurrence']
+    df_previous = df_previous.assign(Occurrence=df_previous.groupby(['Share', 'Folder']).cumcount())
+    df_current = df_current.assign(Occurrence=df_current.groupby(['Share', 'Folder']).cumcount())
+    df_joined = df_current.set_index(keys).join(df_previous.set_index(keys), how='outer', rsuffix='_Previous')
+
+    # Finds the type of change for every row and the columns that changed.
+    is_new = ~df_joined.index.isin(df_previous.set_index(keys).index)
+    is_gone = ~df_joined.index.isin(df_current.set_index(keys).index)
+    changed_names = pd.Series('', index=df_joined.index)
+    for column in columns:
+        is_changed = ~is_new & ~is_gone & (df_joined[column] != df_joined[f'{column}_Previous'])
+        changed_names = changed_names.where(~is_changed, changed_names + ', ' + column)
+    df_joined['Change_Type'] = np.select([is_new, is_gone, changed_names != ''], ['New', 'Gone', 'Changed'], '')
+    df_joined['Changed_Columns'] = changed_names.str.removeprefix(', ')
+
+    # Rows that are gone have the previous values.
+    for column in df_current.columns.drop(keys, errors='ignore'):
+        if f'{column}_Previous' in df_joined.columns:
+            df_joined.loc[is_gone, column] = df_joined.loc[is_gone, f'{column}_Previous']
+
+    # Keeps the rows that changed, with the current columns, then the change, then the previous values.
+    df_changes = df_joined[df_joined['Change_Type'] != ''].reset_index()
+    output_columns = ([column for column in df_current.columns if column != 'Occurrence'] +
+                      ['Change_Type', 'Changed_Columns'] + [f'{column}_Previous' for column in columns])
+    df_changes = df_changes[output_columns].fillna('').sort_values(['Share', 'Folder'], kind='stable')
+    return df_changes
+
+
+def date_masks(review_date):
+    """Classify every Review_Date value as expired, needing review, or neither, in one vectorized pass
+
+    @param
+    review_date (pandas series): the Review_Date column from the inventory
+
+    @return
+    is_expired (pandas series): True if the date is a day earlier than today
+    is_review (pandas series): True if the date is not a day and isn't 'permanent' (case-insensitive), including blanks
+    """
+    # Separates the Review_Date values into text (lower case, to compare to permanent) and days.
+    # Numbers are neither, so they are not read as a day counted from 1970.
+    if pd.api.types.is_datetime64_any_dtype(review_date):
+        text = pd.Series(np.nan, index=review_date.index, dtype=object)
+        dates = review_date
+    elif review_date.dtype == object or pd.api.types.is_string_dtype(review_date):
+        text = review_date.str.lower()
+        not_text = review_date.where(text.isna())
+        is_number = pd.to_numeric(not_text, errors='coerce').notna()
+        dates = pd.to_datetime(not_text.where(~is_number), errors='coerce')
+    else:
+        text = pd.Series(np.nan, index=review_date.index, dtype=object)
+        dates = pd.Series(pd.NaT, index=review_date.index)
+    is_date = dates.notna()
+
+    is_expired = is_date & (dates < datetime.datetime.today())
+    is_review = ~is_date & (text != 'permanent')
+    return is_expired, is_review
+
+
+def find_inventory_cache(path, cache_dir):
+    """Find the inventory cache file for the current version of the inventory
+
+    Cache files are named with the inventory size, modification time, and SHA-256 hash of its contents.
+    If the size and modification time match a cache file, it is used without reading the inventory.
+    Otherwise, the hash is calculated so an unchanged inventory that was downloaded again can still use the cache.
+
+    @param
+    path (string): path to the inventory
+    cache_dir (string): path to the folder for the inventory cache, which is made if it does not exist
+
+    @return
+    cache_path (string): path to the cache file for this version of the inventory
+    cache_hit (bool): True if the cache file already exists
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(path)
+    prefix = f'inventory_v{INVENTORY_CACHE_VERSION}_{stat.st_size}_{stat.st_mtime_ns}_'
+    cache_files = [name for name in os.listdir(cache_dir) if name.endswith('.arrow')]
+
+    # Fast check: the inventory has the same size and modification time as a cached version.
+    for name in cache_files:
+        if name.startswith(prefix):
+            return os.path.join(cache_dir, name), True
+
+    # Hashes the inventory contents and renames a cached version with the same contents to the new modification time.
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as inventory:
+        for block in iter(partial(inventory.read, 1024 * 1024), b''):
+            sha256.update(block)
+    cache_path = os.path.join(cache_dir, f'{prefix}{sha256.hexdigest()}.arrow')
+    for name in cache_files:
+        if name.startswith(f'inventory_v{INVENTORY_CACHE_VERSION}_') and name.endswith(f'_{sha256.hexdigest()}.arrow'):
+            os.replace(os.path.join(cache_dir, name), cache_path)
+            return cache_path, True
+    return cache_path, False
+
+
+def folder_metrics(path, cache=None):
+    """Find the total size, number of files, and newest modification time for a folder, to full depth
+
+    Every directory and file is stat-ed, and if a metrics cache is provided, the names of the files and subfolders
+    directly in a directory are reused if its modification time and inode have not changed,
+    so only changed directories are read again. The files are always stat-ed, since changing a file without adding,
+    removing, or renaming anything does not change the directory modification time.
+    Symbolic links are counted as files and are not followed.
+
+    @param
+    path (string): path to the folder, or to a file, which is counted by itself
+    cache (dict, None): metrics cache from read_metrics_cache(), which is updated with each directory read
+
+    @return
+    size (int): total size of the files, in bytes
+    file_count (int): the number of files
+    newest (int): the newest modification time of the folder, its files, and its subfolders, in nanoseconds
+    """
+    stat = os.stat(path)
+    if not S_ISDIR(stat.st_mode):
+        return stat.st_size, 1, stat.st_mtime_ns
+
+    size = 0
+    file_count = 0
+    newest = 0
+    directories = [(path, stat)]
+    while directories:
+        directory, stat = directories.pop()
+        newest = max(newest, stat.st_mtime_ns)
+
+        # Reads the directory, unless the cache has its contents and it has not changed since they were cached.
+        # A directory that was removed since its parent was read is skipped.
+        cached = None if cache is None else cache.get(directory)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_ino:
+            cached[2] = time.time()
+            files, subdirectories = cached[3:]
+        else:
+            files, subdirectories = [], []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.name)
+                        else:
+                            files.append(entry.name)
+            except FileNotFoundError:
+                continue
+            if cache is not None:
+                cache[directory] = [stat.st_mtime_ns, stat.st_ino, time.time(), files, subdirectories]
+
+        # Adds the current size and modification time of each file, and the subfolders to read next.
+        # A file or subfolder that was removed since the directory was read is skipped.
+        for name in files:
+            try:
+                file_stat = os.stat(os.path.join(directory, name), follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            size += file_stat.st_size
+            file_count += 1
+            newest = max(newest, file_stat.st_mtime_ns)
+        for name in subdirectories:
+            subdirectory = os.path.join(directory, name)
+            try:
+                directories.append((subdirectory, os.stat(subdirectory, follow_symlinks=False)))
+            except FileNotFoundError:
+                continue
+
+    return size, file_count, newest
+
+
+def key_codes(left, right):
+    """Make category codes for two columns that use the same categories, to compare the columns as numbers
+
+    Categorical columns use their existing codes, so only the categories are compared.
+    Other columns are made categorical first. Blanks have the code -1.
+
+    @param
+    left (pandas series): column from the first dataframe
+    right (pandas series): column with the same kind of values from the second dataframe
+
+    @return
+    codes (tuple): numpy array of the codes for each column, in the same order as the parameters
+    """
+    left = left.astype('category')
+    right = right.astype('category')
+    categories = left.cat.categories.append(right.cat.categories).unique()
+    codes = []
+    for column in (left, right):
+        mapping = np.append(categories.get_indexer(column.cat.categories), -1)
+        codes.append(mapping[column.cat.codes.to_numpy()])
+    return tuple(codes)
+
+
+def list_directory(path, cache=None, trust_cache=False):
+    """Read the contents of a directory, noting which items are folders
+
+    Uses os.scandir(), which gets the item type with the directory read on Windows and most Linux file systems,
+    so the only items that need a separate stat call are symbolic links (to find the type of the target).
+
+    If a scan cache is provided, the directory is stat-ed first and the cached contents are used instead of
+    reading the directory if its modification time and inode have not changed since it was cached.
+    Adding, removing, or renaming an item changes the modification time of the directory.
+    If the cache is trusted, because it is kept current by ShareWatcher, the cached contents are used without a stat.
+
+    @param
+    path (string): path to the directory
+    cache (dict, None): scan cache from read_scan_cache(), which is updated with the directory contents
+    trust_cache (bool): True to use the cached contents without checking if the directory changed
+
+    @return
+    entries (list): list of (name, is_dir) tuples, in the order they are listed by the operating system
+    stat_calls (int): the number of stat calls, for the directory if using the cache and for symbolic links
+    cache_hit (bool): True if the entries are from the cache and the directory was not read
+    """
+    # Checks the cache before reading the directory.
+    # The stat is done before reading, so a change made while reading is found the next time.
+    stat_calls = 0
+    if trust_cache and path in cache:
+        cache[path][2] = time.time()
+        return cache[path][3], stat_calls, True
+    if cache is not None:
+        stat = os.stat(path)
+        stat_calls += 1
+        cached = cache.get(path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_ino:
+            cached[2] = time.time()
+            return cached[3], stat_calls, True
+
+    entries = []
+    with os.scandir(path) as directory:
+        for entry in directory:
+            if entry.is_symlink():
+                stat_calls += 1
+            entries.append((entry.name, entry.is_dir()))
+
+    if cache is not None:
+        cache[path] = [stat.st_mtime_ns, stat.st_ino, time.time(), entries]
+    return entries, stat_calls, False
+
+
+def load_inventory_cache(cache_path):
+    """Read the inventory dataframe from an inventory cache file
+
+    Columns with a mix of types, like Review_Date with dates and text, are saved as one column for each type
+    (see save_inventory_cache()) and are combined back into a single column.
+
+    @param
+    cache_path (string): path to the cache file
+
+    @return
+    df_inventory (pandas dataframe): data from the inventory after cleanup
+    """
+    os.utime(cache_path)
+    with pa.OSFile(cache_path, 'rb') as source:
+        table = pa.ipc.open_file(source).read_all()
+    df_inventory = pd.DataFrame(index=pd.RangeIndex(table.num_rows))
+    for name in table.column_names:
+        column, _, value_type = name.partition('#')
+        values = table[name].to_pandas()
+        if value_type == '':
+            df_inventory[column] = values
+        elif value_type == 'text':
+            df_inventory[column] = values.astype(object).where(values.notna(), None)
+        else:
+            combined = df_inventory[column].copy()
+            combined[values.notna()] = values[values.notna()].astype(object)
+            df_inventory[column] = combined
+    return df_inventory
+
+
+def make_shares_inventory(df_info, workers=1, scan_stats=None, cache=None, timeout=None, server_workers=None,
+                          incomplete=None, manifest=None, shard=None, trust_cache=False, rules=None):
     """Make a dataframe with the contents of all shares, to the level of detail specified in df_info
 
+    Directories are read one level at a time across every share, so that with more than one worker
+    the shares and the top level folders within each share are read concurrently.
+    The rows are always put together in the share information order,
+    so the result is the same for any number of workers.
+
+    If there is a timeout, the directories are read with asyncio instead (see read_shares_async()),
+    and shares that are not finished by the timeout only include the folders read so far.
+
+    If there is a manifest (see hub_scanner.py), the directory contents are read from the manifest instead of the
+    shares, with one pass through the manifest for each level of directories (see read_manifest()).
+    Directories that are not in the manifest are empty, and their share is included in incomplete.
+
+    If there is a shard, only the shares and top level items assigned to that shard are included (see share_shard()),
+    so several computers can each read part of the shares. The results are combined with read_shard_listings().
+
     @param
     df_info (pandas dataframe): data from the shares information csv
+    workers (int): the number of directories to read at the same time
+    scan_stats (dict, None): if a dictionary is provided, it is updated with the number of directory reads,
+                             stat calls, items, and cache hits for each share, with the share name as the key,
+                             and the seconds spent reading directories for the share
+    cache (dict, None): scan cache from read_scan_cache(), to reuse the contents of directories that have not changed
+    trust_cache (bool): True to use the cached contents without checking if they changed, if the cache is kept
+                        current by ShareWatcher
+    timeout (int, None): seconds from the start of the scan until shares that are still being read are stopped
+    server_workers (int, None): the number of directories to read at the same time from one server, if timeout is used,
+                                or None for half of workers, so one server cannot take every worker
+    incomplete (list, None): if a list is provided, it is updated with the name of every share stopped by the timeout
+                             or missing directories from the manifest
+    manifest (string, None): path to a manifest of the share contents, to use instead of reading the shares
+    shard (tuple, None): the shard number and number of shards, to only read the part of the shares for this shard
+    rules (IgnoreRules, None): items to ignore, which are not read or included, or None for DEFAULT_IGNORE_RULES
 
     @return
     df_shares (pandas dataframe): contents of all shares
     """
 
-    # Makes an inventory of the contents of every share.
-    share_inventory = {'Share': [], 'Folder': []}
-    for share in df_info.itertuples():
+    if rules is None:
+        rules = IgnoreRules(DEFAULT_IGNORE_RULES)
 
-        # Shares where the inventory just has the share name.
-        if share.pattern == 'share':
-            share_inventory['Share'].append(share.name)
-            share_inventory['Folder'].append(share.name)
-
-        # Shares where the inventory is just the top level folders.
-        # Files are included unless they are .DS_Store or Hub documentation.
-        elif share.pattern == 'top':
-            for item in os.listdir(share.path):
-                if os.path.isdir(os.path.join(share.path, item)) or (item != '.DS_Store' and 'Hub' not in item):
-                    share_inventory['Share'].append(share.name)
-                    share_inventory['Folder'].append(item)
-
-        # Shares where the inventory includes second level folders for any top level folder in the folders list,
-        # which is a pipe-separated string in df_shares.
-        # Files are not included.
-        elif share.pattern == 'second':
-            for item in os.listdir(share.path):
-                # Continue navigation if item is a directory and stop if it is a file.
-                if os.path.isdir(os.path.join(share.path, item)):
-                    for second_item in os.listdir(os.path.join(share.path, item)):
-                        if os.path.isdir(os.path.join(share.path, item, second_item)):
-                            if item in share.folders.split('|'):
-                                # In born-digital folders, go to the third (collection) level in backlogged and closed:
-                                if item.lower() == 'born-digital' and second_item in ('backlogged', 'closed'):
-                                    for third_item in os.listdir(os.path.join(share.path, item, second_item)):
-                                        if os.path.isdir(os.path.join(share.path, item, second_item, third_item)):
-                                            share_inventory['Share'].append(share.name)
-                                            share_inventory['Folder'].append(f'{item}\\{second_item}\\{third_item}')
-                                else:
-                                    share_inventory['Share'].append(share.name)
-                                    share_inventory['Folder'].append(f'{item}\\{second_item}')
-                            else:
-                                share_inventory['Share'].append(share.name)
-                                share_inventory['Folder'].append(item)
-        # Catch shares with unexpected patterns.
-        else:
+    # Catch shares with unexpected patterns, which are not included in the share inventory.
+    # With a shard, skips shares for other shards and notes the shares that are split by top level item.
+    shares = []
+    split_paths = set()
+    for share in df_info.itertuples():
+        if share.pattern not in ('second', 'share', 'top'):
             print('Error: config has an unexpected pattern', share.pattern)
+            continue
+        if shard is not None:
+            share_number = share_shard(share, shard[1])
+            if share_number == 0:
+                split_paths.add(share.path)
+            elif share_number != shard[0]:
+                continue
+        shares.append(share)
+
+    # Saves the contents of each directory read to listings and updates scan_stats, if provided.
+    # Directory reads are only timed if scan_stats is provided.
+    listings = {}
+    read_seconds = {}
+
+    def save_listing(path, share_name, result):
+        entries, stat_calls, cache_hit = result
+        if path in split_paths:
+            entries = [entry for entry in entries if shard_number(entry[0], shard[1]) == shard[0]]
+        listings[path] = entries
+        if scan_stats is not None:
+            share_stats = scan_stats.setdefault(share_name, {'directory_reads': 0, 'stat_calls': 0,
+                                                             'items': 0, 'cache_hits': 0, 'seconds': 0})
+            share_stats['cache_hits' if cache_hit else 'directory_reads'] += 1
+            share_stats['stat_calls'] += stat_calls
+            share_stats['items'] += len(entries)
+            share_stats['seconds'] += read_seconds.pop(path, 0)
+
+    def timed_list_directory(path):
+        start = time.perf_counter()
+        result = list_directory(path, cache=run_cache, trust_cache=trust_cache)
+        read_seconds[path] = time.perf_counter() - start
+        return result
+
+    # Reads every directory needed to apply the share patterns.
+    # Each pass finds the directories that are needed next based on what has been read so far,
+    # which is up to three passes for born-digital folders in shares with the second pattern.
+    # A directory is only read once, even if it is needed by more than one share.
+    # With a timeout, directories that are still being read keep running after the scan is done,
+    # so new directory contents are saved to a separate cache for this run, which they can update without changing
+    # the scan cache while it is saved, and only the directories that were used are added to the scan cache.
+    # If this thread already has an event loop running, such as in a notebook, the timeout scan runs in another thread.
+    run_cache = cache
+    if timeout is not None and manifest is None and cache is not None:
+        run_cache = ChainMap({}, cache)
+    list_function = partial(list_directory, cache=run_cache, trust_cache=trust_cache)
+    if scan_stats is not None:
+        list_function = timed_list_directory
+    if timeout is not None and manifest is None:
+        read_shares = read_shares_async(shares, listings, list_function, save_listing, workers,
+                                        server_workers or max(workers // 2, 1), timeout, rules)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            incomplete_shares = asyncio.run(read_shares)
+        else:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                incomplete_shares = executor.submit(asyncio.run, read_shares).result()
+        if incomplete is not None:
+            incomplete.extend(incomplete_shares)
+        if cache is not None:
+            for path in listings:
+                if path in run_cache.maps[0]:
+                    cache[path] = run_cache.maps[0][path]
+    else:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            map_function = executor.map if workers > 1 else map
+            while True:
+                missing = {}
+                for share in shares:
+                    for path in share_rows(share, listings, rules)[1]:
+                        missing.setdefault(path, share.name)
+                if len(missing) == 0:
+                    break
+                if manifest is not None:
+                    found = read_manifest(manifest, shares, missing)
+                    results = [(found.get(path, []), 0, False) for path in missing]
+                    for path, share_name in missing.items():
+                        if path not in found and incomplete is not None and share_name not in incomplete:
+                            incomplete.append(share_name)
+                else:
+                    results = map_function(list_function, missing)
+                for path, result in zip(missing, results):
+                    save_listing(path, missing[path], result)
 
-    # Converts the share inventory to a dataframe.
-    df_shares = pd.DataFrame.from_dict(share_inventory)
+    # Makes an inventory of the contents of every share.
+    # Each share name is stored once, as a category, with a code for each folder instead of repeating the name.
+    share_names = sorted({share.name for share in shares})
+    share_codes = []
+    folders = []
+    for share in shares:
+        share_folders = share_rows(share, listings, rules)[0]
+        share_codes.append(np.full(len(share_folders), share_names.index(share.name), dtype=np.int32))
+        folders.extend(share_folders)
+
+    # Converts the share inventory to a dataframe, with the folder names as a pandas string column.
+    df_shares = pd.DataFrame({'Share': pd.Categorical.from_codes(np.concatenate(share_codes + [[]]).astype(np.int32),
+                                                                 share_names),
+                              'Folder': pd.array(folders, dtype='str')})
     return df_shares
 
 
-def read_inventory(path):
+def match_keys(df_inventory, df_shares, duplicates=None):
+    """Match the (Share, Folder) keys in the inventory and the shares using a hash index of each
+
+    Both the share and folder name need to be the same for a row to match in both dataframes.
+    Each key is made into one number from the category codes of the share and folder, with categories shared
+    by both dataframes (see key_codes()), so the index is of numbers instead of pairs of text.
+
+    @param
+    df_inventory (pandas dataframe): data from the inventory after cleanup
+    df_shares (pandas dataframe): contents of all shares
+    duplicates (dict, None): if a dictionary is provided, it is updated with lists of the (Share, Folder) keys
+                             that are in the inventory ("inventory") or the shares ("shares") more than once
+
+    @return
+    in_share (numpy array): True for each inventory row with a key that is in the shares
+    new_keys (pandas dataframe): Share and Folder for the keys that are in the shares but not the inventory, once each
+    """
+    share_codes = key_codes(df_inventory['Share'], df_shares['Share'])
+    folder_codes = key_codes(df_inventory['Folder'], df_shares['Folder'])
+    folder_count = max(folder_codes[0].max(initial=-1), folder_codes[1].max(initial=-1)) + 2
+    inventory_keys = pd.Index((share_codes[0] + 1) * folder_count + folder_codes[0] + 1)
+    share_keys = pd.Index((share_codes[1] + 1) * folder_count + folder_codes[1] + 1)
+
+    # Finds keys that are repeated. Inventory rows with the same key are all kept,
+    # and a folder that is in the shares more than once is only added to the inventory once.
+    is_repeat = share_keys.duplicated()
+    if duplicates is not None:
+        for name, df, keys in (('inventory', df_inventory, inventory_keys), ('shares', df_shares, share_keys)):
+            is_first = ~keys.duplicated()
+            repeated = keys[~is_first].unique()
+            rows = np.flatnonzero(is_first)[keys[is_first].get_indexer(repeated)]
+            duplicates[name] = list(zip(df['Share'].iloc[rows].tolist(), df['Folder'].iloc[rows].tolist()))
+
+    in_share = inventory_keys.isin(share_keys)
+    is_new = ~is_repeat & ~share_keys.isin(inventory_keys)
+    new_keys = df_shares.loc[is_new, ['Share', 'Folder']].reset_index(drop=True)
+    return in_share, new_keys
+
+
+def normalize_folder(name):
+    """Normalize a folder name for finding near matches
+
+    Normalizes the Unicode form and case, treats every separator (slashes, underscores, hyphens, periods)
+    as a space, and combines repeated spaces, so variations in how a folder name was typed compare the same.
+
+    @param
+    name (string): folder name from the inventory or share
+
+    @return
+    normalized (string): the normalized folder name
+    """
+    normalized = unicodedata.normalize('NFKC', name).casefold()
+    normalized = re.sub(r'[\\/_.\-\s]+', ' ', normalized)
+    return normalized.strip()
+
+
+def peak_rss():
+    """Get the peak memory used by the script so far (resident set size), in MB
+
+    @return
+    peak (float, None): peak memory in MB, or None if it cannot be found on this operating system
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes and macOS reports bytes.
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 1024 / 1024
+    return None
+
+
+@contextmanager
+def profile_stage(profile, name):
+    """Record the wall time, CPU time, and peak memory for one stage of the script, if profiling
+
+    Use in a with statement around the stage. If profile is None, nothing is recorded.
+    Peak memory is for the whole script up to the end of the stage, since the operating system only reports
+    the highest value so far, so a stage that raises the peak is one that used more memory than earlier stages.
+
+    @param
+    profile (dict, None): profile results, which has a "stages" dictionary that is updated with this stage
+    name (string): the name of the stage
+
+    @return
+    None
+    """
+    if profile is None:
+        yield
+        return
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        peak = peak_rss()
+        profile['stages'][name] = {'wall_seconds': round(time.perf_counter() - wall_start, 4),
+                                   'cpu_seconds': round(time.process_time() - cpu_start, 4),
+                                   'peak_rss_mb': None if peak is None else round(peak, 2)}
+
+
+def query_history(path, question, query_args=()):
+    """Answer one of the questions in HISTORY_QUERIES with the audit history
+
+    Any index in HISTORY_SCHEMA that the history does not have yet, such as a history saved by an earlier version,
+    is added first, so the questions are answered from the indexes.
+
+    @param
+    path (string): path to the audit history database
+    question (string): the name of the question
+    query_args (list): the arguments for the question, such as the share and folder
+
+    @return
+    columns (list): the column names for the answer
+    rows (list): a tuple for each row of the answer
+    """
+    with closing(sqlite3.connect(path)) as connection:
+        with connection:
+            for statement in HISTORY_SCHEMA:
+                connection.execute(statement)
+        cursor = connection.execute(HISTORY_QUERIES[question][0], list(query_args))
+        rows = cursor.fetchall()
+        columns = [description[0] for description in cursor.description]
+    return columns, rows
+
+
+def read_commands(lines, commands):
+    """Read commands for watch mode, one on each line, until there are no more lines
+
+    An empty line (pressing Enter) is audit and q or quit is stop. When there are no more lines, end is added.
+
+    @param
+    lines (iterable): lines typed by the user, which is sys.stdin in production
+    commands (queue): queue where each command is added
+
+    @return
+    None
+    """
+    for line in lines:
+        commands.put('stop' if line.strip().lower() in ('q', 'quit') else 'audit')
+    commands.put('end')
+
+
+def read_ignore_rules(path):
+    """Read the ignore rules from a CSV, with the columns share, action, items, and pattern (see IgnoreRules)
+
+    Only uses the standard library, so the rules can be checked before pandas is imported.
+
+    @param
+    path (string): path to the rules CSV
+
+    @return
+    rules (list): (share, action, items, pattern) tuples for IgnoreRules
+    errors (list): list with error messages, which is empty if there are no errors
+    """
+    rules = []
+    errors = []
+    with open(path, newline='', encoding='utf-8-sig') as rules_file:
+        reader = csv.DictReader(rules_file)
+        columns = reader.fieldnames or []
+        missing = [column for column in ('share', 'action', 'items', 'pattern') if column not in columns]
+        if len(missing) > 0:
+            return rules, [f'Provided rules "{path}" is missing the column(s) {", ".join(missing)}']
+        for line_number, row in enumerate(reader, start=2):
+            rule = tuple((row[column] or '').strip() for column in ('share', 'action', 'items', 'pattern'))
+            if rule[1] not in ('ignore', 'include'):
+                errors.append(f'Rule on line {line_number} has action "{rule[1]}", which should be ignore or include')
+            elif rule[2] not in ('', 'file', 'folder'):
+                errors.append(f'Rule on line {line_number} has items "{rule[2]}", '
+                              f'which should be file, folder, or blank')
+            elif rule[3] == '' or rule[3] == 're:':
+                errors.append(f'Rule on line {line_number} has no pattern')
+            else:
+                try:
+                    IgnoreRules.compile_pattern(rule[3])
+                    rules.append(rule)
+                except re.error as error:
+                    errors.append(f'Rule on line {line_number} has a regular expression that is not valid: {error}')
+    return rules, errors
+
+
+def read_inventory(path, cache_dir=None, cache_versions=3):
     """Read inventory into dataframe, clean up, and add an Audit_Result column
 
     Clean up includes dropping unneeded rows and simplifying column names.
+    The spreadsheet is read one row at a time in read-only mode, skipping the Examples sheet without reading it,
+    and only the rows and columns needed for the audit are kept before the dataframe is made.
+
+    If a cache folder is provided and pyarrow is installed, the cleaned up dataframe is saved there
+    and used instead of reading the spreadsheet again until the spreadsheet changes (see find_inventory_cache()).
 
     @param
     path (string): path to the inventory, which is a script argument
+    cache_dir (string, None): path to the folder for the inventory cache, or None to not use a cache
+    cache_versions (int): the number of inventory versions to keep in the cache
 
     @return
     df (pandas dataframe): data from the inventory after cleanup
     """
 
-    # Reads every sheet in the Excel spreadsheet, except for "Examples", into a single dataframe.
-    sheet_dict = pd.read_excel(path, sheet_name=None)
-    del sheet_dict['Examples']
-    df_inventory = pd.concat(sheet_dict, ignore_index=True)
+    # Uses the cached dataframe, if this version of the inventory has been read before.
+    cache_path = None
+    if cache_dir is not None and pa is not None:
+        cache_path, cache_hit = find_inventory_cache(path, cache_dir)
+        if cache_hit:
+            return load_inventory_cache(cache_path)
+
+    # Inventory columns to keep, with the simplified column name used by the script.
+    columns = {'Share (required)': 'Share',
+               'Folder Name (required if not share)': 'Folder',
+               'Use Policy Category (required)': 'Use',
+               'Person Responsible (required)': 'Responsible',
+               'Date to review for deletion (required)': 'Review_Date',
+               'Additional information (optional)': 'Notes'}
+
+    # Text that is read as a blank cell, which is the same as the default for pandas.read_excel().
+    blank_text = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                  '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+    # Reads every sheet in the Excel spreadsheet, except for "Examples", keeping the rows for the audit.
+    # Each sheet's column order is found from its first row, in case the sheets are not all the same.
+    rows = []
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet_name in workbook.sheetnames:
+            if sheet_name == 'Examples':
+                continue
+            sheet_rows = workbook[sheet_name].iter_rows(values_only=True)
+            header = next(sheet_rows, ())
+            positions = [header.index(column) if column in header else None for column in columns]
+            deleted = header.index('Deleted (date) (optional)') if 'Deleted (date) (optional)' in header else None
+
+            for sheet_row in sheet_rows:
+                values = [None if position is None or position >= len(sheet_row) else sheet_row[position]
+                          for position in positions]
+                values = [None if isinstance(value, str) and value in blank_text else value for value in values]
+
+                # Removes the rows that describe each column, which have the description in the first column.
+                if values[0] == 'Name of the Hub share.':
+                    continue
+
+                # Removes the rows of content that has been deleted, which have information in the deleted column.
+                if deleted is not None and deleted < len(sheet_row) and sheet_row[deleted] not in (None, ''):
+                    continue
+
+                # Removes blank rows.
+                if all(value is None for value in values):
+                    continue
+
+                rows.append(values)
+    finally:
+        workbook.close()
+
+    # Share is categorical, so each share name is only stored once and matching and sorting use the codes.
+    df_inventory = pd.DataFrame(rows, columns=list(columns.values()))
+    df_inventory['Share'] = df_inventory['Share'].astype('category')
+
+    # Adds the columns for recording errors found during the audit, one for each error type.
+    # Initial values are TBD, so they can be updated with the results later.
+    # These are categorical with the values from AUDIT_VALUES, which are stored as one small number per row.
+    for column, values in AUDIT_VALUES.items():
+        df_inventory[column] = pd.Categorical.from_codes(np.zeros(len(df_inventory.index), dtype=np.int8), values)
+
+    # Saves the dataframe to the cache for the next time this version of the inventory is read.
+    if cache_path is not None:
+        save_inventory_cache(df_inventory, cache_path, cache_versions)
+
+    return df_inventory
+
+
+def read_manifest(manifest, shares, directories):
+    """Read the contents of directories from a manifest of the share contents, made by hub_scanner.py
+
+    The manifest has one line for each share, folder, and file, with the share name, type (d for a folder or share
+    and f for a file), and path within the share, using / between folders. The share itself has a blank path.
+    Lines are tab-separated, or are JSON objects with the keys share, type, and path if the manifest name includes
+    .jsonl, and the manifest is compressed with gzip if the name ends with .gz.
+
+    The manifest is read one line at a time and only the contents of the requested directories are kept,
+    so the memory needed does not depend on the size of the manifest.
+
+    @param
+    manifest (string): path to the manifest
+    shares (list): named tuples from the shares information dataframe, to find the share path for each share name
+    directories (dict): keys are the paths of the directories to read, using the share path from shares
+
+    @return
+    listings (dict): keys are the directory paths that are in the manifest and values are the list of (name, is_dir),
+                     in manifest order
+    """
+    share_paths = {}
+    for share in shares:
+        share_paths.setdefault(share.name, []).append(share.path)
+
+    listings = {}
+    is_json = '.jsonl' in os.path.basename(manifest)
+    opener = gzip.open if manifest.endswith('.gz') else open
+    with opener(manifest, 'rt', encoding='utf-8') as manifest_file:
+        for line in manifest_file:
+            line = line.rstrip('\r\n')
+            if line == '':
+                continue
+            if is_json:
+                entry = json.loads(line)
+                share_name, item_type, item_path = entry['share'], entry['type'], entry['path']
+            else:
+                share_name, item_type, item_path = line.split('\t', 2)
+            parts = item_path.split('/') if item_path else []
+
+            # Adds the item to the contents of its parent, if that is one of the directories,
+            # and notes that the item was found, in case it is one of the directories and is empty.
+            for share_path in share_paths.get(share_name, ()):
+                if len(parts) > 0:
+                    parent = os.path.join(share_path, *parts[:-1])
+                    if parent in directories:
+                        listings.setdefault(parent, []).append((parts[-1], item_type == 'd'))
+                if item_type == 'd':
+                    path = os.path.join(share_path, *parts)
+                    if path in directories:
+                        listings.setdefault(path, [])
+    return listings
+
+
+def read_metrics_cache(path):
+    """Read the metrics cache from a previous run, which is a SQLite database
+
+    @param
+    path (string): path to the metrics cache database, which is made if it does not exist
+
+    @return
+    cache (dict): keys are directory paths and values are [mtime_ns, inode, last_used, files, subdirectories]
+    """
+    cache = {}
+    with closing(sqlite3.connect(path)) as connection:
+        connection.execute('CREATE TABLE IF NOT EXISTS metrics_listings (path TEXT PRIMARY KEY, mtime_ns INTEGER, '
+                           'inode INTEGER, last_used REAL, files TEXT, subdirectories TEXT)')
+        for row in connection.execute('SELECT * FROM metrics_listings'):
+            cache[row[0]] = list(row[1:4]) + [json.loads(row[4]), json.loads(row[5])]
+    return cache
+
+
+def read_scan_cache(path):
+    """Read the scan cache from a previous run, which is a SQLite database
+
+    @param
+    path (string): path to the scan cache database, which is made if it does not exist
+
+    @return
+    cache (dict): keys are directory paths and values are [mtime_ns, inode, last_used, entries]
+    """
+    cache = {}
+    with closing(sqlite3.connect(path)) as connection:
+        connection.execute('CREATE TABLE IF NOT EXISTS scan_cache (path TEXT PRIMARY KEY, mtime_ns INTEGER, '
+                           'inode INTEGER, last_used REAL, entries TEXT)')
+        for row in connection.execute('SELECT path, mtime_ns, inode, last_used, entries FROM scan_cache'):
+            cache[row[0]] = [row[1], row[2], row[3], [tuple(entry) for entry in json.loads(row[4])]]
+    return cache
+
+
+def read_shard_listings(folder, df_info):
+    """Combine the shard listings made with the shard option into one share inventory
+
+    Every shard must have a listing, made with the same number of shards and the same share information
+    (see share_info_hash()), or the listings are not combined. The share paths can be different,
+    since they are where each shard computer finds the shares.
+
+    @param
+    folder (string): path to the folder with the shard listings (hub_audit_shard_N_of_N.json.gz)
+    df_info (pandas dataframe): data from the shares information csv
+
+    @return
+    df_shares (pandas dataframe): contents of all shares, the same as from make_shares_inventory(), or None if error
+    incomplete (list): names of the shares that were incomplete in any shard, in the share information order
+    errors (list): list with error messages, which is empty if there are no errors
+    """
+    info_hash = share_info_hash(df_info)
+    listings = {}
+    errors = []
+    for name in sorted(os.listdir(folder)):
+        if not re.fullmatch(r'hub_audit_shard_\d+_of_\d+\.json\.gz', name):
+            continue
+        with gzip.open(os.path.join(folder, name), 'rt', encoding='utf-8') as listing_file:
+            listing = json.load(listing_file)
+        if listing['share_information'] != info_hash:
+            errors.append(f'Shard listing {name} was made with different share information')
+        elif listing['shard'] in listings:
+            errors.append(f'Shard listing {name} is for shard {listing["shard"]}, which has another listing')
+        else:
+            listings[listing['shard']] = listing
+
+    # Checks that every shard arrived, all with the same number of shards.
+    shard_counts = sorted({listing['shards'] for listing in listings.values()})
+    if len(listings) == 0 and len(errors) == 0:
+        errors.append(f'No shard listings in "{folder}"')
+    elif len(shard_counts) > 1:
+        errors.append(f'Shard listings have different numbers of shards: {", ".join(map(str, shard_counts))}')
+    elif len(shard_counts) == 1:
+        for number in range(1, shard_counts[0] + 1):
+            if number not in listings:
+                errors.append(f'Missing shard listing for shard {number} of {shard_counts[0]}')
+    if len(errors) > 0:
+        return None, [], errors
+
+    # Combines the folders from each shard, in the share information order and then the shard order.
+    share_names = []
+    for share in df_info.itertuples():
+        if share.pattern in ('second', 'share', 'top') and share.name not in share_names:
+            share_names.append(share.name)
+    folders = {share_name: [] for share_name in share_names}
+    incomplete_names = set()
+    for number in sorted(listings):
+        for share_name, share_folders in listings[number]['folders'].items():
+            folders[share_name].extend(share_folders)
+        incomplete_names.update(listings[number]['incomplete'])
+    incomplete = [share_name for share_name in share_names if share_name in incomplete_names]
+
+    sorted_names = sorted(share_names)
+    share_codes = [np.full(len(folders[share_name]), sorted_names.index(share_name), dtype=np.int32)
+                   for share_name in share_names]
+    all_folders = [folder for share_name in share_names for folder in folders[share_name]]
+    df_shares = pd.DataFrame({'Share': pd.Categorical.from_codes(np.concatenate(share_codes + [[]]).astype(np.int32),
+                                                                 sorted_names),
+                              'Folder': pd.array(all_folders, dtype='str')})
+    return df_shares, incomplete, errors
+
+
+async def read_shares_async(shares, listings, list_function, save_listing, workers, server_workers, timeout,
+                            rules=None):
+    """Read the directories for every share with asyncio, stopping shares that are not finished by the timeout
+
+    Each share is read independently, so a slow share does not hold back the others.
+    The number of directories read at the same time is limited overall and for each server,
+    so a server that stops responding cannot take all the workers.
+    Directories are read in daemon threads, which cannot be stopped
+    but do not keep the script open if they never return.
+
+    @param
+    shares (list): named tuples from the shares information dataframe, for shares with an expected pattern
+    listings (dict): keys are directory paths and values are the list of (name, is_dir) from list_directory()
+    list_function (function): list_directory(), with the scan cache if used
+    save_listing (function): saves a result from list_function to listings, with the path and share name
+    workers (int): the number of directories to read at the same time
+    server_workers (int): the number of directories to read at the same time from one server
+    timeout (int): seconds from the start of the scan until shares that are still being read are stopped
+    rules (IgnoreRules, None): items to ignore, which are not read
+
+    @return
+    incomplete (list): names of the shares that were stopped by the timeout, in the share information order
+    """
+    loop = asyncio.get_running_loop()
+    executor = DaemonThreadExecutor()
+    all_limit = asyncio.Semaphore(workers)
+    server_limits = {}
+    read_tasks = {}
+
+    # Waits for a slot for the server before a slot overall,
+    # so reads waiting on a server that stopped responding do not hold slots the other servers could use.
+    async def read_directory(path, server):
+        server_limit = server_limits.setdefault(server, asyncio.Semaphore(server_workers))
+        async with server_limit, all_limit:
+            return await loop.run_in_executor(executor, list_function, path)
+
+    # Finds the server the first time the share has directories to read, in a thread,
+    # since finding it can need a stat of the share, which may not return.
+    async def read_share(share):
+        server = None
+        while True:
+            missing = share_rows(share, listings, rules)[1]
+            if len(missing) == 0:
+                return
+            if server is None:
+                server = await loop.run_in_executor(executor, share_server, share.path)
+            for path in missing:
+                if path not in read_tasks:
+                    read_tasks[path] = asyncio.ensure_future(read_directory(path, server))
+            results = await asyncio.gather(*[read_tasks[path] for path in missing])
+            for path, result in zip(missing, results):
+                if path not in listings:
+                    save_listing(path, share.name, result)
+
+    # Starts every share at once and waits until they are all done or the timeout is reached.
+    share_tasks = [asyncio.ensure_future(read_share(share)) for share in shares]
+    await asyncio.wait(share_tasks, timeout=timeout)
+
+    # Stops any shares which are not done. Errors from shares that finished, like a path not existing, are raised.
+    incomplete = []
+    for share, task in zip(shares, share_tasks):
+        if task.done():
+            task.result()
+        else:
+            task.cancel()
+            incomplete.append(share.name)
+    for task in read_tasks.values():
+        task.cancel()
+    return incomplete
+
+
+def run_audit(inventory, shares, *, cache=None, outputs=None, history=None, options=None, profile=None,
+              trust_cache=False):
+    """Run the audit: read the inventory and the shares, check the inventory, and save the results
+
+    This is everything the script does, so notebooks, scheduled jobs, and tests can run the audit in Python.
+    The inventory and shares can be read once and passed to each run, to try different options without reading
+    them again. The inventory dataframe is copied, so it is not changed by the audit.
+
+    @param
+    inventory (string, pandas dataframe): path to the inventory, or the inventory from read_inventory()
+    shares (string, pandas dataframe): path to the shares information csv, the shares information dataframe,
+                                       or the contents of the shares (Share and Folder columns) from
+                                       make_shares_inventory() to use instead of reading the shares
+    cache (string, dict, None): folder for the scan cache, metrics cache, and inventory cache, which are read and saved;
+                                or a scan cache dictionary, which is updated, to keep between runs;
+                                or None to not use a cache
+    outputs (string, None): path for the audit results without the file extension (see write_outputs()),
+                            which is also used for the changes since the previous audit; or None to not save files
+    history (string, None): path to the audit history to add the results to, or None to not add them
+    options (dict, None): options from check_options(), where any option that is not included has the default value
+    profile (dict, None): if a dictionary with "stages" and "shares" dictionaries is provided, it is updated with the
+                          time and memory for each stage (see profile_stage()) and the scan stats for each share
+    trust_cache (bool): True to use a scan cache dictionary without checking for changes (see ShareWatcher)
+
+    @return
+    result (AuditResult): the audit results
+    """
+    options = dict(check_options([])[1], **(options or {}))
+    shard = tuple(int(number) for number in options['shard'].split('/')) if options['shard'] else None
+    cache_folder = cache if isinstance(cache, str) else None
+    result = AuditResult()
+
+    # Reads the inventory, a multiple sheet Excel spreadsheet, into one pandas dataframe, with cleanup,
+    # unless it was already read. The cleaned up dataframe is cached in the cache folder, if pyarrow is installed.
+    # If shard is used, the inventory is not needed, since only part of the shares are read.
+    if shard is None:
+        with profile_stage(profile, 'read_inventory'):
+            if isinstance(inventory, str):
+                inventory_cache = None if cache_folder is None else os.path.join(cache_folder,
+                                                                                 'hub_audit_inventory_cache')
+                df_inventory = read_inventory(inventory, cache_dir=inventory_cache)
+            else:
+                df_inventory = inventory.copy()
+        result.inventory_rows = len(df_inventory.index)
+
+    # Reads the share information into a dataframe, unless it was already read or the shares were already read.
+    with profile_stage(profile, 'read_share_information'):
+        if isinstance(shares, str):
+            result.share_information = pd.read_csv(shares)
+        elif 'Folder' in shares.columns:
+            result.shares = shares
+        else:
+            result.share_information = shares
+    if options['metrics'] and result.share_information is None:
+        result.errors.append('Cannot add metrics without the share information')
+        return result
+
+    # If merge is used, combines the shard listings instead of reading the shares.
+    if result.shares is None and options['merge']:
+        with profile_stage(profile, 'merge_shards'):
+            result.shares, result.incomplete, result.errors = read_shard_listings(options['merge'],
+                                                                                  result.share_information)
+        if len(result.errors) > 0:
+            return result
+
+    # Otherwise, reads the rules CSV, if provided, and the scan cache from the previous run, unless rescan is used.
+    # Items ignored by the default rules and the rules CSV are not read or included.
+    # Then makes a dataframe with the folders in the shares, based on patterns in the share information,
+    # reading the shares or the manifest made by hub_scanner.py.
+    # The scan cache is not used with a manifest, since the shares are not read.
+    # Without a cache folder or dictionary, there is no scan cache, so directories are read without a stat first,
+    # unless watch is used, which keeps the scan cache current between audits.
+    elif result.shares is None:
+        extra_rules, rules_errors = read_ignore_rules(options['rules']) if options['rules'] else ([], [])
+        if len(rules_errors) > 0:
+            result.errors.extend(rules_errors)
+            return result
+        with profile_stage(profile, 'read_scan_cache'):
+            scan_start = time.time()
+            cache_path = None if cache_folder is None else os.path.join(cache_folder, 'hub_audit_scan_cache.db')
+            if isinstance(cache, dict):
+                result.cache = cache
+            elif cache_path is not None and not (options['rescan'] or options['manifest']):
+                result.cache = read_scan_cache(cache_path)
+            elif (cache_path is not None and not options['manifest']) or options['watch']:
+                result.cache = {}
+        with profile_stage(profile, 'scan_shares'):
+            rules = IgnoreRules(DEFAULT_IGNORE_RULES + extra_rules)
+            result.shares = make_shares_inventory(result.share_information, workers=options['workers'],
+                                                  scan_stats=None if profile is None else profile['shares'],
+                                                  cache=result.cache, timeout=options['timeout'] or None,
+                                                  server_workers=options['server_workers'] or None,
+                                                  incomplete=result.incomplete, manifest=options['manifest'] or None,
+                                                  shard=shard, trust_cache=trust_cache, rules=rules)
+        if cache_path is not None and not options['manifest']:
+            with profile_stage(profile, 'save_scan_cache'):
+                save_scan_cache(cache_path, result.cache, options['cache_size'], scan_start)
+    if shard is not None:
+        return result
+
+    # Checks for blank cells in required columns, dates to review for deletion that are expired or need
+    # manual review, and mismatches between the inventory and Hub shares.
+    with profile_stage(profile, 'audit'):
+        df_inventory = audit(df_inventory, result.shares, result.incomplete, result.duplicates)
+
+    # If metrics is used, adds the size, number of files, and newest modification time for each folder in the shares.
+    # The contents of each directory are cached in the cache folder, and the cache is not read if rescan is used.
+    if options['metrics']:
+        with profile_stage(profile, 'metrics'):
+            metrics_start = time.time()
+            metrics_path = None if cache_folder is None else os.path.join(cache_folder, 'hub_audit_metrics_cache.db')
+            use_cache = metrics_path is not None and not options['rescan']
+            metrics_cache = read_metrics_cache(metrics_path) if use_cache else {}
+            df_inventory = add_metrics(df_inventory, result.share_information, options['workers'], metrics_cache)
+            if metrics_path is not None:
+                save_metrics_cache(metrics_path, metrics_cache, options['cache_size'], metrics_start)
+
+    # Suggests likely matches for folders that are only in the inventory or only in the share,
+    # for example if the folder name was typed differently in the inventory.
+    with profile_stage(profile, 'suggest_matches'):
+        result.inventory = suggest_matches(df_inventory)
+
+    # Saves the results in each format. XLSX has a sheet for each share or person responsible, chosen with sheets.
+    if outputs is not None:
+        with profile_stage(profile, 'write_outputs'):
+            result.paths = write_outputs(result.inventory, outputs, options['format'], options['sheets'])
+
+    # If split is used, also saves the rows that need action for each person responsible or share to their own CSV,
+    # in a folder with the same name as the results.
+    if outputs is not None and options['split']:
+        with profile_stage(profile, 'write_split'):
+            result.paths.extend(write_split(result.inventory, f'{outputs}_split', options['split'], options['workers']))
+
+    # Adds the results to the audit history, to answer questions across audits with the query subcommand.
+    if history is not None:
+        with profile_stage(profile, 'save_history'):
+            save_history(history, result.inventory, datetime.date.today().isoformat())
+
+    # If previous is used, finds the rows that changed since the previous audit CSV
+    # and saves them with the same name as the results, so reviewers can start with what is new.
+    if options['previous']:
+        with profile_stage(profile, 'compare_audits'):
+            previous_df = pd.read_csv(options['previous'], dtype=str, keep_default_na=False)
+            result.changes = compare_audits(previous_df, result.inventory)
+            if outputs is not None:
+                result.changes.to_csv(f'{outputs}_changes.csv', index=False)
+
+    return result
+
+
+def save_history(path, df_inventory, run_date):
+    """Add the results of this run to the audit history, which is a SQLite database
+
+    Every row is added in one transaction, so an interrupted run does not leave part of its results in the history.
+    Values are saved as the text in the audit CSV, and blanks are saved as NULL.
+    Any earlier run with the same run date is replaced, so running the audit again on the same day
+    does not count the same results twice in the history questions.
+
+    @param
+    path (string): path to the audit history database, which is made if it does not exist
+    df_inventory (pandas dataframe): data from inventory after all the checks
+    run_date (string): date of the run, as YYYY-MM-DD
+
+    @return
+    run_id (int): the number of the run in the history
+    """
+    columns = ['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates', 'Audit_Inventory', 'Audit_Required']
+    df_text = df_inventory[columns].astype(object)
+    df_text = df_text.where(df_text.isna(), df_text.astype(str)).astype(object)
+    df_text = df_text.where(df_text.notna(), None)
+
+    with closing(sqlite3.connect(path)) as connection:
+        with connection:
+            for statement in HISTORY_SCHEMA:
+                connection.execute(statement)
+            connection.execute('DELETE FROM results WHERE run_id IN (SELECT run_id FROM runs WHERE run_date = ?)',
+                               (run_date,))
+            connection.execute('DELETE FROM runs WHERE run_date = ?', (run_date,))
+            run_id = connection.execute('INSERT INTO runs (run_date) VALUES (?)', (run_date,)).lastrowid
+            connection.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                   ((run_id, *row) for row in df_text.itertuples(index=False, name=None)))
+    return run_id
+
+
+def save_inventory_cache(df_inventory, cache_path, cache_versions):
+    """Save the inventory dataframe to an inventory cache file (Arrow IPC format) and remove old versions
+
+    Columns with one type are saved as they are, converted by pyarrow. Columns with a mix of types, like Review_Date
+    with dates and text, are saved as one column for each type, named column#type, so every value is the same
+    when it is read again. Only those mixed columns are split one value at a time.
+
+    @param
+    df_inventory (pandas dataframe): data from the inventory after cleanup
+    cache_path (string): path to the cache file
+    cache_versions (int): the number of inventory versions to keep in the cache
+
+    @return
+    None
+    """
+    arrays = {}
+    for column in df_inventory.columns:
+        values = df_inventory[column]
+        if values.dtype != object:
+            arrays[column] = pa.array(values, from_pandas=True)
+            continue
+        if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+            arrays[f'{column}#text'] = pa.array(values, pa.string(), from_pandas=True)
+            continue
+        by_type = {'text': [], 'datetime': [], 'int': [], 'float': []}
+        for value in values:
+            if isinstance(value, datetime.datetime):
+                value_type = 'datetime'
+            elif isinstance(value, float) and not np.isnan(value):
+                value_type = 'float'
+            elif isinstance(value, int) and not isinstance(value, bool):
+                value_type = 'int'
+            elif value is None or isinstance(value, float):
+                value_type = None
+            else:
+                value_type, value = 'text', str(value)
+            for key in by_type:
+                by_type[key].append(value if key == value_type else None)
+        arrays[f'{column}#text'] = pa.array(by_type['text'], pa.string())
+        for key, arrow_type in (('datetime', pa.timestamp('us')), ('int', pa.int64()), ('float', pa.float64())):
+            if any(value is not None for value in by_type[key]):
+                arrays[f'{column}#{key}'] = pa.array(by_type[key], arrow_type)
+
+    # Saves to a temporary file first, so an interrupted run does not leave an incomplete cache file.
+    table = pa.table(arrays)
+    with pa.OSFile(f'{cache_path}.tmp', 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(f'{cache_path}.tmp', cache_path)
+
+    # Removes the least recently used versions, beyond the number to keep.
+    cache_dir = os.path.dirname(cache_path)
+    cache_files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.arrow')]
+    cache_files.sort(key=os.path.getmtime, reverse=True)
+    for old_path in cache_files[cache_versions:]:
+        os.remove(old_path)
+
+
+def save_metrics_cache(path, cache, max_entries, since):
+    """Save the directories used in this run to the metrics cache and remove the least recently used directories
+
+    @param
+    path (string): path to the metrics cache database
+    cache (dict): metrics cache from read_metrics_cache(), updated by add_metrics()
+    max_entries (int): the most directories to keep in the metrics cache
+    since (float): time the run started, so only directories used in this run are saved
+
+    @return
+    None
+    """
+    rows = [(key, *value[:3], json.dumps(value[3]), json.dumps(value[4])) for key, value in cache.items()
+            if value[2] >= since]
+    with closing(sqlite3.connect(path)) as connection:
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS metrics_listings (path TEXT PRIMARY KEY, mtime_ns INTEGER, '
+                               'inode INTEGER, last_used REAL, files TEXT, subdirectories TEXT)')
+            connection.executemany('INSERT OR REPLACE INTO metrics_listings VALUES (?, ?, ?, ?, ?, ?)', rows)
+            connection.execute('DELETE FROM metrics_listings WHERE path NOT IN '
+                               '(SELECT path FROM metrics_listings ORDER BY last_used DESC LIMIT ?)', (max_entries,))
+
+
+def save_profile(path, profile_dict):
+    """Save the time and memory for each stage and the scan stats for each share to a JSON file
+
+    @param
+    path (string): path to save the profile
+    profile_dict (dict): the options, and the "stages" and "shares" dictionaries updated by run_audit()
+
+    @return
+    None
+    """
+    for share_stats in profile_dict['shares'].values():
+        share_stats['seconds'] = round(share_stats['seconds'], 4)
+    with open(path, 'w') as profile_file:
+        json.dump(profile_dict, profile_file, indent=2)
+
+
+def save_scan_cache(path, cache, max_entries, since):
+    """Save the directories used in this run to the scan cache and remove the least recently used directories
+
+    @param
+    path (string): path to the scan cache database
+    cache (dict): scan cache from read_scan_cache(), updated by make_shares_inventory()
+    max_entries (int): the most directories to keep in the scan cache
+    since (float): time the run started, so only directories used in this run are saved
+
+    @return
+    None
+    """
+    rows = [(key, value[0], value[1], value[2], json.dumps(value[3]))
+            for key, value in cache.items() if value[2] >= since]
+    with closing(sqlite3.connect(path)) as connection:
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS scan_cache (path TEXT PRIMARY KEY, mtime_ns INTEGER, '
+                               'inode INTEGER, last_used REAL, entries TEXT)')
+            connection.executemany('INSERT OR REPLACE INTO scan_cache VALUES (?, ?, ?, ?, ?)', rows)
+            connection.execute('DELETE FROM scan_cache WHERE path NOT IN '
+                               '(SELECT path FROM scan_cache ORDER BY last_used DESC LIMIT ?)', (max_entries,))
+
+
+def save_shard_listing(path, df_shares, df_info, shard, incomplete):
+    """Save the share inventory made by one shard, to combine with the other shards using read_shard_listings()
+
+    The listing is JSON compressed with gzip, with the shard, the number of shards, a hash of the share information,
+    the incomplete shares, and the folders for each share in this shard.
+
+    @param
+    path (string): path to save the listing
+    df_shares (pandas dataframe): contents of the shares in this shard, from make_shares_inventory()
+    df_info (pandas dataframe): data from the shares information csv
+    shard (tuple): the shard number and number of shards
+    incomplete (list): names of the shares that are incomplete in this shard
+
+    @return
+    None
+    """
+    folders = {share_name: [] for share_name in df_shares['Share'].cat.categories}
+    for share_name, share_folders in df_shares.groupby('Share', observed=True, sort=False)['Folder']:
+        folders[share_name] = share_folders.tolist()
+    listing = {'shard': shard[0], 'shards': shard[1], 'share_information': share_info_hash(df_info),
+               'created': datetime.datetime.now().isoformat(timespec='seconds'), 'incomplete': list(incomplete),
+               'folders': folders}
+    with gzip.open(path, 'wt', encoding='utf-8') as listing_file:
+        json.dump(listing, listing_file)
+
+
+def shard_number(name, shards):
+    """Assign a name to a shard, which is the same on every computer and every run
+
+    @param
+    name (string): share name, or the name of a top level item in a share that is split across the shards
+    shards (int): the number of shards
+
+    @return
+    number (int): the shard number, from 1 to shards
+    """
+    return int(hashlib.sha1(name.encode('utf-8')).hexdigest()[:8], 16) % shards + 1
+
+
+def share_info_hash(df_info):
+    """Make a hash of the share information, to check that every shard was made with the same share information
+
+    The share paths are not included, since they can be different on each computer that scans a shard.
+
+    @param
+    df_info (pandas dataframe): data from the shares information csv
+
+    @return
+    info_hash (string): hexadecimal SHA-256 hash of the share information other than the paths
+    """
+    columns = [column for column in df_info.columns if column != 'path']
+    rows = df_info[columns].astype(object).where(df_info[columns].notna(), '').astype(str).values.tolist()
+    return hashlib.sha256(json.dumps([columns] + rows).encode('utf-8')).hexdigest()
+
+
+def share_rows(share, listings, rules=None):
+    """Apply the share pattern to the directory contents read so far
+
+    Items that are ignored by the rules are skipped before the pattern is applied,
+    so ignored folders are never read and nothing in them is included.
+
+    @param
+    share (named tuple): one row from the shares information dataframe
+    listings (dict): keys are directory paths and values are the list of (name, is_dir) from list_directory()
+    rules (IgnoreRules, None): items to ignore, or None to include every item
+
+    @return
+    folders (list): the folders (or files) from this share to include in the share inventory
+    missing (list): paths of directories that need to be read before the folders for this share are complete
+    """
+    folders = []
+    missing = []
+
+    def contents(path):
+        return listings[path] if rules is None else rules.filter(share.name, listings[path])
+
+    # Shares where the inventory just has the share name.
+    if share.pattern == 'share':
+        folders.append(share.name)
+
+    # Shares where the inventory is just the top level folders and files.
+    elif share.pattern == 'top':
+        if share.path not in listings:
+            missing.append(share.path)
+            return folders, missing
+        for item, _ in contents(share.path):
+            folders.append(item)
+
+    # Shares where the inventory includes second level folders for any top level folder in the folders list,
+    # which is a pipe-separated string in df_shares, and just the top level folder for any other folder.
+    # Only folders in the folders list are read, so each other top level folder is included once,
+    # even if it is empty or only has files.
+    # Files are not included.
+    elif share.pattern == 'second':
+        if share.path not in listings:
+            missing.append(share.path)
+            return folders, missing
+        folders_list = share.folders.split('|') if isinstance(share.folders, str) else []
+        for item, is_dir in contents(share.path):
+            # Continue navigation if item is a directory in the folders list and stop if it is a file.
+            if not is_dir:
+                continue
+            if item not in folders_list:
+                folders.append(item)
+                continue
+            item_path = os.path.join(share.path, item)
+            if item_path not in listings:
+                missing.append(item_path)
+                continue
+            for second_item, second_is_dir in contents(item_path):
+                if not second_is_dir:
+                    continue
+                # In born-digital folders, go to the third (collection) level in backlogged and closed:
+                if item.lower() == 'born-digital' and second_item in ('backlogged', 'closed'):
+                    second_path = os.path.join(item_path, second_item)
+                    if second_path not in listings:
+                        missing.append(second_path)
+                        continue
+                    for third_item, third_is_dir in contents(second_path):
+                        if third_is_dir:
+                            folders.append(f'{item}\\{second_item}\\{third_item}')
+                else:
+                    folders.append(f'{item}\\{second_item}')
+
+    return folders, missing
+
+
+def share_server(path):
+    """Find the server for a share path, to limit how many directories are read from one server at the same time
+
+    Paths without a server name or drive, like a share mounted on Linux or Mac, are grouped by the device
+    they are on, which is different for each mount point. This needs a stat of the path.
+
+    @param
+    path (string): path to the share
+
+    @return
+    server (string, int): the server name from a UNC path (\\\\server\\share), the drive from a Windows path,
+                          otherwise the device number, or the path if it cannot be read
+    """
+    drive = ntpath.splitdrive(path)[0]
+    if drive.startswith('\\\\') or drive.startswith('//'):
+        return drive[2:].replace('/', '\\').split('\\')[0].lower()
+    if drive:
+        return drive.lower()
+    try:
+        return os.stat(path).st_dev
+    except OSError:
+        return path
+
+
+def share_shard(share, shards):
+    """Find the shard for a share, from the optional shard column in the share information
 
-    # Removes the rows that describe each column
-    # by keeping all rows except ones with the description in the first column.
-    df_inventory = df_inventory[df_inventory['Share (required)'] != 'Name of the Hub share.']
+    The shard column can have a shard number, to read the share from the computer for that shard,
+    or split, to divide the top level items of a large share across every shard (see shard_number()).
+    If the column is blank or not included, the shard is assigned from the share name.
+    Shares with the share pattern are never split, since they are not read.
 
-    # Removes the rows of content that has been deleted
-    # by keeping rows without information in the deleted date column.
-    # Then it removes that column, which only has blanks remaining.
-    df_inventory = df_inventory[df_inventory['Deleted (date) (optional)'].isnull()]
-    df_inventory = df_inventory.drop(['Deleted (date) (optional)'], axis=1)
+    @param
+    share (named tuple): one row from the shares information dataframe
+    shards (int): the number of shards
 
-    # Removes blank rows.
-    df_inventory = df_inventory.dropna(how='all')
+    @return
+    number (int): the shard number, from 1 to shards, or 0 if the share is split across every shard
+    """
+    # Blanks are NaN from pandas or an empty string from the csv module (see check_shares()).
+    value = getattr(share, 'shard', None)
+    if isinstance(value, str) and value.strip().lower() == 'split':
+        return 0 if share.pattern != 'share' else shard_number(share.name, shards)
+    if value is not None and value == value and value != '':
+        try:
+            number = int(float(value))
+        except ValueError:
+            number = 0
+        if 0 < number <= shards:
+            return number
+        print('Error: config has an unexpected shard', value)
+    return shard_number(share.name, shards)
+
+
+def suggest_matches(df_inventory, threshold=0.5):
+    """Suggest the most likely match for folders that are only in the inventory or only in the share
+
+    For each share, every "Not in share" row is compared to the "Not in inventory" rows, and the reverse,
+    using the trigrams (three character sequences) of the normalized folder names (see normalize_folder()).
+    Candidates are found with an index from trigram to folder, skipping trigrams that are in too many folders
+    to be useful, so each folder is only compared to the folders it has uncommon trigrams in common with.
 
-    # Simplifies column names.
-    df_inventory = df_inventory.rename({'Share (required)': 'Share',
-                    'Folder Name (required if not share)': 'Folder',
-                    'Use Policy Category (required)': 'Use',
-                    'Person Responsible (required)': 'Responsible',
-                    'Date to review for deletion (required)': 'Review_Date',
-                    'Additional information (optional)': 'Notes'}, axis=1)
+    @param
+    df_inventory (pandas dataframe): data from inventory after check_inventory()
+    threshold (float): the lowest similarity (Dice coefficient of the trigrams, 0 to 1) to suggest a match
 
-    # Adds new columns for recording errors found during the audit, one for each error type.
-    # Initial values are TBD, so they can be updated with the results later without a dtype FutureWarning
-    df_inventory['Audit_Dates'] = 'TBD'
-    df_inventory['Audit_Inventory'] = 'TBD'
-    df_inventory['Audit_Required'] = 'TBD'
+    @return
+    df_inventory (pandas dataframe): data from inventory with a Suggested_Match column,
+    which has the folder name of the suggested match or is blank
+    """
+    df_inventory['Suggested_Match'] = np.nan
+    df_inventory['Suggested_Match'] = df_inventory['Suggested_Match'].astype(object)
+
+    def trigrams(folder):
+        padded = f' {normalize_folder(folder)} '
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def best_matches(queries, candidates):
+        # Makes the index of trigrams for the candidates.
+        candidate_grams = [trigrams(folder) for folder in candidates]
+        index = {}
+        for position, grams in enumerate(candidate_grams):
+            for gram in grams:
+                index.setdefault(gram, []).append(position)
+        common = max(100, int(len(candidates) ** 0.5))
+
+        # Finds the candidates that share the most uncommon trigrams with each query
+        # and suggests the one with the highest similarity, if it is at least the threshold.
+        matches = []
+        for folder in queries:
+            grams = trigrams(folder)
+            shared = Counter()
+            for gram in grams:
+                positions = index.get(gram, ())
+                if len(positions) <= common:
+                    shared.update(positions)
+            best_score, best_folder = threshold, np.nan
+            for position, _ in shared.most_common(20):
+                score = 2 * len(grams & candidate_grams[position]) / (len(grams) + len(candidate_grams[position]))
+                if score >= best_score:
+                    best_score, best_folder = score, candidates[position]
+            matches.append(best_folder)
+        return matches
+
+    # Compares the unmatched rows within each share, in both directions.
+    has_key = df_inventory['Share'].notna() & df_inventory['Folder'].notna()
+    not_share = df_inventory[has_key & (df_inventory['Audit_Inventory'] == 'Not in share')]
+    not_inventory = df_inventory[has_key & (df_inventory['Audit_Inventory'] == 'Not in inventory')]
+    not_inventory_groups = dict(list(not_inventory.groupby('Share', observed=True)['Folder']))
+    for share_name, inventory_folders in not_share.groupby('Share', observed=True)['Folder']:
+        share_folders = not_inventory_groups.get(share_name)
+        if share_folders is None:
+            continue
+        inventory_list = [str(folder) for folder in inventory_folders]
+        share_list = [str(folder) for folder in share_folders]
+        df_inventory.loc[inventory_folders.index, 'Suggested_Match'] = best_matches(inventory_list, share_list)
+        df_inventory.loc[share_folders.index, 'Suggested_Match'] = best_matches(share_list, inventory_list)
 
     return df_inventory
 
 
-if __name__ == '__main__':
+def write_csv(df_inventory, path, chunk_rows=50000):
+    """Save the audit results to a CSV, a chunk of rows at a time
 
-    # Path to the Hub inventory and shares information csv (from the script arguments).
-    # If either argument is missing or not a valid path, exits the script.
-    inventory_path, shares_info_path, error_list = check_arguments(sys.argv)
-    if len(error_list) > 0:
-        for error in error_list:
-            print(error)
-        sys.exit(1)
+    @param
+    df_inventory (pandas dataframe): data from inventory after all the checks
+    path (string): path to save the CSV
+    chunk_rows (int): the number of rows converted to text at a time, which limits the memory needed
+
+    @return
+    None
+    """
+    df_inventory.to_csv(path, index=False, chunksize=chunk_rows)
+
+
+def write_outputs(df_inventory, path, formats='csv', sheets='share'):
+    """Save the audit results in each of the output formats
+
+    @param
+    df_inventory (pandas dataframe): data from inventory after all the checks
+    path (string): path for the results without the file extension, which is added for each format
+    formats (string): comma-separated output formats, from OUTPUT_FORMATS
+    sheets (string): share or responsible, for the sheets in the XLSX output
+
+    @return
+    paths (list): paths to the files that were saved
+    """
+    paths = []
+    for output_format in formats.split(','):
+        output_path = path + OUTPUT_FORMATS[output_format]
+        if output_format == 'csv':
+            write_csv(df_inventory, output_path)
+        elif output_format == 'parquet':
+            write_parquet(df_inventory, output_path)
+        else:
+            write_xlsx(df_inventory, output_path, sheets)
+        paths.append(output_path)
+    return paths
+
+
+def write_parquet(df_inventory, path, chunk_rows=50000):
+    """Save the audit results to a Parquet file, one row group of chunk_rows at a time
+
+    Columns with a mix of types, like Review_Date with dates and text, are saved as text, the same as in the CSV.
+    Categorical columns are saved with dictionary encoding. pyarrow must be installed.
+    The schema is made from the column types of the whole dataframe before any rows are written,
+    so a text column that is blank in the first row group still has the same type as in the later row groups.
+
+    @param
+    df_inventory (pandas dataframe): data from inventory after all the checks
+    path (string): path to save the Parquet file
+    chunk_rows (int): the number of rows in each row group, which limits the memory needed
+
+    @return
+    None
+    """
+    text_columns = [column for column in df_inventory.columns
+                    if df_inventory[column].dtype == object or isinstance(df_inventory[column].dtype, pd.StringDtype)]
+    schema = pa.Schema.from_pandas(df_inventory.iloc[:0], preserve_index=False)
+    for column in text_columns:
+        schema = schema.set(schema.get_field_index(column), pa.field(column, pa.string()))
+
+    with pa.parquet.ParquetWriter(path, schema) as writer:
+        for start in range(0, max(len(df_inventory.index), 1), chunk_rows):
+            df_chunk = df_inventory.iloc[start:start + chunk_rows].copy()
+            for column in text_columns:
+                if df_chunk[column].dtype == object:
+                    df_chunk[column] = df_chunk[column].map(lambda value: None if pd.isna(value) else str(value))
+            writer.write_table(pa.Table.from_pandas(df_chunk, schema=schema, preserve_index=False))
+
+
+def write_split(df_inventory, folder, split='responsible,share', workers=1):
+    """Save the rows that need action for each person responsible or share to their own CSV, with a summary index
+
+    A row needs action if any Audit column is not Correct. The rows that need action are found once and grouped once
+    for each split column, and each group is written from its positions in those rows, using workers threads.
+    The index (index.csv) has a row for every person responsible and share, including those with nothing to do,
+    with the number of rows for each audit result that needs action and the file with their rows.
+    The folder for each split column is replaced, so there are no files left from an earlier run.
 
-    # Reads the inventory, a multiple sheet Excel spreadsheet, into one pandas dataframe, with cleanup.
-    inventory_df = read_inventory(inventory_path)
+    @param
+    df_inventory (pandas dataframe): data from inventory after all the checks
+    folder (string): path to the folder to save the CSVs in, which is made if it does not exist
+    split (string): comma-separated columns to split by, from SPLIT_COLUMNS
+    workers (int): the number of CSVs to write at the same time
 
-    # Reads the share information into a dataframe.
-    shares_info_df = pd.read_csv(shares_info_path)
+    @return
+    paths (list): paths to the index and every CSV that was saved
+    """
+    # Finds the rows with each audit result that needs action, which is any result other than TBD and Correct.
+    action_columns = {}
+    for column, values in AUDIT_VALUES.items():
+        for value in values[2:]:
+            action_columns[value] = df_inventory[column].isin([value]).to_numpy()
+    needs_action = np.logical_or.reduce(list(action_columns.values()))
+    df_action = df_inventory[needs_action]
+
+    # Makes the summary for each split column and the list of files to save, named from each group.
+    # Blanks are (blank), characters that cannot be in file names are replaced with _,
+    # and names Windows reserves for devices have _ added before any dot, so the CSVs can be saved on Windows.
+    # If names are the same once changed, or only differ by case, a number is added to the end.
+    summaries = []
+    writes = []
+    for name in split.split(','):
+        column = SPLIT_COLUMNS[name]
+        split_folder = os.path.join(folder, name)
+        shutil.rmtree(split_folder, ignore_errors=True)
+        os.makedirs(split_folder)
+        group_keys = df_inventory[column].astype(object).where(df_inventory[column].notna(), '(blank)').astype(str)
+        df_summary = pd.DataFrame(dict(Rows=needs_action, **action_columns)).groupby(group_keys.to_numpy()).sum()
+        df_summary.insert(0, 'File', '')
+        action_keys = group_keys[needs_action].to_numpy()
+        used_names = set()
+        for group_name, positions in pd.Series(action_keys).groupby(action_keys).indices.items():
+            base_name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', str(group_name)).rstrip(' .') or '_'
+            stem, dot, extension = base_name.partition('.')
+            if stem.rstrip(' ').upper() in WINDOWS_RESERVED_NAMES:
+                base_name = f'{stem}_{dot}{extension}'
+            file_name = base_name
+            number = 1
+            while f'{file_name}.csv'.lower() in used_names:
+                number += 1
+                file_name = f'{base_name}_{number}'
+            used_names.add(f'{file_name}.csv'.lower())
+            df_summary.loc[group_name, 'File'] = os.path.join(name, f'{file_name}.csv')
+            writes.append((positions, os.path.join(split_folder, f'{file_name}.csv')))
+        summaries.append(df_summary.rename_axis('Name').reset_index().assign(Split=name))
+
+    # Saves the CSVs at the same time, then the index.
+    def write_group(write):
+        df_action.iloc[write[0]].to_csv(write[1], index=False)
+        return write[1]
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        paths = list(executor.map(write_group, writes))
+    index_path = os.path.join(folder, 'index.csv')
+    df_index = pd.concat(summaries, ignore_index=True)
+    df_index[['Split', 'Name', 'File', 'Rows'] + list(action_columns)].to_csv(index_path, index=False)
+    return [index_path] + paths
+
+
+def write_xlsx(df_inventory, path, sheets='share'):
+    """Save the audit results to an Excel spreadsheet, with one sheet for each share or person responsible
+
+    The spreadsheet is written in write-only mode, one row at a time, so a large inventory does not need to be kept
+    in memory twice. Audit cells that are not Correct are filled with a color (see AUDIT_FILLS).
 
-    # Makes a dataframe with the folders in the shares, based on patterns in shares_info_df.
-    shares_df = make_shares_inventory(shares_info_df)
+    @param
+    df_inventory (pandas dataframe): data from inventory after all the checks
+    path (string): path to save the spreadsheet
+    sheets (string): share for one sheet per share, or responsible for one sheet per person responsible
 
-    # Prints the number of rows in the inventory for the audit results spreadsheet.
-    print("Rows in the inventory (after cleanup):", len(inventory_df.index))
+    @return
+    None
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    audit_positions = [position for position, column in enumerate(df_inventory.columns) if column.startswith('Audit_')]
+    fills = {value: openpyxl.styles.PatternFill('solid', start_color=color) for value, color in AUDIT_FILLS.items()}
+    sheet_names = set()
+
+    # Finds the rows for each sheet, which are positions in the dataframe, in the same order as the dataframe.
+    group_column = 'Share' if sheets == 'share' else 'Responsible'
+    groups = df_inventory.groupby(group_column, sort=True, dropna=False, observed=True).indices
+    for group_name, positions in groups.items():
+
+        # Sheet names can have at most 31 characters, cannot have some characters, and must be unique.
+        base_name = re.sub(r'[\\/*?:\[\]]', '_', '(blank)' if pd.isna(group_name) else str(group_name))[:31]
+        sheet_name = base_name
+        number = 1
+        while sheet_name.lower() in sheet_names:
+            number += 1
+            sheet_name = f'{base_name[:27]}_{number}'
+        sheet_names.add(sheet_name.lower())
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(df_inventory.columns.tolist())
+
+        # Blanks are empty cells, and numpy booleans (from Modified_After_Review) are changed to Python booleans,
+        # since openpyxl saves numpy booleans as numbers.
+        for row in df_inventory.iloc[positions].itertuples(index=False, name=None):
+            cells = [None if value is pd.NA or value is pd.NaT or (isinstance(value, float) and np.isnan(value))
+                     else bool(value) if isinstance(value, np.bool_) else value for value in row]
+            for position in audit_positions:
+                if cells[position] not in (None, 'Correct'):
+                    cell = openpyxl.cell.WriteOnlyCell(sheet, value=cells[position])
+                    cell.fill = fills.get(cells[position], fills['default'])
+                    cells[position] = cell
+            sheet.append(cells)
+
+    # A spreadsheet must have at least one sheet.
+    if len(sheet_names) == 0:
+        workbook.create_sheet('Audit').append(df_inventory.columns.tolist())
+    workbook.save(path)
 
-    # Checks for blank cells in required columns.
-    inventory_df = check_required(inventory_df)
 
-    # Checks for dates to review for deletion that are expired or need manual review.
-    inventory_df = check_dates(inventory_df)
+if __name__ == '__main__':
 
-    # Checks for mismatches between the inventory and Hub shares.
-    inventory_df = check_inventory(inventory_df, shares_df)
+    # If the first argument is query, answers a question with the audit history instead of running the audit.
+    # The answer is printed as CSV.
+    if len(sys.argv) > 1 and sys.argv[1] == 'query':
+        history_path, question_name, question_args, error_list = check_query_arguments(sys.argv)
+        if len(error_list) > 0:
+            for error in error_list:
+                print(error)
+            sys.exit(1)
+        answer_columns, answer_rows = query_history(history_path, question_name, question_args)
+        csv_writer = csv.writer(sys.stdout, lineterminator='\n')
+        csv_writer.writerow(answer_columns)
+        csv_writer.writerows(answer_rows)
+        sys.exit(0)
+
+    # Path to the Hub inventory and shares information csv and any optional arguments (from the script arguments).
+    # If either required argument is missing or not a valid path, or an option is not valid, exits the script.
+    # Also checks that the share information can be read, every share that is read can be reached,
+    # and the rules CSV is valid, all before pandas is imported, and reports every problem at once.
+    # If timeout is used, shares that do not respond are a warning, since the audit can finish without them.
+    # If preflight is used, exits the script after the checks.
+    required_args, options_dict, option_errors = check_options(sys.argv)
+    inventory_path, shares_info_path, error_list = check_arguments(required_args)
+    error_list = option_errors + error_list
+    shard_tuple = tuple(int(number) for number in options_dict['shard'].split('/')) if options_dict['shard'] else None
+    warning_list = [] if options_dict['timeout'] else None
+    if len(error_list) == 0:
+        error_list = check_shares(shares_info_path, check_paths=not (options_dict['manifest'] or options_dict['merge']),
+                                  shard=shard_tuple, warnings=warning_list)
+        if options_dict['rules']:
+            error_list.extend(read_ignore_rules(options_dict['rules'])[1])
+    if len(error_list) > 0:
+        for error in error_list:
+            print(error)
+        sys.exit(1)
+    for warning in warning_list or []:
+        print(f'Warning: {warning}')
+    if options_dict['preflight']:
+        print('Ready to run the audit')
+        sys.exit(0)
+
+    # Imports the libraries for the audit, now that the arguments and shares are known to be correct.
+    import_dependencies()
+
+    # If profile is used, the time and memory for each stage and the scan stats for each share are recorded,
+    # and saved to a JSON file next to the audit CSV at the end.
+    profile_dict = None
+    if options_dict['profile']:
+        profile_dict = {'options': options_dict, 'stages': {}, 'shares': {}}
+
+    # Runs the audit (see run_audit()), with the audit history in the same folder as the inventory unless no history
+    # is used, and the caches in the same folder as the inventory if cache is used.
+    # The results are saved for additional manual review, as a CSV unless other formats are chosen with format.
+    # If a shard listing is missing or was made with different share information for merge, exits the script.
+    inventory_folder = os.path.dirname(inventory_path)
+    output_path = os.path.join(inventory_folder,
+                               f"digital_production_hub_audit_{datetime.date.today().strftime('%Y-%m')}")
+    csv_path = output_path + '.csv'
+    audit_start = time.time()
+    cache_folder = inventory_folder if options_dict['cache'] else None
+    history_path = None if options_dict['no_history'] else os.path.join(inventory_folder, 'hub_audit_history.db')
+    audit_result = run_audit(inventory_path, shares_info_path, cache=cache_folder, outputs=output_path,
+                             history=history_path, options=options_dict, profile=profile_dict)
+    if len(audit_result.errors) > 0:
+        for error in audit_result.errors:
+            print(error)
+        sys.exit(1)
 
-    # Saves the inventory to a CSV for additional manual review.
-    csv_path = os.path.join(os.path.dirname(inventory_path),
-                            f"digital_production_hub_audit_{datetime.date.today().strftime('%Y-%m')}.csv")
-    inventory_df.to_csv(csv_path, index=False)
+    # Prints any shares that were not completely read, because of the timeout, manifest, or a shard.
+    for share_name in audit_result.incomplete:
+        if options_dict['merge']:
+            print(f'Scan incomplete for share {share_name} in a shard listing')
+        elif options_dict['manifest']:
+            print(f'Scan incomplete for share {share_name}, which is not completely in the manifest')
+        else:
+            print(f'Scan incomplete for share {share_name} after {options_dict["timeout"]} seconds')
+
+    # If shard is used, saves the shares read by this shard in the same folder as the inventory
+    # and exits the script, since the audit is done after merging every shard.
+    # If profile is used, the profile is saved first, with the same name as the shard listing.
+    if shard_tuple is not None:
+        listing_path = os.path.join(inventory_folder, f'hub_audit_shard_{shard_tuple[0]}_of_{shard_tuple[1]}.json.gz')
+        save_shard_listing(listing_path, audit_result.shares, audit_result.share_information, shard_tuple,
+                           audit_result.incomplete)
+        print(f"Shard {shard_tuple[0]} of {shard_tuple[1]} saved to {listing_path}:", len(audit_result.shares.index),
+              "folders")
+        if profile_dict is not None:
+            save_profile(listing_path.replace('.json.gz', '_profile.json'), profile_dict)
+        sys.exit(0)
+
+    # Prints the number of rows in the inventory for the audit results spreadsheet,
+    # any keys (share and folder) in the inventory or the shares more than once,
+    # and the number of rows that changed since the previous audit, if previous is used.
+    print("Rows in the inventory (after cleanup):", audit_result.inventory_rows)
+    for share_name, folder_name in audit_result.duplicates['inventory']:
+        print(f'Duplicate folder in inventory {share_name}: {folder_name}')
+    for share_name, folder_name in audit_result.duplicates['shares']:
+        print(f'Duplicate folder in share {share_name}: {folder_name}')
+    if audit_result.changes is not None:
+        print("Rows changed since the previous audit:", len(audit_result.changes.index))
+
+    # If watch is used, keeps running and audits again when Enter is pressed, or every interval seconds if provided,
+    # using the scan cache kept current by ShareWatcher, so only directories that changed are read again.
+    # The inventory is read again, which uses the inventory cache if cache is used and it has not changed.
+    # Metrics, the audit history, and the changes since the previous audit are only made by the first audit.
+    if options_dict['watch']:
+        live_cache = {path: cached for path, cached in audit_result.cache.items() if cached[2] >= audit_start}
+        watcher = ShareWatcher(live_cache)
+        command_queue = queue.Queue()
+        threading.Thread(target=read_commands, args=(sys.stdin, command_queue), daemon=True).start()
+        print('Watching the shares. Press Enter to audit again, or type q and press Enter to stop.')
+        next_audit = time.monotonic() + options_dict['interval'] if options_dict['interval'] else None
+        watch_options = dict(options_dict, metrics=False, previous='')
+        changed_count = 0
+        try:
+            while True:
+                try:
+                    command = command_queue.get(timeout=1)
+                except queue.Empty:
+                    command = None
+                changed_count += len(watcher.update())
+                if command == 'stop' or (command == 'end' and next_audit is None):
+                    break
+                if command != 'audit' and (next_audit is None or time.monotonic() < next_audit):
+                    continue
+                watch_start = time.perf_counter()
+                inventory_df = read_inventory(inventory_path, cache_dir=None if cache_folder is None else
+                                              os.path.join(cache_folder, 'hub_audit_inventory_cache'))
+                run_audit(inventory_df, audit_result.share_information, cache=live_cache, outputs=output_path,
+                          options=watch_options, trust_cache=True)
+                print(f'{datetime.datetime.now():%Y-%m-%d %H:%M:%S} audited again in '
+                      f'{time.perf_counter() - watch_start:.2f} seconds, with {changed_count} changed directories')
+                changed_count = 0
+                if next_audit is not None:
+                    next_audit = time.monotonic() + options_dict['interval']
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+            if cache_folder is not None:
+                audit_result.cache.update(live_cache)
+                save_scan_cache(os.path.join(cache_folder, 'hub_audit_scan_cache.db'), audit_result.cache,
+                                options_dict['cache_size'], audit_start)
+
+    # Saves the profile, with the same name as the CSV.
+    if profile_dict is not None:
+        save_profile(csv_path.replace('.csv', '_profile.json'), profile_dict)
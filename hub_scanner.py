@@ -0,0 +1,158 @@
+"""
+Makes a manifest of the contents of every share, to use with hub_audit.py --manifest instead of reading the shares.
+Run this on the file server (or any computer that can read the shares quickly), then copy the manifest
+to the computer running the audit. It only uses the Python standard library.
+Required arguments: path to the CSV with share information, with paths as they are on this computer,
+and path to save the manifest. The manifest is compressed if the path ends with .gz,
+and is JSON lines instead of tab-separated if the path includes .jsonl.
+"""
+import csv
+import gzip
+import json
+import os
+import sys
+
+# Levels of folders to include for each share pattern, which is enough for the pattern rules in hub_audit.py.
+# For the second pattern, only the folders that hub_audit.py reads are included below the top level (see read_folder()).
+PATTERN_DEPTH = {'share': 0, 'top': 1, 'second': 3}
+
+
+def check_arguments(arg_list):
+    """Check if the required arguments are present and valid
+
+    @param
+    arg_list (list): the contents of sys.argv after the script is run
+
+    @return
+    share_info (string, None): string with the path to the share information, or None if error
+    manifest (string, None): string with the path to save the manifest, or None if error
+    errors (list): list with error messages, which is empty if there are no errors
+    """
+    share_info = None
+    manifest = None
+    errors = []
+
+    if len(arg_list) != 3:
+        errors.append('Should have two arguments, share information and manifest')
+    else:
+        if os.path.exists(arg_list[1]):
+            share_info = arg_list[1]
+        else:
+            errors.append(f'Provided share information "{arg_list[1]}" does not exist')
+        if os.path.exists(arg_list[2]):
+            errors.append(f'Provided manifest "{arg_list[2]}" already exists')
+        else:
+            manifest = arg_list[2]
+
+    return share_info, manifest, errors
+
+
+def format_line(share_name, item_type, item_path, is_json):
+    """Format one manifest line, which is tab-separated or a JSON object
+
+    @param
+    share_name (string): name of the share
+    item_type (string): d for a folder or share and f for a file
+    item_path (string): path within the share, using / between folders, which is blank for the share itself
+    is_json (bool): True for a JSON object
+
+    @return
+    line (string): the line for the manifest, including the newline
+    """
+    if is_json:
+        return json.dumps({'share': share_name, 'type': item_type, 'path': item_path}) + '\n'
+    if any(character in f'{share_name}{item_path}' for character in '\t\r\n'):
+        raise ValueError(f'Cannot save "{item_path}" in share {share_name} in a tab-separated manifest, use .jsonl')
+    return f'{share_name}\t{item_type}\t{item_path}\n'
+
+
+def read_folder(item_path, folders):
+    """Check if the contents of a folder are needed for the second pattern in hub_audit.py
+
+    Only top level folders in the folders list are read, and within a born-digital folder in the list,
+    only the backlogged and closed folders, which is the same as share_rows() in hub_audit.py.
+
+    @param
+    item_path (string): path within the share, using / between folders
+    folders (list): the folders list for the share, from the share information CSV
+
+    @return
+    is_needed (bool): True if the contents of the folder are needed
+    """
+    parts = item_path.split('/')
+    if len(parts) == 1:
+        return parts[0] in folders
+    return len(parts) == 2 and parts[0].lower() == 'born-digital' and parts[1] in ('backlogged', 'closed')
+
+
+def scan_share(manifest_file, share_name, share_path, depth, is_json, folders=None):
+    """Add the share and its contents, to the given depth, to the manifest
+
+    @param
+    manifest_file (file): manifest open for writing text
+    share_name (string): name of the share
+    share_path (string): path to the share on this computer
+    depth (int): the levels of folders to include
+    is_json (bool): True to save the lines as JSON objects
+    folders (list, None): the folders list for a share with the second pattern, to only include the contents of
+                          the folders hub_audit.py reads (see read_folder()), or None to include every folder
+
+    @return
+    count (int): the number of lines added to the manifest
+    """
+    manifest_file.write(format_line(share_name, 'd', '', is_json))
+    count = 1
+    directories = [('', share_path, depth)]
+    while directories:
+        item_path, path, levels = directories.pop()
+        if levels == 0:
+            continue
+        with os.scandir(path) as directory:
+            for entry in directory:
+                entry_path = f'{item_path}/{entry.name}' if item_path else entry.name
+                is_dir = entry.is_dir()
+                manifest_file.write(format_line(share_name, 'd' if is_dir else 'f', entry_path, is_json))
+                count += 1
+                if is_dir and (folders is None or read_folder(entry_path, folders)):
+                    directories.append((entry_path, entry.path, levels - 1))
+    return count
+
+
+def write_manifest(share_info, manifest):
+    """Make a manifest of every share in the share information CSV
+
+    @param
+    share_info (string): path to the CSV with share information
+    manifest (string): path to save the manifest
+
+    @return
+    count (int): the number of lines in the manifest
+    """
+    is_json = '.jsonl' in os.path.basename(manifest)
+    opener = gzip.open if manifest.endswith('.gz') else open
+    count = 0
+    with open(share_info, newline='', encoding='utf-8-sig') as share_file:
+        with opener(manifest, 'wt', encoding='utf-8', newline='') as manifest_file:
+            for share in csv.DictReader(share_file):
+                if share['pattern'] not in PATTERN_DEPTH:
+                    print('Error: config has an unexpected pattern', share['pattern'])
+                    continue
+                folders = (share.get('folders') or '').split('|') if share['pattern'] == 'second' else None
+                count += scan_share(manifest_file, share['name'], share['path'], PATTERN_DEPTH[share['pattern']],
+                                    is_json, folders)
+    return count
+
+
+if __name__ == '__main__':
+
+    # Paths to the share information csv and the manifest (from the script arguments).
+    # If either argument is missing or not valid, exits the script.
+    shares_info_path, manifest_path, error_list = check_arguments(sys.argv)
+    if len(error_list) > 0:
+        for error in error_list:
+            print(error)
+        sys.exit(1)
+
+    # Makes the manifest and prints the number of items in it.
+    line_count = write_manifest(shares_info_path, manifest_path)
+    print("Items in the manifest:", line_count)
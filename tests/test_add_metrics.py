@@ -0,0 +1,99 @@
+"""
+Tests for the function add_metrics(), which adds the size, number of files, and newest modification time
+of each folder in the shares, and folder_metrics(), which walks one folder.
+"""
+from datetime import datetime
+import os
+import pandas as pd
+import tempfile
+import unittest
+from hub_audit import add_metrics, folder_metrics, read_metrics_cache, save_metrics_cache
+
+
+def make_file(path, text, modified):
+    """Make a file with the text and modification time (a datetime)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(text)
+    os.utime(path, (modified.timestamp(), modified.timestamp()))
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Temporary share with a top folder that has a subfolder, which is deleted after each test
+        Folder modification times are set to earlier than the files, so the newest time is from a file"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.share = os.path.join(self.temp_dir.name, 'share')
+        make_file(os.path.join(self.share, 'folder', 'one.txt'), 'one', datetime(2020, 1, 1))
+        make_file(os.path.join(self.share, 'folder', 'sub', 'two.txt'), 'two two', datetime(2022, 6, 1))
+        make_file(os.path.join(self.share, 'file.txt'), 'file', datetime(2019, 1, 1))
+        for folder in (os.path.join(self.share, 'folder', 'sub'), os.path.join(self.share, 'folder')):
+            os.utime(folder, (datetime(2018, 1, 1).timestamp(), datetime(2018, 1, 1).timestamp()))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_add_metrics(self):
+        """Test for a folder, a file, a folder not in the share, and an expired folder modified after review"""
+        # Makes variables for function input and runs the function being tested.
+        inventory_df = pd.DataFrame([['share', 'folder', datetime(2021, 1, 1), 'Expired', 'Correct'],
+                                     ['share', 'file.txt', datetime(2021, 1, 1), 'Expired', 'Correct'],
+                                     ['share', 'missing', 'permanent', 'Correct', 'Not in share']],
+                                    columns=['Share', 'Folder', 'Review_Date', 'Audit_Dates', 'Audit_Inventory'])
+        shares_info_df = pd.DataFrame([['share', self.share, 'top', None]],
+                                      columns=['name', 'path', 'pattern', 'folders'])
+        inventory_df = add_metrics(inventory_df, shares_info_df, workers=2)
+
+        # Tests if the new columns have the expected values.
+        result = inventory_df[['Size_Bytes', 'File_Count', 'Last_Modified', 'Modified_After_Review']]
+        result = result.astype(object).where(result.notna(), 'BLANK').values.tolist()
+        expected = [[10, 2, datetime(2022, 6, 1), True],
+                    [4, 1, datetime(2019, 1, 1), False],
+                    ['BLANK', 'BLANK', 'BLANK', 'BLANK']]
+        self.assertEqual(result, expected, "Problem with test for add metrics")
+        self.assertEqual(str(inventory_df['Modified_After_Review'].dtype), 'boolean',
+                         "Problem with test for add metrics, Modified_After_Review type")
+
+    def test_cache(self):
+        """Test for using the metrics cache after it is saved and read, when one subfolder has changed
+        and a file in the other folder was changed in place, which does not change the folder modification time"""
+        # Walks the folder to make the cache, then saves and reads it.
+        folder = os.path.join(self.share, 'folder')
+        cache = {}
+        first = folder_metrics(folder, cache)
+        cache_path = os.path.join(self.temp_dir.name, 'hub_audit_metrics_cache.db')
+        save_metrics_cache(cache_path, cache, 100, 0)
+        cache = read_metrics_cache(cache_path)
+
+        # Adds a file to the subfolder, changes a file in the folder, and walks the folder again with the cache.
+        # The folder modification time is set back, as it is when a file is changed in place.
+        make_file(os.path.join(folder, 'sub', 'three.txt'), 'three', datetime(2023, 1, 1))
+        make_file(os.path.join(folder, 'one.txt'), 'one one', datetime(2024, 1, 1))
+        os.utime(folder, (datetime(2018, 1, 1).timestamp(), datetime(2018, 1, 1).timestamp()))
+        second = folder_metrics(folder, cache)
+
+        # Tests the totals from each walk.
+        self.assertEqual(first, (10, 2, int(datetime(2022, 6, 1).timestamp() * 1e9)), "Problem with test for cache")
+        self.assertEqual(second[:2], (19, 3), "Problem with test for cache, changed folder")
+        self.assertEqual(len(cache), 2, "Problem with test for cache, entries")
+
+    def test_removed_subfolder(self):
+        """Test for a subfolder that was removed since its folder was read, using a cache with the old contents"""
+        # Walks the folder to make the cache, then removes the subfolder and sets the folder modification time back,
+        # so the cache still lists the subfolder, and walks the folder again with the cache.
+        folder = os.path.join(self.share, 'folder')
+        cache = {}
+        folder_metrics(folder, cache)
+        os.remove(os.path.join(folder, 'sub', 'two.txt'))
+        os.rmdir(os.path.join(folder, 'sub'))
+        os.utime(folder, (datetime(2018, 1, 1).timestamp(), datetime(2018, 1, 1).timestamp()))
+        result = folder_metrics(folder, cache)
+
+        # Tests if the result has only the file left in the folder.
+        expected = (3, 1, int(datetime(2020, 1, 1).timestamp() * 1e9))
+        self.assertEqual(result, expected, "Problem with test for removed subfolder")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Tests for the function audit(), which runs check_required(), check_dates(), and check_inventory() in that order.
+"""
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import unittest
+from hub_audit import audit
+from test_check_inventory import df_to_list
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_mixed(self):
+        """Test for an inventory with every kind of error, a share that is incomplete, and duplicates"""
+        # Makes variables for function input and runs the function being tested.
+        columns = ['Share', 'Folder', 'Use', 'Responsible', 'Review_Date', 'Notes',
+                   'Audit_Dates', 'Audit_Inventory', 'Audit_Required']
+        rows = [['share_b', 'folder_b', 'Backlog', 'Bill', 'Permanent', np.nan, 'TBD', 'TBD', 'TBD'],
+                ['share_a', 'folder_a', np.nan, 'Ann', datetime(2020, 1, 1), np.nan, 'TBD', 'TBD', 'TBD'],
+                ['share_a', 'folder_c', 'Backlog', 'Ann', '6 months', 'Note', 'TBD', 'TBD', 'TBD'],
+                ['share_c', 'folder_c', 'Backlog', 'Cam', datetime(2130, 1, 1), np.nan, 'TBD', 'TBD', 'TBD'],
+                ['share_c', 'folder_c', 'Backlog', 'Cam', np.nan, np.nan, 'TBD', 'TBD', 'TBD']]
+        shares_df = pd.DataFrame([['share_a', 'folder_a'],
+                                  ['share_a', 'folder_d'],
+                                  ['share_a', 'folder_d'],
+                                  ['share_b', 'folder_b']],
+                                 columns=['Share', 'Folder'])
+        duplicates = {}
+        result = audit(pd.DataFrame(rows, columns=columns), shares_df, ['share_c'], duplicates)
+
+        # Tests if the results are correct.
+        expected = [columns,
+                    ['share_a', 'folder_a', 'BLANK', 'Ann', datetime(2020, 1, 1), 'BLANK',
+                     'Expired', 'Correct', 'Missing'],
+                    ['share_a', 'folder_c', 'Backlog', 'Ann', '6 months', 'Note', 'Review', 'Not in share', 'Correct'],
+                    ['share_a', 'folder_d', 'BLANK', 'BLANK', 'BLANK', 'BLANK', 'BLANK', 'Not in inventory', 'BLANK'],
+                    ['share_b', 'folder_b', 'Backlog', 'Bill', 'Permanent', 'BLANK', 'Correct', 'Correct', 'Correct'],
+                    ['share_c', 'folder_c', 'Backlog', 'Cam', datetime(2130, 1, 1), 'BLANK',
+                     'Correct', 'Scan incomplete', 'Correct'],
+                    ['share_c', 'folder_c', 'Backlog', 'Cam', 'BLANK', 'BLANK',
+                     'Review', 'Scan incomplete', 'Missing']]
+        self.assertEqual(df_to_list(result), expected, "Problem with test for mixed")
+        self.assertEqual(duplicates, {'inventory': [('share_c', 'folder_c')], 'shares': [('share_a', 'folder_d')]},
+                         "Problem with test for mixed, duplicates")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,6 +25,23 @@ class MyTestCase(unittest.TestCase):
         self.columns = ['Share', 'Folder', 'Use', 'Responsible', 'Review_Date', 'Notes', 'Deleted_Date',
                         'Audit_Dates', 'Audit_Inventory', 'Audit_Required']
 
+    def test_blank_number(self):
+        """Test for an inventory where the date is blank or a number, which need review, and the rows are not sorted"""
+        # Make a dataframe with Hub inventory data and run the function being tested.
+        rows = [['Share_B', 'B', 'Backlog', 'June', np.nan, np.nan, np.nan, 'TBD', 'TBD', 'TBD'],
+                ['Share_A', 'A2', 'Backlog', 'June', 2025, np.nan, np.nan, 'TBD', 'TBD', 'TBD'],
+                ['Share_A', 'A1', 'Backlog', 'June', datetime(2021, 1, 1, 0, 0), np.nan, np.nan, 'TBD', 'TBD', 'TBD']]
+        inventory_df = check_dates(pd.DataFrame(rows, columns=self.columns))
+
+        # Tests if the resulting dataframe has the expected data, in the original order.
+        result = df_to_list(inventory_df)
+        expected = [self.columns,
+                    ['Share_B', 'B', 'Backlog', 'June', 'BLANK', 'BLANK', 'BLANK', 'Review', 'TBD', 'TBD'],
+                    ['Share_A', 'A2', 'Backlog', 'June', 2025, 'BLANK', 'BLANK', 'Review', 'TBD', 'TBD'],
+                    ['Share_A', 'A1', 'Backlog', 'June', datetime(2021, 1, 1, 0, 0), 'BLANK', 'BLANK', 'Expired',
+                     'TBD', 'TBD']]
+        self.assertEqual(result, expected, "Problem with test for blank and number")
+
     def test_combination(self):
         """Test for an inventory where the date formatting is mixed"""
         # Make a dataframe with Hub inventory data and run the function being tested.
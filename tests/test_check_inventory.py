@@ -5,12 +5,12 @@ To simply testing, the inventory df only includes columns needed for the compari
 """
 import pandas as pd
 import unittest
-from hub_audit import check_inventory
+from hub_audit import AUDIT_VALUES, check_inventory
 
 
 def df_to_list(df):
     """Fill blanks with the string 'BLANK' and convert each row in a dataframe to a list"""
-    df = df.fillna('BLANK')
+    df = df.astype(object).fillna('BLANK')
     df_list = [df.columns.tolist()] + df.values.tolist()
     return df_list
 
@@ -68,6 +68,62 @@ class MyTestCase(unittest.TestCase):
                     ['share_c', 'born-digital\\closed\\folder', 'Correct']]
         self.assertEqual(result, expected, "Problem with test for match, duplicates")
 
+    def test_categorical(self):
+        """Test for categorical Share and Audit_Inventory columns, with different shares in each dataframe"""
+        # Makes variables for function input and run the function being tested.
+        inventory_df = pd.DataFrame([['share_c', 'folder_c', 'TBD'],
+                                     ['share_a', 'folder_a', 'TBD'],
+                                     [None, 'folder_x', 'TBD']],
+                                    columns=['Share', 'Folder', 'Audit_Inventory'])
+        inventory_df['Share'] = inventory_df['Share'].astype('category')
+        inventory_df['Audit_Inventory'] = pd.Categorical(inventory_df['Audit_Inventory'],
+                                                         categories=AUDIT_VALUES['Audit_Inventory'])
+        shares_df = pd.DataFrame({'Share': pd.Categorical(['share_b', 'share_a', 'share_a']),
+                                  'Folder': ['folder_b', 'folder_a', 'folder_d']})
+        inventory_df = check_inventory(inventory_df, shares_df)
+
+        # Tests if the columns are still categorical and the inventory has the expected values, sorted by share.
+        self.assertIsInstance(inventory_df['Share'].dtype, pd.CategoricalDtype,
+                              "Problem with test for categorical, Share")
+        self.assertIsInstance(inventory_df['Audit_Inventory'].dtype, pd.CategoricalDtype,
+                              "Problem with test for categorical, Audit_Inventory")
+        result = df_to_list(inventory_df)
+        expected = [['Share', 'Folder', 'Audit_Inventory'],
+                    ['share_a', 'folder_a', 'Correct'],
+                    ['share_a', 'folder_d', 'Not in inventory'],
+                    ['share_b', 'folder_b', 'Not in inventory'],
+                    ['share_c', 'folder_c', 'Not in share'],
+                    ['BLANK', 'folder_x', 'Not in share']]
+        self.assertEqual(result, expected, "Problem with test for categorical, dataframe")
+
+    def test_duplicates_reported(self):
+        """Test for reporting keys that are in the inventory or the shares more than once"""
+        # Makes variables for function input and run the function being tested.
+        inventory_df = pd.DataFrame([['share_a', 'folder_a', 'TBD'],
+                                  ['share_a', 'folder_a', 'TBD'],
+                                  ['share_b', 'folder_b', 'TBD']],
+                                 columns=['Share', 'Folder', 'Audit_Inventory'])
+        shares_df = pd.DataFrame([['share_a', 'folder_a'],
+                               ['share_b', 'folder_b'],
+                               ['share_b', 'folder_b'],
+                               ['share_b', 'folder_c'],
+                               ['share_b', 'folder_c']],
+                              columns=['Share', 'Folder'])
+        duplicates = {}
+        inventory_df = check_inventory(inventory_df, shares_df, duplicates=duplicates)
+
+        # Tests if the duplicates have the expected keys and the inventory duplicates are kept.
+        expected = {'inventory': [('share_a', 'folder_a')],
+                    'shares': [('share_b', 'folder_b'), ('share_b', 'folder_c')]}
+        self.assertEqual(duplicates, expected, "Problem with test for duplicates reported, keys")
+        result = df_to_list(inventory_df)
+        expected = [['Share', 'Folder', 'Audit_Inventory'],
+                    ['share_a', 'folder_a', 'Correct'],
+                    ['share_a', 'folder_a', 'Correct'],
+                    ['share_b', 'folder_b', 'Correct'],
+                    ['share_b', 'folder_c', 'Not in inventory']]
+        self.assertEqual(result, expected, "Problem with test for duplicates reported, dataframe")
+
     def test_not_inventory(self):
         """Test for when some rows are only in the share and not the inventory"""
         # Makes variables for function input and run the function being tested.
@@ -116,6 +172,28 @@ class MyTestCase(unittest.TestCase):
                     ['share_c', 'born-digital\\closed\\folder', 'Correct']]
         self.assertEqual(result, expected, "Problem with test for not in share")
 
+    def test_scan_incomplete(self):
+        """Test for when a share was not completely read, so folders not found are not reported as not in share"""
+        # Makes variables for function input and run the function being tested.
+        inventory_df = pd.DataFrame([['share_a', 'folder_a', 'TBD'],
+                                  ['share_a', 'folder_b', 'TBD'],
+                                  ['share_b', 'folder_a', 'TBD'],
+                                  ['share_b', 'folder_b', 'TBD']],
+                                 columns=['Share', 'Folder', 'Audit_Inventory'])
+        shares_df = pd.DataFrame([['share_a', 'folder_a'],
+                               ['share_b', 'folder_a']],
+                              columns=['Share', 'Folder'])
+        inventory_df = check_inventory(inventory_df, shares_df, ['share_b'])
+
+        # Tests if the resulting dataframe has the expected data.
+        result = df_to_list(inventory_df)
+        expected = [['Share', 'Folder', 'Audit_Inventory'],
+                    ['share_a', 'folder_a', 'Correct'],
+                    ['share_a', 'folder_b', 'Not in share'],
+                    ['share_b', 'folder_a', 'Correct'],
+                    ['share_b', 'folder_b', 'Scan incomplete']]
+        self.assertEqual(result, expected, "Problem with test for scan incomplete")
+
     def test_variety(self):
         """Test for when some rows are just in the inventory, some just in the share, and some match"""
         # Makes variables for function input and run the function being tested.
@@ -0,0 +1,123 @@
+"""
+Tests for the function check_options(), which separates the optional arguments and verifies they are valid.
+In production, the input is from sys.argv
+"""
+import os
+import unittest
+from hub_audit import check_options
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Variable used in all the tests, with the default value of every option."""
+        self.defaults = {'cache': False, 'cache_size': 100000, 'format': 'csv', 'interval': 0, 'manifest': '',
+                         'merge': '', 'metrics': False, 'no_history': False, 'preflight': False, 'previous': '',
+                         'profile': False, 'rescan': False, 'rules': '', 'server_workers': 0, 'shard': '',
+                         'sheets': 'share', 'split': '', 'timeout': 0, 'watch': False, 'workers': 1}
+
+    def test_default(self):
+        """Test for when no optional arguments are present"""
+        args = ['hub_audit.py', 'inventory.xlsx', 'shares.csv']
+        result = check_options(args)
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], self.defaults, [])
+        self.assertEqual(result, expected, 'Problem with test for default')
+
+    def test_format(self):
+        """Test for an option with choices, with more than one choice"""
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--format', 'csv,xlsx'])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], dict(self.defaults, format='csv,xlsx'), [])
+        self.assertEqual(result, expected, "Problem with test for format")
+
+    def test_format_invalid(self):
+        """Test for an option with choices, with a value that is not one of the choices"""
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--format', 'csv,json'])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], self.defaults,
+                    ['Provided format "csv,json" is not one of csv, parquet, xlsx'])
+        self.assertEqual(result, expected, "Problem with test for format invalid")
+
+    def test_manifest(self):
+        """Test for an option that is a path, which must exist"""
+        manifest = os.path.join('inventories', 'Digital Production Hub Inventory_Blank Rows.xlsx')
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--manifest', manifest])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], dict(self.defaults, manifest=manifest), [])
+        self.assertEqual(result, expected, "Problem with test for manifest")
+
+    def test_manifest_invalid(self):
+        """Test for an option that is a path which does not exist"""
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--manifest', 'missing.tsv'])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], self.defaults,
+                    ['Provided manifest "missing.tsv" does not exist'])
+        self.assertEqual(result, expected, "Problem with test for manifest invalid")
+
+    def test_missing_value(self):
+        """Test for when an optional argument is the last argument and has no value"""
+        args = ['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--workers']
+        result = check_options(args)
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], self.defaults,
+                    ['Optional argument "--workers" is missing a value'])
+        self.assertEqual(result, expected, 'Problem with test for missing value')
+
+    def test_flag(self):
+        """Test for when a flag, which does not have a value, is present along with an option that has a value"""
+        args = ['hub_audit.py', 'inventory.xlsx', '--cache', '--rescan', 'shares.csv', '--cache-size', '50']
+        result = check_options(args)
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'],
+                    dict(self.defaults, cache=True, cache_size=50, rescan=True), [])
+        self.assertEqual(result, expected, 'Problem with test for flag')
+
+    def test_rules_merge(self):
+        """Test for rules with merge, which cannot be used together (error)"""
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--rules', 'test_shares.csv',
+                                '--merge', 'shares'])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'],
+                    dict(self.defaults, rules='test_shares.csv', merge='shares'),
+                    ['Cannot use rules with merge, use rules with shard instead'])
+        self.assertEqual(result, expected, "Problem with test for rules merge")
+
+    def test_shard(self):
+        """Test for the shard option, which is a shard number and number of shards"""
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--shard', '2/4'])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], dict(self.defaults, shard='2/4'), [])
+        self.assertEqual(result, expected, "Problem with test for shard")
+
+    def test_shard_invalid(self):
+        """Test for the shard option with a shard number larger than the number of shards (error)"""
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--shard', '5/4'])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], self.defaults,
+                    ['Provided shard "5/4" is not a shard number and number of shards, like 2/4'])
+        self.assertEqual(result, expected, "Problem with test for shard invalid")
+
+    def test_unknown(self):
+        """Test for when an optional argument is not one the script uses"""
+        args = ['hub_audit.py', '--error', 'inventory.xlsx', 'shares.csv']
+        result = check_options(args)
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], self.defaults,
+                    ['Unknown optional argument "--error"'])
+        self.assertEqual(result, expected, 'Problem with test for unknown')
+
+    def test_watch_shard(self):
+        """Test for watch with shard, which cannot be used together (error)"""
+        result = check_options(['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--watch', '--shard', '1/2'])
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], dict(self.defaults, watch=True, shard='1/2'),
+                    ['Cannot use watch with manifest, merge, or shard'])
+        self.assertEqual(result, expected, "Problem with test for watch shard")
+
+    def test_workers(self):
+        """Test for when workers is present and valid, before the required arguments"""
+        args = ['hub_audit.py', '--workers', '8', 'inventory.xlsx', 'shares.csv']
+        result = check_options(args)
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], dict(self.defaults, workers=8), [])
+        self.assertEqual(result, expected, 'Problem with test for workers')
+
+    def test_workers_invalid(self):
+        """Test for when workers is present but not a positive number"""
+        args = ['hub_audit.py', 'inventory.xlsx', 'shares.csv', '--workers', '0']
+        result = check_options(args)
+        expected = (['hub_audit.py', 'inventory.xlsx', 'shares.csv'], self.defaults,
+                    ['Provided workers "0" is not a positive number'])
+        self.assertEqual(result, expected, 'Problem with test for workers invalid')
+
+
+if __name__ == '__main__':
+    unittest.main()
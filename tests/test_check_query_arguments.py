@@ -0,0 +1,44 @@
+"""
+Tests for the function check_query_arguments(), which verifies the arguments for the query subcommand.
+In production, the input is from sys.argv
+"""
+import os
+import unittest
+from hub_audit import check_query_arguments
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """An existing file to use as the audit history, since the history is not read"""
+        self.history = os.path.join('inventories', 'Digital Production Hub Inventory_Blank Rows.xlsx')
+
+    def test_correct(self):
+        """Test for a question with arguments"""
+        result = check_query_arguments(['hub_audit.py', 'query', self.history, 'folder', 'share_a', 'folder_a'])
+        expected = (self.history, 'folder', ['share_a', 'folder_a'], [])
+        self.assertEqual(result, expected, "Problem with test for correct")
+
+    def test_missing(self):
+        """Test for when the question is missing"""
+        result = check_query_arguments(['hub_audit.py', 'query', self.history])
+        expected = (None, None, [], ['Missing arguments for query, which needs the audit history and question'])
+        self.assertEqual(result, expected, "Problem with test for missing")
+
+    def test_invalid(self):
+        """Test for an audit history that does not exist and a question that needs different arguments"""
+        result = check_query_arguments(['hub_audit.py', 'query', 'history.db', 'expired', 'extra'])
+        expected = (None, None, ['extra'], ['Provided audit history "history.db" does not exist',
+                                            'Question "expired" needs no arguments'])
+        self.assertEqual(result, expected, "Problem with test for invalid")
+
+    def test_unknown(self):
+        """Test for a question that is not one of the questions"""
+        result = check_query_arguments(['hub_audit.py', 'query', self.history, 'oldest'])
+        expected = (self.history, None, [], ['Unknown question "oldest", which should be one of: '
+                                             'mismatches, expired, folder, responsible'])
+        self.assertEqual(result, expected, "Problem with test for unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
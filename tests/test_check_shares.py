@@ -0,0 +1,104 @@
+"""
+Tests for the function check_shares(), which checks the share information and that every share can be reached
+before the audit starts.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import hub_audit
+from hub_audit import check_shares
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Folder for the share information CSVs made by each test"""
+        self.folder = tempfile.mkdtemp()
+        self.share_info = os.path.join(self.folder, 'shares.csv')
+
+    def tearDown(self):
+        """Deletes the share information CSVs"""
+        shutil.rmtree(self.folder)
+
+    def make_csv(self, rows):
+        """Saves the share information CSV from a list of rows"""
+        with open(self.share_info, 'w', newline='') as share_file:
+            share_file.write('\n'.join(rows) + '\n')
+
+    def test_bom(self):
+        """Test for share information saved by Excel as CSV UTF-8, which starts with a byte order mark"""
+        with open(self.share_info, 'w', newline='', encoding='utf-8-sig') as share_file:
+            share_file.write(f'name,path,pattern,folders\na,{os.path.join("make_inv", "top", "a")},top,\n')
+        result = check_shares(self.share_info)
+        self.assertEqual(result, [], "Problem with test for bom")
+
+    def test_correct(self):
+        """Test for share information where every share can be reached"""
+        self.make_csv(['name,path,pattern,folders',
+                       f'a,{os.path.join("make_inv", "top", "a")},top,',
+                       f'c,{os.path.join("make_inv", "second", "c")},second,born-digital'])
+        result = check_shares(self.share_info)
+        self.assertEqual(result, [], "Problem with test for correct")
+
+    def test_missing_column(self):
+        """Test for share information without a required column (error)"""
+        self.make_csv(['name,pattern', 'a,top'])
+        result = check_shares(self.share_info)
+        expected = [f'Provided share information "{self.share_info}" is missing the column(s) path']
+        self.assertEqual(result, expected, "Problem with test for missing column")
+
+    def test_not_checked(self):
+        """Test for not checking the paths, which is used with a manifest or merge"""
+        self.make_csv(['name,path,pattern,folders', 'a,missing_share,top,'])
+        result = check_shares(self.share_info, check_paths=False)
+        self.assertEqual(result, [], "Problem with test for not checked")
+
+    def test_shard(self):
+        """Test for a shard, where only the shares for that shard are checked"""
+        self.make_csv(['name,path,pattern,folders,shard',
+                       'a,missing_share_a,top,,1',
+                       'b,missing_share_b,top,,2'])
+        result = [error.split(':')[0] for error in check_shares(self.share_info, shard=(2, 2))]
+        expected = ['Share b "missing_share_b" cannot be reached']
+        self.assertEqual(result, expected, "Problem with test for shard")
+
+    def test_timeout(self):
+        """Test for a share that does not respond before the timeout (error),
+        which is a warning instead if a warnings list is provided"""
+        self.make_csv(['name,path,pattern,folders', f'a,{os.path.join("make_inv", "top", "a")},top,'])
+        stop = hub_audit.threading.Event()
+        real_scandir = os.scandir
+
+        def slow_scandir(path):
+            stop.wait(5)
+            return real_scandir(path)
+
+        warnings = []
+        with mock.patch('os.scandir', slow_scandir):
+            try:
+                result = check_shares(self.share_info, timeout=0.1)
+                result_warnings = check_shares(self.share_info, timeout=0.1, warnings=warnings)
+            finally:
+                stop.set()
+        expected = [f'Share a "{os.path.join("make_inv", "top", "a")}" did not respond within 0.1 seconds']
+        self.assertEqual(result, expected, "Problem with test for timeout")
+        self.assertEqual((result_warnings, warnings), ([], expected), "Problem with test for timeout, warnings")
+
+    def test_unreachable(self):
+        """Test for every share that cannot be reached being reported at once (error),
+        except for shares with the share pattern or an unexpected pattern, which are not read"""
+        self.make_csv(['name,path,pattern,folders',
+                       'a,missing_share_a,top,',
+                       f'b,{os.path.join("make_inv", "top", "a")},top,',
+                       f'c,{os.path.join("make_inv", "top", "d", "File.txt")},share,',
+                       'd,missing_share_d,unexpected,'])
+        # The reason after the colon is from the operating system, so only the part before it is tested.
+        result = [error.split(':')[0] for error in check_shares(self.share_info)]
+        expected = ['Share a "missing_share_a" cannot be reached']
+        self.assertEqual(result, expected, "Problem with test for unreachable")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for the function compare_audits(), which finds the rows that changed since the previous audit.
+To simplify testing, the audits only include some of the columns.
+"""
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import unittest
+from hub_audit import compare_audits
+
+
+def df_to_list(df):
+    """Convert each row in a dataframe to a list, with the column names as the first row"""
+    return [df.columns.tolist()] + df.values.tolist()
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Previous audit, as it is read from the audit CSV"""
+        self.previous_df = pd.DataFrame([['share_a', 'folder_a', 'Ann', '2130-01-01 00:00:00', 'Correct'],
+                                         ['share_a', 'folder_b', 'Ann', 'permanent', 'Correct'],
+                                         ['share_b', 'folder_c', 'Bill', '', 'Review'],
+                                         ['share_b', 'folder_d', 'Bill', '2020-01-01 00:00:00', 'Expired']],
+                                        columns=['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates'])
+
+    def test_changes(self):
+        """Test for rows that are unchanged, changed, new, and gone"""
+        # Makes variables for function input and runs the function being tested.
+        current_df = pd.DataFrame([['share_a', 'folder_a', 'Ann', datetime(2130, 1, 1), 'Correct'],
+                                   ['share_a', 'folder_b', 'Alex', 'permanent', 'Correct'],
+                                   ['share_b', 'folder_c', 'Bill', datetime(2020, 1, 1), 'Expired'],
+                                   ['share_c', 'folder_e', 'Cam', np.nan, 'Review']],
+                                  columns=['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates'])
+        result = df_to_list(compare_audits(self.previous_df, current_df))
+
+        # Tests if the result has the expected values.
+        expected = [['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates', 'Change_Type', 'Changed_Columns',
+                     'Responsible_Previous', 'Review_Date_Previous', 'Audit_Dates_Previous'],
+                    ['share_a', 'folder_b', 'Alex', 'permanent', 'Correct', 'Changed', 'Responsible',
+                     'Ann', 'permanent', 'Correct'],
+                    ['share_b', 'folder_c', 'Bill', '2020-01-01 00:00:00', 'Expired', 'Changed',
+                     'Review_Date, Audit_Dates', 'Bill', '', 'Review'],
+                    ['share_b', 'folder_d', 'Bill', '2020-01-01 00:00:00', 'Expired', 'Gone', '',
+                     'Bill', '2020-01-01 00:00:00', 'Expired'],
+                    ['share_c', 'folder_e', 'Cam', '', 'Review', 'New', '', '', '', '']]
+        self.assertEqual(result, expected, "Problem with test for changes")
+
+    def test_dates(self):
+        """Test for a Review_Date column that is all dates, which is saved in the audit CSV without a time"""
+        # Makes variables for function input and runs the function being tested.
+        previous_df = pd.DataFrame([['share_a', 'folder_a', 'Ann', '2130-01-01', 'Correct'],
+                                    ['share_b', 'folder_d', 'Bill', '2020-01-01', 'Expired']],
+                                   columns=['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates'])
+        current_df = previous_df.assign(Review_Date=pd.to_datetime(previous_df['Review_Date']))
+        result = df_to_list(compare_audits(previous_df, current_df))
+
+        # Tests if no rows changed.
+        expected = [['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates', 'Change_Type', 'Changed_Columns',
+                     'Responsible_Previous', 'Review_Date_Previous', 'Audit_Dates_Previous']]
+        self.assertEqual(result, expected, "Problem with test for dates")
+
+    def test_duplicates(self):
+        """Test for a share and folder that is in the current audit more than once"""
+        # Makes variables for function input and runs the function being tested.
+        current_df = pd.concat([self.previous_df, self.previous_df.iloc[[0]]], ignore_index=True)
+        current_df.loc[4, 'Responsible'] = 'Alex'
+        result = df_to_list(compare_audits(self.previous_df, current_df))
+
+        # Tests if only the second row for the duplicate is new.
+        expected = [['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates', 'Change_Type', 'Changed_Columns',
+                     'Responsible_Previous', 'Review_Date_Previous', 'Audit_Dates_Previous'],
+                    ['share_a', 'folder_a', 'Alex', '2130-01-01 00:00:00', 'Correct', 'New', '', '', '', '']]
+        self.assertEqual(result, expected, "Problem with test for duplicates")
+
+
+if __name__ == '__main__':
+    unittest.main()
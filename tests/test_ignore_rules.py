@@ -0,0 +1,63 @@
+"""
+Tests for the class IgnoreRules, which removes the items that are ignored from the contents of a directory.
+"""
+import unittest
+from hub_audit import DEFAULT_IGNORE_RULES, IgnoreRules
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Variable used in all the tests, with the contents of a directory as (name, is_dir)"""
+        self.entries = [('.DS_Store', False), ('Thumbs.db', False), ('Hub Documentation.txt', False),
+                        ('Hub Folder', True), ('collection_1', True), ('notes.tmp', False), ('report.txt', False)]
+
+    def test_default(self):
+        """Test for the default rules, which only ignore files"""
+        result = IgnoreRules(DEFAULT_IGNORE_RULES).filter('a', self.entries)
+        expected = [('Hub Folder', True), ('collection_1', True), ('notes.tmp', False), ('report.txt', False)]
+        self.assertEqual(result, expected, "Problem with test for default")
+
+    def test_include(self):
+        """Test for an include rule, which keeps an item that matches an ignore rule"""
+        rules = IgnoreRules(DEFAULT_IGNORE_RULES + [('', 'include', 'file', 'Hub Documentation.txt')])
+        result = rules.filter('a', self.entries)
+        expected = [('Hub Documentation.txt', False), ('Hub Folder', True), ('collection_1', True),
+                    ('notes.tmp', False), ('report.txt', False)]
+        self.assertEqual(result, expected, "Problem with test for include")
+
+    def test_items(self):
+        """Test for rules that only apply to files or only to folders"""
+        rules = IgnoreRules([('', 'ignore', 'folder', 'Hub*'), ('', 'ignore', 'file', 'collection*')])
+        result = rules.filter('a', self.entries)
+        expected = [('.DS_Store', False), ('Thumbs.db', False), ('Hub Documentation.txt', False),
+                    ('collection_1', True), ('notes.tmp', False), ('report.txt', False)]
+        self.assertEqual(result, expected, "Problem with test for items")
+
+    def test_regex(self):
+        """Test for a regular expression rule, which can match any part of the name"""
+        rules = IgnoreRules([('', 'ignore', '', r're:\.(tmp|db)$')])
+        result = rules.filter('a', self.entries)
+        expected = [('.DS_Store', False), ('Hub Documentation.txt', False), ('Hub Folder', True),
+                    ('collection_1', True), ('report.txt', False)]
+        self.assertEqual(result, expected, "Problem with test for regex")
+
+    def test_regex_flags(self):
+        """Test for regular expressions with inline flags and backreferences, which are compiled on their own"""
+        rules = IgnoreRules([('', 'ignore', '', r're:\.(tmp)$'), ('', 'ignore', '', r're:(\w)\1'),
+                             ('', 'ignore', '', 're:(?i)thumbs'), ('', 'ignore', 'file', '.DS_Store')])
+        result = rules.filter('a', self.entries)
+        expected = [('Hub Documentation.txt', False), ('Hub Folder', True), ('report.txt', False)]
+        self.assertEqual(result, expected, "Problem with test for regex flags")
+
+    def test_share(self):
+        """Test for rules for one share, which are used with the rules for every share"""
+        rules = IgnoreRules(DEFAULT_IGNORE_RULES + [('b', 'ignore', '', '*.tmp'), ('b', 'include', '', 'Thumbs.db')])
+        result = {'a': rules.filter('a', self.entries), 'b': rules.filter('b', self.entries)}
+        expected = {'a': [('Hub Folder', True), ('collection_1', True), ('notes.tmp', False), ('report.txt', False)],
+                    'b': [('Thumbs.db', False), ('Hub Folder', True), ('collection_1', True), ('report.txt', False)]}
+        self.assertEqual(result, expected, "Problem with test for share")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,14 +3,87 @@ Tests for the function make_shares_inventory(),
 which makes a dataframe with the contents of all shares, to the level of detail specified in df_info.
 """
 import numpy as np
+import os
 import pandas as pd
+import threading
+import time
 import unittest
-from hub_audit import make_shares_inventory
+from unittest import mock
+import hub_audit
+from hub_audit import DEFAULT_IGNORE_RULES, IgnoreRules, make_shares_inventory
 from test_check_inventory import df_to_list
 
 
 class MyTestCase(unittest.TestCase):
 
+    def test_rules(self):
+        """Test for ignore rules, where ignored items are not included and ignored folders are not read"""
+        # Makes variable for function input and run the function being tested.
+        shares_info_df = pd.DataFrame([['c', os.path.join('make_inv', 'top', 'c'), 'top', np.nan],
+                                       ['e', os.path.join('make_inv', 'second', 'e'), 'second', 'folder_2|folder_3']],
+                                      columns=['name', 'path', 'pattern', 'folders'])
+        rules = IgnoreRules(DEFAULT_IGNORE_RULES + [('c', 'include', 'file', 'Hub Instructions.txt'),
+                                                    ('e', 'ignore', 'folder', 'folder_3'),
+                                                    ('', 'ignore', 'folder', 're:e1$')])
+        scan_stats = {}
+        shares_df = make_shares_inventory(shares_info_df, scan_stats=scan_stats, rules=rules)
+
+        # Tests if the share inventory has the expected values and folder_3 in share e was not read.
+        result = df_to_list(shares_df)
+        expected = [['Share', 'Folder'],
+                    ['c', 'Hub Instructions.txt'],
+                    ['c', 'folder_c'],
+                    ['e', 'folder_2\\folder_e2'],
+                    ['e', 'folder_e']]
+        self.assertEqual(sorted(result), sorted(expected), "Problem with test for rules")
+        self.assertEqual(scan_stats['e']['directory_reads'], 2, "Problem with test for rules, reads")
+
+    def test_scan_cache(self):
+        """Test for using the scan cache, where directories are only read again if they changed"""
+        # Makes variable for function input and runs the function being tested with an empty cache.
+        shares_info_df = pd.DataFrame([['c', os.path.join('make_inv', 'second', 'c'), 'second', 'born-digital'],
+                                    ['d', os.path.join('make_inv', 'top', 'd'), 'top', np.nan]],
+                                   columns=['name', 'path', 'pattern', 'folders'])
+        scan_cache = {}
+        first_df = make_shares_inventory(shares_info_df, cache=scan_cache)
+
+        # Runs the function again after adding a folder to share d, using the cache from the first run.
+        new_folder = os.path.join('make_inv', 'top', 'd', 'folder_new')
+        os.mkdir(new_folder)
+        try:
+            scan_stats = {}
+            second_df = make_shares_inventory(shares_info_df, scan_stats=scan_stats, cache=scan_cache)
+        finally:
+            os.rmdir(new_folder)
+
+        # Tests that only the changed directory was read again and the results include the new folder.
+        expected = {'c': {'directory_reads': 0, 'stat_calls': 3, 'items': 5, 'cache_hits': 3},
+                    'd': {'directory_reads': 1, 'stat_calls': 1, 'items': 3, 'cache_hits': 0}}
+        for share_stats in scan_stats.values():
+            self.assertGreaterEqual(share_stats.pop('seconds'), 0, "Problem with test for scan cache, seconds")
+        self.assertEqual(scan_stats, expected, "Problem with test for scan cache, stats")
+        result = sorted(df_to_list(second_df)[1:])
+        expected = sorted(df_to_list(first_df)[1:] + [['d', 'folder_new']])
+        self.assertEqual(result, expected, "Problem with test for scan cache, results")
+
+    def test_scan_stats(self):
+        """Test for the number of directory reads, stat calls, and items for each share"""
+        # Makes variable for function input and run the function being tested.
+        shares_info_df = pd.DataFrame([['a', os.path.join('make_inv', 'share', 'a'), 'share', np.nan],
+                                    ['c', os.path.join('make_inv', 'second', 'c'), 'second', 'born-digital'],
+                                    ['d', os.path.join('make_inv', 'top', 'd'), 'top', np.nan]],
+                                   columns=['name', 'path', 'pattern', 'folders'])
+        scan_stats = {}
+        make_shares_inventory(shares_info_df, scan_stats=scan_stats)
+
+        # Tests if the scan stats have the expected data, after checking the time spent reading is recorded.
+        # Share a is not read, share c reads each of its three levels once, and share d reads just its top level.
+        expected = {'c': {'directory_reads': 3, 'stat_calls': 0, 'items': 5, 'cache_hits': 0},
+                    'd': {'directory_reads': 1, 'stat_calls': 0, 'items': 2, 'cache_hits': 0}}
+        for share_stats in scan_stats.values():
+            self.assertGreaterEqual(share_stats.pop('seconds'), 0, "Problem with test for scan stats, seconds")
+        self.assertEqual(scan_stats, expected, "Problem with test for scan stats")
+
     def test_second(self):
         """Test for the 'second' pattern"""
         # Makes variable for function input and run the function being tested.
@@ -26,8 +99,6 @@ class MyTestCase(unittest.TestCase):
         result = df_to_list(shares_df)
         expected = [['Share', 'Folder'],
                     ['a', 'folder_a'],
-                    ['a', 'folder_a'],
-                    ['b', 'folder_b'],
                     ['b', 'folder_b'],
                     ['c', 'born-digital\\backlogged\\folder_c1'],
                     ['c', 'born-digital\\backlogged\\folder_c2'],
@@ -35,11 +106,60 @@ class MyTestCase(unittest.TestCase):
                     ['e', 'folder_2\\folder_e1'],
                     ['e', 'folder_2\\folder_e2'],
                     ['e', 'folder_3'],
-                    ['e', 'folder_3'],
                     ['e', 'folder_e\\folder_e1'],
                     ['e', 'folder_e\\folder_e2']]
         self.assertEqual(result, expected, "Problem with test for second")
 
+    def test_server_workers(self):
+        """Test for reading with a timeout, where two shares are on a server that stopped responding
+        and one share is on another server, which is still read while the other server has every slot it can use"""
+        # Makes variable for function input, a version of list_directory() that does not finish for shares a and b
+        # until it is released after the timeout, and a version of share_server() with a and b on the same server.
+        shares_info_df = pd.DataFrame([['a', os.path.join('make_inv', 'top', 'a'), 'top', np.nan],
+                                       ['b', os.path.join('make_inv', 'top', 'b'), 'top', np.nan],
+                                       ['c', os.path.join('make_inv', 'top', 'c'), 'top', np.nan]],
+                                      columns=['name', 'path', 'pattern', 'folders'])
+        slow_paths = (os.path.join('make_inv', 'top', 'a'), os.path.join('make_inv', 'top', 'b'))
+        list_directory = hub_audit.list_directory
+        released = threading.Event()
+
+        def slow_list_directory(path, cache=None, trust_cache=False):
+            if path in slow_paths:
+                released.wait(30)
+            return list_directory(path, cache, trust_cache)
+
+        def test_share_server(path):
+            return 'slow' if path in slow_paths else 'fast'
+
+        # Runs the function being tested with the slow server, then lets the reads for shares a and b finish.
+        incomplete = []
+        with mock.patch('hub_audit.list_directory', slow_list_directory), \
+                mock.patch('hub_audit.share_server', test_share_server):
+            shares_df = make_shares_inventory(shares_info_df, workers=2, timeout=1, server_workers=1,
+                                              incomplete=incomplete)
+        released.set()
+
+        # Tests if the share on the other server was read.
+        result = [incomplete, sorted(set(shares_df['Share'].astype(str)))]
+        expected = [['a', 'b'], ['c']]
+        self.assertEqual(result, expected, "Problem with test for server workers")
+
+    def test_shard(self):
+        """Test for shards, where each share is in one shard except split shares, which have top level items in each"""
+        # Makes variable for function input and run the function being tested for each shard.
+        shares_info_df = pd.DataFrame([['a', os.path.join('make_inv', 'top', 'a'), 'top', np.nan, 'split'],
+                                       ['b', os.path.join('make_inv', 'share', 'b'), 'share', np.nan, np.nan],
+                                       ['c', os.path.join('make_inv', 'second', 'c'), 'second', 'born-digital', '2'],
+                                       ['e', os.path.join('make_inv', 'second', 'e'), 'second', 'folder_2', 'split']],
+                                      columns=['name', 'path', 'pattern', 'folders', 'shard'])
+        shard_lists = [df_to_list(make_shares_inventory(shares_info_df, shard=(number, 2)))[1:] for number in (1, 2)]
+
+        # Tests if share c is only in shard 2 and the shards together have every folder once.
+        self.assertNotIn('c', [row[0] for row in shard_lists[0]], "Problem with test for shard, pinned")
+        result = sorted(shard_lists[0] + shard_lists[1])
+        expected = sorted(df_to_list(make_shares_inventory(shares_info_df))[1:])
+        self.assertEqual(result, expected, "Problem with test for shard")
+
     def test_share(self):
         """Test for the 'share' pattern"""
         # Makes variable for function input and run the function being tested.
@@ -55,6 +175,51 @@ class MyTestCase(unittest.TestCase):
                     ['b', 'b']]
         self.assertEqual(result, expected, "Problem with test for share")
 
+    def test_timeout(self):
+        """Test for reading with a timeout, where one share is too slow and the other share is still read,
+        and the slow share is not added to the scan cache when it finishes after the timeout"""
+        # Makes variable for function input and a version of list_directory() that does not finish for share b
+        # until it is released after the timeout.
+        shares_info_df = pd.DataFrame([['a', os.path.join('make_inv', 'top', 'a'), 'top', np.nan],
+                                    ['b', os.path.join('make_inv', 'top', 'b'), 'top', np.nan],
+                                    ['c', os.path.join('make_inv', 'second', 'c'), 'second', 'born-digital']],
+                                   columns=['name', 'path', 'pattern', 'folders'])
+        list_directory = hub_audit.list_directory
+        released = threading.Event()
+        finished = threading.Event()
+
+        def slow_list_directory(path, cache=None, trust_cache=False):
+            if path != os.path.join('make_inv', 'top', 'b'):
+                return list_directory(path, cache, trust_cache)
+            released.wait(30)
+            result = list_directory(path, cache, trust_cache)
+            finished.set()
+            return result
+
+        # Runs the function being tested with the slow version of list_directory(),
+        # then lets the read for share b finish.
+        incomplete = []
+        cache = {}
+        start = time.perf_counter()
+        with mock.patch('hub_audit.list_directory', slow_list_directory):
+            shares_df = make_shares_inventory(shares_info_df, workers=4, timeout=1, incomplete=incomplete, cache=cache)
+        seconds = time.perf_counter() - start
+        released.set()
+        finished.wait(5)
+
+        # Tests if the function stopped at the timeout, with the expected data for the shares that finished.
+        self.assertLess(seconds, 5, "Problem with test for timeout, seconds")
+        self.assertEqual(incomplete, ['b'], "Problem with test for timeout, incomplete")
+        result = df_to_list(shares_df)
+        expected = [['Share', 'Folder'],
+                    ['a', 'folder_a1'],
+                    ['a', 'folder_a2'],
+                    ['c', 'born-digital\\backlogged\\folder_c1'],
+                    ['c', 'born-digital\\backlogged\\folder_c2']]
+        self.assertEqual(result, expected, "Problem with test for timeout, shares_df")
+        self.assertIn(os.path.join('make_inv', 'top', 'a'), cache, "Problem with test for timeout, cache")
+        self.assertNotIn(os.path.join('make_inv', 'top', 'b'), cache, "Problem with test for timeout, late read")
+
     def test_top(self):
         """Test for the 'top' pattern"""
         # Makes variable for function input and run the function being tested.
@@ -76,6 +241,21 @@ class MyTestCase(unittest.TestCase):
                     ['d', 'folder_d']]
         self.assertEqual(result, expected, "Problem with test for top")
 
+    def test_workers(self):
+        """Test for reading the shares with more than one worker, which should match reading with one worker"""
+        # Makes variable for function input and run the function being tested with different numbers of workers.
+        shares_info_df = pd.DataFrame([['a', os.path.join('make_inv', 'top', 'a'), 'top', np.nan],
+                                    ['b', os.path.join('make_inv', 'share', 'b'), 'share', np.nan],
+                                    ['c', os.path.join('make_inv', 'second', 'c'), 'second', 'born-digital'],
+                                    ['d', os.path.join('make_inv', 'top', 'd'), 'top', np.nan],
+                                    ['e', os.path.join('make_inv', 'second', 'e'), 'second', 'folder_2|folder_e']],
+                                   columns=['name', 'path', 'pattern', 'folders'])
+        serial_df = make_shares_inventory(shares_info_df)
+        parallel_df = make_shares_inventory(shares_info_df, workers=4)
+
+        # Tests if the resulting dataframes are the same.
+        self.assertEqual(df_to_list(parallel_df), df_to_list(serial_df), "Problem with test for workers")
+
     def test_unexpected(self):
         """Test for an unexpected pattern (error)
         It should also print 'Error: config has an unexpected pattern pattern_error'"""
@@ -0,0 +1,38 @@
+"""
+Tests for the function profile_stage(), which records the time and memory for a stage of the script with --profile.
+"""
+import time
+import unittest
+from hub_audit import profile_stage
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_none(self):
+        """Test for when the script is not profiled, so nothing is recorded"""
+        with profile_stage(None, 'stage'):
+            result = 'stage ran'
+        self.assertEqual(result, 'stage ran', "Problem with test for none")
+
+    def test_profile(self):
+        """Test for when the script is profiled, so the stage is added to the profile"""
+        profile = {'stages': {}}
+        with profile_stage(profile, 'stage'):
+            time.sleep(0.01)
+
+        result = sorted(profile['stages']['stage'])
+        expected = ['cpu_seconds', 'peak_rss_mb', 'wall_seconds']
+        self.assertEqual(result, expected, "Problem with test for profile, keys")
+        self.assertGreaterEqual(profile['stages']['stage']['wall_seconds'], 0.01, "Problem with test for profile, time")
+
+    def test_error(self):
+        """Test for when the stage raises an error, which is still recorded and then raised"""
+        profile = {'stages': {}}
+        with self.assertRaises(ValueError):
+            with profile_stage(profile, 'stage'):
+                raise ValueError('stage error')
+        self.assertIn('stage', profile['stages'], "Problem with test for error")
+
+
+if __name__ == '__main__':
+    unittest.main()
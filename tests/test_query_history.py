@@ -0,0 +1,107 @@
+"""
+Tests for the functions save_history(), which adds the results of a run to the audit history,
+and query_history(), which answers questions with the audit history.
+To simplify testing, the inventory df only includes columns saved in the audit history.
+"""
+from contextlib import closing
+from datetime import datetime
+import numpy as np
+import os
+import pandas as pd
+import sqlite3
+import tempfile
+import unittest
+from hub_audit import HISTORY_QUERIES, query_history, save_history
+
+
+def make_run(rows):
+    """Make an inventory dataframe for one run, with rows of Share, Folder, Responsible, Audit_Dates, Audit_Inventory
+    Every row has the same date to review and is correct for required columns"""
+    df = pd.DataFrame(rows, columns=['Share', 'Folder', 'Responsible', 'Audit_Dates', 'Audit_Inventory'])
+    df['Review_Date'] = datetime(2020, 1, 1)
+    df['Audit_Required'] = 'Correct'
+    return df
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Audit history with three runs, which is deleted after each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.history = os.path.join(self.temp_dir.name, 'hub_audit_history.db')
+        save_history(self.history, make_run([['share_a', 'folder_a', 'Ann', 'Expired', 'Not in share'],
+                                             ['share_a', 'folder_b', 'Ann', 'Correct', 'Correct'],
+                                             ['share_b', 'folder_c', 'Bill', 'Expired', 'Correct']]), '2024-01-05')
+        save_history(self.history, make_run([['share_a', 'folder_a', 'Ann', 'Expired', 'Correct'],
+                                             ['share_a', 'folder_b', 'Ann', 'Correct', 'Not in share'],
+                                             ['share_b', 'folder_c', 'Bill', 'Expired', 'Correct']]), '2024-04-05')
+        save_history(self.history, make_run([['share_a', 'folder_a', 'Ann', 'Correct', 'Not in share'],
+                                             ['share_a', 'folder_b', 'Ann', 'Correct', 'Not in share'],
+                                             ['share_b', 'folder_c', np.nan, 'Expired', 'Correct'],
+                                             ['share_b', 'folder_d', 'Bill', 'Correct', 'Not in inventory']]),
+                     '2024-07-05')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_expired(self):
+        """Test for folders expired in more than one run, including when the person responsible is blank"""
+        result = query_history(self.history, 'expired')
+        expected = (['Responsible', 'Share', 'Folder', 'runs', 'first_expired', 'last_expired'],
+                    [('Ann', 'share_a', 'folder_a', 2, '2024-01-05', '2024-04-05'),
+                     ('Bill', 'share_b', 'folder_c', 2, '2024-01-05', '2024-04-05')])
+        self.assertEqual(result, expected, "Problem with test for expired")
+
+    def test_folder(self):
+        """Test for every result for one folder, with the blank person responsible saved as None"""
+        result = query_history(self.history, 'folder', ['share_b', 'folder_c'])
+        expected = (['run_date', 'Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Dates', 'Audit_Inventory',
+                     'Audit_Required'],
+                    [('2024-01-05', 'share_b', 'folder_c', 'Bill', '2020-01-01 00:00:00', 'Expired', 'Correct',
+                      'Correct'),
+                     ('2024-04-05', 'share_b', 'folder_c', 'Bill', '2020-01-01 00:00:00', 'Expired', 'Correct',
+                      'Correct'),
+                     ('2024-07-05', 'share_b', 'folder_c', None, '2020-01-01 00:00:00', 'Expired', 'Correct',
+                      'Correct')])
+        self.assertEqual(result, expected, "Problem with test for folder")
+
+    def test_mismatches(self):
+        """Test for mismatches in the latest run, counting from the first run in a row with that result"""
+        result = query_history(self.history, 'mismatches')
+        expected = (['Share', 'Folder', 'Audit_Inventory', 'since', 'runs'],
+                    [('share_a', 'folder_b', 'Not in share', '2024-04-05', 2),
+                     ('share_a', 'folder_a', 'Not in share', '2024-07-05', 1),
+                     ('share_b', 'folder_d', 'Not in inventory', '2024-07-05', 1)])
+        self.assertEqual(result, expected, "Problem with test for mismatches")
+
+    def test_mismatches_index(self):
+        """Test for mismatches with a history saved without the index on Share, Folder, Audit_Inventory, and run_id,
+        which is added, and the query only searching that index instead of reading every result"""
+        with closing(sqlite3.connect(self.history)) as connection:
+            connection.execute('DROP INDEX results_Share_Folder_Audit_Inventory_run_id')
+        query_history(self.history, 'mismatches')
+        with closing(sqlite3.connect(self.history)) as connection:
+            plan = [row[3] for row in connection.execute('EXPLAIN QUERY PLAN ' + HISTORY_QUERIES['mismatches'][0])]
+        result = [any('COVERING INDEX results_Share_Folder_Audit_Inventory_run_id' in step for step in plan),
+                  [step for step in plan if step.startswith('SCAN')]]
+        expected = [True, []]
+        self.assertEqual(result, expected, "Problem with test for mismatches index")
+
+    def test_same_date(self):
+        """Test for running the audit again on the same date, which replaces the earlier run for that date"""
+        save_history(self.history, make_run([['share_a', 'folder_a', 'Ann', 'Correct', 'Correct'],
+                                             ['share_b', 'folder_c', 'Bill', 'Expired', 'Correct']]), '2024-07-05')
+        result = query_history(self.history, 'folder', ['share_b', 'folder_c'])[1]
+        expected = [('2024-01-05', 'share_b', 'folder_c', 'Bill', '2020-01-01 00:00:00', 'Expired', 'Correct',
+                     'Correct'),
+                    ('2024-04-05', 'share_b', 'folder_c', 'Bill', '2020-01-01 00:00:00', 'Expired', 'Correct',
+                     'Correct'),
+                    ('2024-07-05', 'share_b', 'folder_c', 'Bill', '2020-01-01 00:00:00', 'Expired', 'Correct',
+                     'Correct')]
+        self.assertEqual(result, expected, "Problem with test for same date")
+        result = query_history(self.history, 'mismatches')[1]
+        self.assertEqual(result, [], "Problem with test for same date, mismatches")
+
+
+if __name__ == '__main__':
+    unittest.main()
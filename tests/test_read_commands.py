@@ -0,0 +1,22 @@
+"""
+Tests for the function read_commands(), which reads the commands for watch mode.
+In production, the lines are from sys.stdin
+"""
+import queue
+import unittest
+from hub_audit import read_commands
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_commands(self):
+        """Test for audit (any line, including an empty one), stop (q or quit), and end (no more lines)"""
+        command_queue = queue.Queue()
+        read_commands(['\n', 'again\n', 'Q\n', 'quit\n'], command_queue)
+        result = [command_queue.get_nowait() for _ in range(command_queue.qsize())]
+        expected = ['audit', 'audit', 'stop', 'stop', 'end']
+        self.assertEqual(result, expected, "Problem with test for commands")
+
+
+if __name__ == '__main__':
+    unittest.main()
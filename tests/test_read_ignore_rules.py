@@ -0,0 +1,67 @@
+"""
+Tests for the function read_ignore_rules(), which reads the ignore rules CSV.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from hub_audit import read_ignore_rules
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Folder for the rules CSVs made by each test"""
+        self.folder = tempfile.mkdtemp()
+        self.rules = os.path.join(self.folder, 'rules.csv')
+
+    def tearDown(self):
+        """Deletes the rules CSVs"""
+        shutil.rmtree(self.folder)
+
+    def make_csv(self, rows):
+        """Saves the rules CSV from a list of rows"""
+        with open(self.rules, 'w', newline='') as rules_file:
+            rules_file.write('\n'.join(rows) + '\n')
+
+    def test_bom(self):
+        """Test for a rules CSV saved by Excel with a byte order mark, and regular expressions with flags"""
+        with open(self.rules, 'w', newline='', encoding='utf-8-sig') as rules_file:
+            rules_file.write('share,action,items,pattern\n,ignore,file,re:(?i)thumbs\n,ignore,,re:(\\w)\\1\n')
+        result = read_ignore_rules(self.rules)
+        expected = ([('', 'ignore', 'file', 're:(?i)thumbs'), ('', 'ignore', '', 're:(\\w)\\1')], [])
+        self.assertEqual(result, expected, "Problem with test for bom")
+
+    def test_correct(self):
+        """Test for a rules CSV with no errors"""
+        self.make_csv(['share,action,items,pattern', ',ignore,file,*.tmp', 'b,include,,re:^Hub Doc',
+                       'c, ignore ,folder,Old*'])
+        result = read_ignore_rules(self.rules)
+        expected = ([('', 'ignore', 'file', '*.tmp'), ('b', 'include', '', 're:^Hub Doc'),
+                     ('c', 'ignore', 'folder', 'Old*')], [])
+        self.assertEqual(result, expected, "Problem with test for correct")
+
+    def test_errors(self):
+        """Test for rules with an unexpected action, unexpected items, no pattern, and a regular expression that
+        is not valid (errors), which are not included in the rules"""
+        self.make_csv(['share,action,items,pattern', ',skip,file,*.tmp', ',ignore,files,*.tmp', ',ignore,,',
+                       ',ignore,,re:(', ',ignore,,*.bak'])
+        rules, errors = read_ignore_rules(self.rules)
+        result = (rules, [error.split(':')[0] for error in errors])
+        expected = ([('', 'ignore', '', '*.bak')],
+                    ['Rule on line 2 has action "skip", which should be ignore or include',
+                     'Rule on line 3 has items "files", which should be file, folder, or blank',
+                     'Rule on line 4 has no pattern',
+                     'Rule on line 5 has a regular expression that is not valid'])
+        self.assertEqual(result, expected, "Problem with test for errors")
+
+    def test_missing_column(self):
+        """Test for a rules CSV without a required column (error)"""
+        self.make_csv(['share,pattern', ',*.tmp'])
+        result = read_ignore_rules(self.rules)
+        expected = ([], [f'Provided rules "{self.rules}" is missing the column(s) action, items'])
+        self.assertEqual(result, expected, "Problem with test for missing column")
+
+
+if __name__ == '__main__':
+    unittest.main()
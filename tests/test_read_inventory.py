@@ -2,7 +2,11 @@
 Tests for the function read_inventory(), which reads data from Excel to a dataframe and cleans it up.
 """
 from datetime import datetime
+import hub_audit
 import os
+import pandas as pd
+import shutil
+import tempfile
 import unittest
 from hub_audit import read_inventory
 
@@ -24,6 +28,46 @@ class MyTestCase(unittest.TestCase):
                     ['mezzanine_1', 'mezzanine_1', 'Access/Mezzanine', 'Callie', 'permanent', '', 'TBD', 'TBD', 'TBD']]
         self.assertEqual(result, expected, "Problem with test for blank rows")
 
+    def test_dtypes(self):
+        """Test for the column types, which are categorical for Share and the Audit columns"""
+        inventory_path = os.path.join('inventories', 'Digital Production Hub Inventory_Blank Rows.xlsx')
+        inventory_df = read_inventory(inventory_path)
+
+        result = [name for name in inventory_df.columns if isinstance(inventory_df[name].dtype, pd.CategoricalDtype)]
+        expected = ['Share', 'Audit_Dates', 'Audit_Inventory', 'Audit_Required']
+        self.assertEqual(result, expected, "Problem with test for dtypes")
+
+    @unittest.skipIf(hub_audit.pa is None, 'pyarrow is not installed')
+    def test_cache(self):
+        """Test for reading an inventory with the inventory cache, before and after the inventory changes"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            inventory_path = os.path.join(temp_dir, 'Digital Production Hub Inventory.xlsx')
+            cache_dir = os.path.join(temp_dir, 'cache')
+            shutil.copyfile(os.path.join('inventories', 'Digital Production Hub Inventory_Usual.xlsx'), inventory_path)
+            expected = read_inventory(inventory_path).fillna('').values.tolist()
+
+            # The first read saves the cache and the second read uses it.
+            first = read_inventory(inventory_path, cache_dir=cache_dir).fillna('').values.tolist()
+            cache_files = os.listdir(cache_dir)
+            second = read_inventory(inventory_path, cache_dir=cache_dir).fillna('').values.tolist()
+            self.assertEqual(first, expected, "Problem with test for cache, first read")
+            self.assertEqual(second, expected, "Problem with test for cache, second read")
+            self.assertEqual(len(cache_files), 1, "Problem with test for cache, first read file")
+
+            # Same contents with a new modification time (downloaded again) uses the same cache file, renamed.
+            os.utime(inventory_path, (0, 0))
+            read_inventory(inventory_path, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1, "Problem with test for cache, same contents")
+            self.assertNotEqual(os.listdir(cache_dir), cache_files, "Problem with test for cache, renamed")
+
+            # New contents makes a new cache file with the new data.
+            shutil.copyfile(os.path.join('inventories', 'Digital Production Hub Inventory_Deletions.xlsx'),
+                            inventory_path)
+            expected = read_inventory(inventory_path).fillna('').values.tolist()
+            result = read_inventory(inventory_path, cache_dir=cache_dir).fillna('').values.tolist()
+            self.assertEqual(result, expected, "Problem with test for cache, new contents")
+            self.assertEqual(len(os.listdir(cache_dir)), 2, "Problem with test for cache, new contents file")
+
     def test_deletions(self):
         """Test for an inventory with rows for content that has been deleted
         Includes a share with none deleted (DLG_TWO), some deleted (Dig Stew), and all deleted (SCL_Imaging_Lab)"""
@@ -0,0 +1,72 @@
+"""
+Tests for the function read_manifest(), which reads share contents from a manifest made by hub_scanner.py,
+used by make_shares_inventory() instead of reading the shares.
+"""
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+from hub_audit import make_shares_inventory, read_manifest
+from hub_scanner import write_manifest
+from test_make_shares_inventory import df_to_list
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Share information for each pattern and a temporary folder for the manifest, deleted after each test"""
+        self.shares_info_df = pd.DataFrame([['a', os.path.join('make_inv', 'share', 'a'), 'share', np.nan],
+                                            ['c', os.path.join('make_inv', 'second', 'c'), 'second', 'born-digital'],
+                                            ['d', os.path.join('make_inv', 'top', 'd'), 'top', np.nan],
+                                            ['e', os.path.join('make_inv', 'second', 'e'), 'second',
+                                             'folder_2|folder_e']],
+                                           columns=['name', 'path', 'pattern', 'folders'])
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.share_info = os.path.join(self.temp_dir.name, 'shares.csv')
+        self.shares_info_df.to_csv(self.share_info, index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_formats(self):
+        """Test for each manifest format, which should give the same result as reading the shares"""
+        expected = df_to_list(make_shares_inventory(self.shares_info_df))
+        for name in ('manifest.tsv', 'manifest.tsv.gz', 'manifest.jsonl', 'manifest.jsonl.gz'):
+            manifest = os.path.join(self.temp_dir.name, name)
+            write_manifest(self.share_info, manifest)
+            incomplete = []
+            result = df_to_list(make_shares_inventory(self.shares_info_df, manifest=manifest, incomplete=incomplete))
+            self.assertEqual(result, expected, f"Problem with test for formats, {name}")
+            self.assertEqual(incomplete, [], f"Problem with test for formats, {name} incomplete")
+
+    def test_directories(self):
+        """Test for reading only some directories, including one that is empty and one that is not in the manifest"""
+        manifest = os.path.join(self.temp_dir.name, 'manifest.tsv')
+        with open(manifest, 'w', encoding='utf-8') as manifest_file:
+            manifest_file.write('d\td\t\nd\td\tempty\nd\tf\tfile.txt\nd\td\tfull\nd\td\tfull/inside\n')
+        shares = list(self.shares_info_df.itertuples())
+        share_d = os.path.join('make_inv', 'top', 'd')
+        directories = {share_d: 'd', os.path.join(share_d, 'empty'): 'd', os.path.join(share_d, 'gone'): 'd'}
+
+        result = read_manifest(manifest, shares, directories)
+        expected = {share_d: [('empty', True), ('file.txt', False), ('full', True)],
+                    os.path.join(share_d, 'empty'): []}
+        self.assertEqual(result, expected, "Problem with test for directories")
+
+    def test_missing_share(self):
+        """Test for a share that is not in the manifest, which is incomplete"""
+        manifest = os.path.join(self.temp_dir.name, 'manifest.tsv')
+        write_manifest(self.share_info, manifest)
+        shares_info_df = pd.concat([self.shares_info_df,
+                                    pd.DataFrame([['f', os.path.join('make_inv', 'top', 'f'), 'top', np.nan]],
+                                                 columns=self.shares_info_df.columns)], ignore_index=True)
+        incomplete = []
+        shares_df = make_shares_inventory(shares_info_df, manifest=manifest, incomplete=incomplete)
+
+        self.assertEqual(incomplete, ['f'], "Problem with test for missing share, incomplete")
+        self.assertNotIn('f', shares_df['Share'].tolist(), "Problem with test for missing share, dataframe")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for the function read_shard_listings(), which combines the shard listings saved by each shard.
+The listings are made with make_shares_inventory() and save_shard_listing(), the same as the shard option.
+"""
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+from hub_audit import make_shares_inventory, read_shard_listings, save_shard_listing
+from test_check_inventory import df_to_list
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Share information and a folder for the shard listings"""
+        self.shares_info_df = pd.DataFrame([['a', os.path.join('make_inv', 'top', 'a'), 'top', np.nan],
+                                            ['b', os.path.join('make_inv', 'share', 'b'), 'share', np.nan],
+                                            ['c', os.path.join('make_inv', 'second', 'c'), 'second', 'born-digital'],
+                                            ['d', os.path.join('make_inv', 'top', 'd'), 'top', np.nan]],
+                                           columns=['name', 'path', 'pattern', 'folders'])
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Deletes the shard listings"""
+        shutil.rmtree(self.folder)
+
+    def save_shards(self, shares_info_df, shards, incomplete=()):
+        """Saves a shard listing for every shard"""
+        for number in range(1, shards + 1):
+            shares_df = make_shares_inventory(shares_info_df, shard=(number, shards))
+            save_shard_listing(os.path.join(self.folder, f'hub_audit_shard_{number}_of_{shards}.json.gz'),
+                               shares_df, shares_info_df, (number, shards),
+                               [name for name in incomplete if name in shares_df['Share'].cat.categories])
+
+    def test_combined(self):
+        """Test for combining every shard, which is the same as reading every share at once"""
+        self.save_shards(self.shares_info_df, 3, incomplete=['c'])
+        shares_df, incomplete, errors = read_shard_listings(self.folder, self.shares_info_df)
+
+        result = [df_to_list(shares_df), incomplete, errors]
+        expected = [df_to_list(make_shares_inventory(self.shares_info_df)), ['c'], []]
+        self.assertEqual(result, expected, "Problem with test for combined")
+
+    def test_different_paths(self):
+        """Test for share information where only the paths are different, which is combined"""
+        self.save_shards(self.shares_info_df, 2)
+        moved_df = self.shares_info_df.assign(path=self.shares_info_df['path'].map(os.path.abspath))
+        errors = read_shard_listings(self.folder, moved_df)[2]
+        self.assertEqual(errors, [], "Problem with test for different paths")
+
+    def test_different_share_information(self):
+        """Test for listings made with different share information (error)"""
+        self.save_shards(self.shares_info_df, 2)
+        changed_df = self.shares_info_df.copy()
+        changed_df.loc[0, 'pattern'] = 'share'
+        result = read_shard_listings(self.folder, changed_df)
+
+        expected = (None, [],
+                    ['Shard listing hub_audit_shard_1_of_2.json.gz was made with different share information',
+                     'Shard listing hub_audit_shard_2_of_2.json.gz was made with different share information'])
+        self.assertEqual(result, expected, "Problem with test for different share information")
+
+    def test_missing_shard(self):
+        """Test for a shard listing that did not arrive (error)"""
+        self.save_shards(self.shares_info_df, 3)
+        os.remove(os.path.join(self.folder, 'hub_audit_shard_2_of_3.json.gz'))
+        result = read_shard_listings(self.folder, self.shares_info_df)
+
+        expected = (None, [], ['Missing shard listing for shard 2 of 3'])
+        self.assertEqual(result, expected, "Problem with test for missing shard")
+
+    def test_no_listings(self):
+        """Test for a folder without shard listings (error)"""
+        result = read_shard_listings(self.folder, self.shares_info_df)
+        expected = (None, [], [f'No shard listings in "{self.folder}"'])
+        self.assertEqual(result, expected, "Problem with test for no listings")
+
+
+if __name__ == '__main__':
+    unittest.main()
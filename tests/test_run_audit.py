@@ -0,0 +1,217 @@
+"""
+Tests for the function run_audit(), which runs the whole audit in Python.
+The inventory and shares are read once and reused by each test where possible, the same as in a notebook.
+"""
+import asyncio
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from hub_audit import make_shares_inventory, read_inventory, run_audit
+from test_check_inventory import df_to_list
+
+
+class MyTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Reads the inventory and share information once for every test"""
+        cls.inventory_path = os.path.join('inventories', 'Digital Production Hub Inventory.xlsx')
+        cls.inventory_df = read_inventory(cls.inventory_path)
+        shares = [['A', 'top', np.nan], ['B', 'share', np.nan], ['C', 'top', np.nan], ['Extra', 'top', np.nan],
+                  ['mezz_one', 'share', np.nan], ['Second_Level', 'second', 'S_2|S_3'], ['Top', 'top', np.nan]]
+        cls.shares_info_df = pd.DataFrame([[name, os.path.join('shares', name), pattern, folders]
+                                           for name, pattern, folders in shares],
+                                          columns=['name', 'path', 'pattern', 'folders'])
+
+    def test_cache(self):
+        """Test for a scan cache dictionary kept between runs, where the second run does not read any directories"""
+        scan_cache = {}
+        run_audit(self.inventory_df, self.shares_info_df, cache=scan_cache)
+        profile = {'stages': {}, 'shares': {}}
+        run_audit(self.inventory_df, self.shares_info_df, cache=scan_cache, profile=profile, trust_cache=True)
+
+        result = sum(share_stats['directory_reads'] for share_stats in profile['shares'].values())
+        self.assertEqual(result, 0, "Problem with test for cache")
+
+    def test_history(self):
+        """Test for adding the results to the audit history, where a second run on the same day replaces the first"""
+        folder = tempfile.mkdtemp()
+        try:
+            history_path = os.path.join(folder, 'history.db')
+            run_audit(self.inventory_df, self.shares_info_df, history=history_path)
+            run_audit(self.inventory_df, self.shares_info_df, history=history_path)
+            with sqlite3.connect(history_path) as connection:
+                runs = connection.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+                rows = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            connection.close()
+        finally:
+            shutil.rmtree(folder)
+
+        result = [runs, rows]
+        expected = [1, 21]
+        self.assertEqual(result, expected, "Problem with test for history")
+
+    def test_listing(self):
+        """Test for the contents of the shares already read, which is the same as reading the shares"""
+        shares_df = make_shares_inventory(self.shares_info_df)
+        listing_result = run_audit(self.inventory_df, shares_df)
+        shares_result = run_audit(self.inventory_df, self.shares_info_df)
+
+        self.assertEqual(df_to_list(listing_result.inventory), df_to_list(shares_result.inventory),
+                         "Problem with test for listing")
+
+    def test_metrics_listing(self):
+        """Test for metrics with the contents of the shares instead of the share information (error)"""
+        shares_df = make_shares_inventory(self.shares_info_df)
+        result = run_audit(self.inventory_df, shares_df, options={'metrics': True})
+        self.assertEqual(result.errors, ['Cannot add metrics without the share information'],
+                         "Problem with test for metrics listing")
+
+    def test_no_cache(self):
+        """Test for no scan cache, where directories are read without a stat first"""
+        profile = {'stages': {}, 'shares': {}}
+        result = run_audit(self.inventory_df, self.shares_info_df, profile=profile)
+        stat_calls = sum(share_stats['stat_calls'] for share_stats in profile['shares'].values())
+        self.assertEqual([result.cache, stat_calls], [None, 0], "Problem with test for no cache")
+
+    def test_outputs(self):
+        """Test for saving the results, with paths to the inventory and the share information"""
+        folder = tempfile.mkdtemp()
+        try:
+            shares_info_path = os.path.join(folder, 'shares.csv')
+            self.shares_info_df.to_csv(shares_info_path, index=False)
+            result = run_audit(self.inventory_path, shares_info_path, outputs=os.path.join(folder, 'audit'),
+                               options={'format': 'csv,xlsx'})
+            paths = [os.path.exists(path) for path in result.paths]
+            csv_rows = len(pd.read_csv(result.paths[0]).index)
+        finally:
+            shutil.rmtree(folder)
+
+        result = [result.inventory_rows, len(result.inventory.index), paths, csv_rows, result.errors]
+        expected = [19, 21, [True, True], 21, []]
+        self.assertEqual(result, expected, "Problem with test for outputs")
+
+    def test_preloaded(self):
+        """Test for the inventory already read, which is not changed by the audit"""
+        before = df_to_list(self.inventory_df)
+        result = run_audit(self.inventory_df, self.shares_info_df)
+
+        self.assertEqual(df_to_list(self.inventory_df), before, "Problem with test for preloaded, changed")
+        result = [result.inventory_rows, result.inventory['Audit_Inventory'].value_counts().to_dict()]
+        expected = [19, {'Correct': 16, 'Not in share': 3, 'Not in inventory': 2, 'TBD': 0, 'Scan incomplete': 0}]
+        self.assertEqual(result, expected, "Problem with test for preloaded")
+
+    def test_previous(self):
+        """Test for comparing to the previous audit CSV, where nothing changed, and saving the changes"""
+        folder = tempfile.mkdtemp()
+        try:
+            first = run_audit(self.inventory_df, self.shares_info_df, outputs=os.path.join(folder, 'first'))
+            second = run_audit(self.inventory_df, self.shares_info_df, outputs=os.path.join(folder, 'second'),
+                               options={'previous': first.paths[0]})
+            changes_saved = os.path.exists(os.path.join(folder, 'second_changes.csv'))
+        finally:
+            shutil.rmtree(folder)
+
+        result = [len(second.changes.index), changes_saved]
+        expected = [0, True]
+        self.assertEqual(result, expected, "Problem with test for previous")
+
+    def test_report(self):
+        """Test for the contents of the audit report saved as a CSV, the same as the script makes"""
+        folder = tempfile.mkdtemp()
+        try:
+            result = run_audit(self.inventory_df, self.shares_info_df, outputs=os.path.join(folder, 'audit'))
+            df = pd.read_csv(result.paths[0])
+        finally:
+            shutil.rmtree(folder)
+
+        df = df.fillna('nan')
+        result = [df.columns.tolist()] + df.values.tolist()
+        # T_Hub is an empty folder in the inventory, which git does not keep, so it is Not in share.
+        expected = [['Share', 'Folder', 'Use', 'Responsible', 'Review_Date', 'Notes', 'Audit_Dates',
+                     'Audit_Inventory', 'Audit_Required', 'Suggested_Match'],
+                    ['A', 'Test Worksheet.xlsx', 'Working Files', 'Alex', '2024-01-01 00:00:00', 'nan',
+                     'Expired', 'Correct', 'Correct', 'nan'],
+                    ['B', 'B', 'nan', 'nan', 'nan', 'nan', 'Review', 'Correct', 'Missing', 'nan'],
+                    ['C', 'C1', 'Backlog', 'Chris', '2124-03-18 00:00:00', 'nan', 'Correct', 'Correct', 'Correct',
+                     'nan'],
+                    ['C', 'C2', 'Backlog', 'Chris', '2124-03-18 00:00:00', 'nan', 'Correct', 'Correct', 'Correct',
+                     'nan'],
+                    ['C', 'C3', 'Backlog', 'Chris', '2124-03-18 00:00:00', 'nan', 'Correct', 'Not in share',
+                     'Correct', 'nan'],
+                    ['C', 'C4', 'Backlog', 'Chris', '2124-03-18 00:00:00', 'nan', 'Correct', 'Not in share',
+                     'Correct', 'nan'],
+                    ['C', 'Document.txt', 'Working Files', 'Camila', 'permanent', 'Documentation', 'Correct',
+                     'Correct', 'Correct', 'nan'],
+                    ['Extra', 'E_1', 'Backlog', 'Erik', '2125-01-31 00:00:00', 'nan', 'Correct', 'Correct',
+                     'Correct', 'nan'],
+                    ['Extra', 'E_2', 'Working Files', 'Erin', '2125-01-31 00:00:00', 'nan', 'Correct', 'Correct',
+                     'Correct', 'nan'],
+                    ['Extra', 'E_3', 'nan', 'nan', 'nan', 'nan', 'nan', 'Not in inventory', 'nan', 'nan'],
+                    ['Extra', 'Text.txt', 'nan', 'nan', 'nan', 'nan', 'nan', 'Not in inventory', 'nan', 'nan'],
+                    ['Second_Level', 'S_1', 'Backlog', 'Sam', '2125-04-01 00:00:00', 'nan', 'Correct', 'Correct',
+                     'Correct', 'nan'],
+                    ['Second_Level', 'S_2\\S_2a', 'Backlog', 'Sam', '2125-04-01 00:00:00', 'nan', 'Correct',
+                     'Correct', 'Correct', 'nan'],
+                    ['Second_Level', 'S_2\\S_2b', 'Backlog', 'Sam', '2125-04-01 00:00:00', 'nan', 'Correct',
+                     'Correct', 'Correct', 'nan'],
+                    ['Second_Level', 'S_3\\S_3a', 'Backlog', 'Sam', '2125-04-01 00:00:00', 'nan', 'Correct',
+                     'Correct', 'Correct', 'nan'],
+                    ['Second_Level', 'S_3\\S_3b', 'Backlog', 'Sam', '2125-04-01 00:00:00', 'nan', 'Correct',
+                     'Correct', 'Correct', 'nan'],
+                    ['Top', 'Include.txt', 'Transfer', 'Tina', '1 week', 'nan', 'Review', 'Correct', 'Correct', 'nan'],
+                    ['Top', 'T_1', 'Transfer', 'Tim', '2 months', 'nan', 'Review', 'Correct', 'Correct', 'nan'],
+                    ['Top', 'T_2', 'Transfer', 'Tina', '1 week', 'nan', 'Review', 'Correct', 'Correct', 'nan'],
+                    ['Top', 'T_Hub', 'Transfer', 'Tina', '1 week', 'nan', 'Review', 'Not in share', 'Correct',
+                     'nan'],
+                    ['mezz_one', 'mezz_one', 'Access/Mezzanine', 'Mike', 'Permanent', 'nan', 'Correct',
+                     'Correct', 'Correct', 'nan']]
+        self.assertEqual(result, expected, "Problem with test for report")
+
+    def test_rules_error(self):
+        """Test for a rules CSV with a regular expression that is not valid (error), where the shares are not read"""
+        folder = tempfile.mkdtemp()
+        try:
+            rules_path = os.path.join(folder, 'rules.csv')
+            with open(rules_path, 'w') as rules_file:
+                rules_file.write('share,action,items,pattern\n,ignore,,re:(\n')
+            result = run_audit(self.inventory_df, self.shares_info_df, options={'rules': rules_path})
+        finally:
+            shutil.rmtree(folder)
+
+        result = [[error.split(':')[0] for error in result.errors], result.shares]
+        expected = [['Rule on line 2 has a regular expression that is not valid'], None]
+        self.assertEqual(result, expected, "Problem with test for rules error")
+
+    def test_split(self):
+        """Test for saving the rows that need action for each person responsible, with the results"""
+        folder = tempfile.mkdtemp()
+        try:
+            result = run_audit(self.inventory_df, self.shares_info_df, outputs=os.path.join(folder, 'audit'),
+                               options={'split': 'responsible'})
+            paths = [os.path.relpath(path, folder) for path in result.paths]
+        finally:
+            shutil.rmtree(folder)
+
+        expected = ['audit.csv', os.path.join('audit_split', 'index.csv')]
+        expected.extend(os.path.join('audit_split', 'responsible', f'{name}.csv')
+                        for name in ('(blank)', 'Alex', 'Chris', 'Tim', 'Tina'))
+        self.assertEqual(paths, expected, "Problem with test for split")
+
+    def test_timeout_loop(self):
+        """Test for a timeout when an event loop is already running, like in a notebook"""
+        async def run_in_loop():
+            return run_audit(self.inventory_df, self.shares_info_df, options={'timeout': 30})
+
+        result = asyncio.run(run_in_loop())
+        result = [result.incomplete, result.inventory['Audit_Inventory'].value_counts()['Correct']]
+        expected = [[], 16]
+        self.assertEqual(result, expected, "Problem with test for timeout loop")
+
+
+if __name__ == '__main__':
+    unittest.main()
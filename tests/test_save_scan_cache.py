@@ -0,0 +1,52 @@
+"""
+Tests for the functions save_scan_cache() and read_scan_cache(),
+which save the directory contents from make_shares_inventory() to a SQLite database and read them in the next run.
+"""
+import os
+import tempfile
+import unittest
+from hub_audit import read_scan_cache, save_scan_cache
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Temporary folder for the scan cache database, which is deleted after each test"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'hub_audit_scan_cache.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_evict(self):
+        """Test for when there are more directories than the maximum, so the least recently used are removed"""
+        cache = {'share\\a': [1, 10, 100.0, [('a1', True)]],
+                 'share\\b': [2, 20, 300.0, [('b1', True)]],
+                 'share\\c': [3, 30, 200.0, [('c1', False)]]}
+        save_scan_cache(self.cache_path, cache, 2, 0)
+
+        result = read_scan_cache(self.cache_path)
+        expected = {'share\\b': [2, 20, 300.0, [('b1', True)]],
+                    'share\\c': [3, 30, 200.0, [('c1', False)]]}
+        self.assertEqual(result, expected, 'Problem with test for evict')
+
+    def test_new(self):
+        """Test for reading a scan cache that does not exist yet"""
+        result = read_scan_cache(self.cache_path)
+        self.assertEqual(result, {}, 'Problem with test for new')
+
+    def test_since(self):
+        """Test for only saving directories used since the run started, and keeping the ones saved before"""
+        save_scan_cache(self.cache_path, {'share\\a': [1, 10, 100.0, [('a1', True)]]}, 10, 0)
+        cache = {'share\\b': [2, 20, 50.0, [('b1', True)]],
+                 'share\\c': [3, 30, 200.0, [('c1', True), ('c2.txt', False)]]}
+        save_scan_cache(self.cache_path, cache, 10, 150.0)
+
+        result = read_scan_cache(self.cache_path)
+        expected = {'share\\a': [1, 10, 100.0, [('a1', True)]],
+                    'share\\c': [3, 30, 200.0, [('c1', True), ('c2.txt', False)]]}
+        self.assertEqual(result, expected, 'Problem with test for since')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+Tests for the function scan_share() in hub_scanner.py, which adds the contents of one share to a manifest.
+"""
+import io
+import os
+import unittest
+from hub_scanner import scan_share
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_born_digital(self):
+        """Test for a born-digital folder in the folders list, where backlogged and closed are also read"""
+        manifest_file = io.StringIO()
+        scan_share(manifest_file, 'c', os.path.join('make_inv', 'second', 'c'), 3, False, ['born-digital'])
+        result = sorted(manifest_file.getvalue().splitlines())
+        expected = ['c\td\t', 'c\td\tborn-digital', 'c\td\tborn-digital/backlogged',
+                    'c\td\tborn-digital/backlogged/folder_c1', 'c\td\tborn-digital/backlogged/folder_c2',
+                    'c\tf\tborn-digital/backlogged/Skip.txt']
+        self.assertEqual(result, expected, "Problem with test for born digital")
+
+
+    def test_depth(self):
+        """Test for a share with the top pattern, where only the top level is included"""
+        manifest_file = io.StringIO()
+        count = scan_share(manifest_file, 'd', os.path.join('make_inv', 'top', 'd'), 1, False)
+        result = (count, sorted(manifest_file.getvalue().splitlines()))
+        expected = (3, ['d\td\t', 'd\td\tfolder_d', 'd\tf\tFile.txt'])
+        self.assertEqual(result, expected, "Problem with test for depth")
+
+    def test_folders(self):
+        """Test for a share with the second pattern, where only folders in the folders list are read"""
+        manifest_file = io.StringIO()
+        scan_share(manifest_file, 'e', os.path.join('make_inv', 'second', 'e'), 3, False, ['folder_2'])
+        result = sorted(manifest_file.getvalue().splitlines())
+        expected = ['e\td\t', 'e\td\tfolder_2', 'e\td\tfolder_2/folder_e1', 'e\td\tfolder_2/folder_e2',
+                    'e\td\tfolder_3', 'e\td\tfolder_e']
+        self.assertEqual(result, expected, "Problem with test for folders")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for the class ShareWatcher, which keeps the scan cache current in watch mode.
+A copy of a share is made in a temporary folder for each test, so folders can be added to it.
+"""
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import sys
+import tempfile
+import unittest
+from hub_audit import make_shares_inventory, ShareWatcher
+from test_check_inventory import df_to_list
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Copies share d (top pattern) and share c (second pattern) and reads them into a scan cache"""
+        self.folder = tempfile.mkdtemp()
+        shutil.copytree(os.path.join('make_inv', 'top', 'd'), os.path.join(self.folder, 'd'))
+        shutil.copytree(os.path.join('make_inv', 'second', 'c'), os.path.join(self.folder, 'c'))
+        self.shares_info_df = pd.DataFrame([['c', os.path.join(self.folder, 'c'), 'second', 'born-digital'],
+                                            ['d', os.path.join(self.folder, 'd'), 'top', np.nan]],
+                                           columns=['name', 'path', 'pattern', 'folders'])
+        self.cache = {}
+        make_shares_inventory(self.shares_info_df, cache=self.cache)
+
+    def tearDown(self):
+        """Deletes the copies of the shares"""
+        shutil.rmtree(self.folder)
+
+    def check_watcher(self, watcher, test_name):
+        """Adds a collection to share c, then tests that only its directory changed and the audit finds it"""
+        backlogged = os.path.join(self.folder, 'c', 'born-digital', 'backlogged')
+        os.mkdir(os.path.join(backlogged, 'folder_c3'))
+        try:
+            result = watcher.update()
+        finally:
+            watcher.close()
+        self.assertEqual(result, [backlogged], f"Problem with test for {test_name}, changed")
+
+        shares_df = make_shares_inventory(self.shares_info_df, cache=self.cache, trust_cache=True)
+        expected = [['Share', 'Folder'],
+                    ['c', 'born-digital\\backlogged\\folder_c1'],
+                    ['c', 'born-digital\\backlogged\\folder_c2'],
+                    ['c', 'born-digital\\backlogged\\folder_c3'],
+                    ['d', 'File.txt'],
+                    ['d', 'folder_d']]
+        self.assertEqual(sorted(df_to_list(shares_df)[1:]), expected[1:], f"Problem with test for {test_name}")
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is only on Linux')
+    def test_inotify(self):
+        """Test for finding a change with inotify, without a stat"""
+        watcher = ShareWatcher(self.cache, poll_seconds=3600)
+        self.assertIsNotNone(watcher.inotify, "Problem with test for inotify, not started")
+        self.check_watcher(watcher, 'inotify')
+
+    def test_no_change(self):
+        """Test for no changes, where every directory stays in the cache"""
+        watcher = ShareWatcher(self.cache, poll_seconds=0)
+        try:
+            result = watcher.update()
+        finally:
+            watcher.close()
+        self.assertEqual(result, [], "Problem with test for no change")
+        self.assertEqual(len(self.cache), 4, "Problem with test for no change, cache")
+
+    def test_poll(self):
+        """Test for finding a change with a stat, which is used if inotify is not available"""
+        watcher = ShareWatcher(self.cache, poll_seconds=0, use_inotify=False)
+        self.check_watcher(watcher, 'poll')
+
+
+if __name__ == '__main__':
+    unittest.main()
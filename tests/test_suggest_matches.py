@@ -0,0 +1,78 @@
+"""
+Tests for the function suggest_matches(), which suggests the most likely match for folders
+that are only in the inventory or only in the share.
+
+To simply testing, the inventory df only includes columns needed for the comparison.
+"""
+import pandas as pd
+import unittest
+from hub_audit import suggest_matches
+from test_check_inventory import df_to_list
+
+
+class MyTestCase(unittest.TestCase):
+
+    def test_no_match(self):
+        """Test for unmatched folders that are not similar enough to suggest"""
+        # Makes variables for function input and run the function being tested.
+        inventory_df = pd.DataFrame([['share_a', 'Photographs', 'Not in share'],
+                                     ['share_a', 'Audio', 'Not in inventory']],
+                                    columns=['Share', 'Folder', 'Audit_Inventory'])
+        inventory_df = suggest_matches(inventory_df)
+
+        # Tests if the resulting dataframe has the expected data.
+        result = df_to_list(inventory_df)
+        expected = [['Share', 'Folder', 'Audit_Inventory', 'Suggested_Match'],
+                    ['share_a', 'Photographs', 'Not in share', 'BLANK'],
+                    ['share_a', 'Audio', 'Not in inventory', 'BLANK']]
+        self.assertEqual(result, expected, "Problem with test for no match")
+
+    def test_other_share(self):
+        """Test for similar folders in different shares, which are not suggested"""
+        # Makes variables for function input and run the function being tested.
+        inventory_df = pd.DataFrame([['share_a', 'Oral History', 'Not in share'],
+                                     ['share_b', 'oral_history', 'Not in inventory']],
+                                    columns=['Share', 'Folder', 'Audit_Inventory'])
+        inventory_df = suggest_matches(inventory_df)
+
+        # Tests if the resulting dataframe has the expected data.
+        result = df_to_list(inventory_df)
+        expected = [['Share', 'Folder', 'Audit_Inventory', 'Suggested_Match'],
+                    ['share_a', 'Oral History', 'Not in share', 'BLANK'],
+                    ['share_b', 'oral_history', 'Not in inventory', 'BLANK']]
+        self.assertEqual(result, expected, "Problem with test for other share")
+
+    def test_variations(self):
+        """Test for variations in case, separators, spacing, Unicode form, and typos, with matched rows skipped"""
+        # Makes variables for function input and run the function being tested.
+        inventory_df = pd.DataFrame([['share_a', 'Oral History', 'Not in share'],
+                                     ['share_a', 'born-digital/closed/ms3000', 'Not in share'],
+                                     ['share_a', 'Café Photos', 'Not in share'],
+                                     ['share_a', 'Legislative docs', 'Not in share'],
+                                     ['share_a', 'Matched', 'Correct'],
+                                     ['share_a', 'oral_history', 'Not in inventory'],
+                                     ['share_a', 'born-digital\\closed\\ms3000', 'Not in inventory'],
+                                     ['share_a', 'Cafe\u0301  photos', 'Not in inventory'],
+                                     ['share_a', 'Legislative_docs_2024', 'Not in inventory'],
+                                     ['share_a', 'Unrelated', 'Not in inventory']],
+                                    columns=['Share', 'Folder', 'Audit_Inventory'])
+        inventory_df = suggest_matches(inventory_df)
+
+        # Tests if the resulting dataframe has the expected data.
+        result = df_to_list(inventory_df)
+        expected = [['Share', 'Folder', 'Audit_Inventory', 'Suggested_Match'],
+                    ['share_a', 'Oral History', 'Not in share', 'oral_history'],
+                    ['share_a', 'born-digital/closed/ms3000', 'Not in share', 'born-digital\\closed\\ms3000'],
+                    ['share_a', 'Café Photos', 'Not in share', 'Cafe\u0301  photos'],
+                    ['share_a', 'Legislative docs', 'Not in share', 'Legislative_docs_2024'],
+                    ['share_a', 'Matched', 'Correct', 'BLANK'],
+                    ['share_a', 'oral_history', 'Not in inventory', 'Oral History'],
+                    ['share_a', 'born-digital\\closed\\ms3000', 'Not in inventory', 'born-digital/closed/ms3000'],
+                    ['share_a', 'Cafe\u0301  photos', 'Not in inventory', 'Café Photos'],
+                    ['share_a', 'Legislative_docs_2024', 'Not in inventory', 'Legislative docs'],
+                    ['share_a', 'Unrelated', 'Not in inventory', 'BLANK']]
+        self.assertEqual(result, expected, "Problem with test for variations")
+
+
+if __name__ == '__main__':
+    unittest.main()
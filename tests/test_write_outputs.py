@@ -0,0 +1,127 @@
+"""
+Tests for the function write_outputs(), which saves the audit results in each of the output formats,
+and write_parquet(), which saves the Parquet file one row group at a time.
+To simplify testing, the audit results only include some of the columns.
+"""
+from datetime import datetime
+import numpy as np
+import openpyxl
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+import shutil
+import tempfile
+import unittest
+from hub_audit import write_outputs, write_parquet
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Audit results and a folder to save the outputs"""
+        self.df = pd.DataFrame([['share_a', 'folder_a', 'Ann', datetime(2130, 1, 1), 'Correct'],
+                                ['share_b', 'folder_b', 'Bill', 'permanent', 'Not in share'],
+                                ['share_a', 'folder_c', np.nan, np.nan, 'Scan incomplete']],
+                               columns=['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Inventory'])
+        self.df['Audit_Inventory'] = self.df['Audit_Inventory'].astype('category')
+        self.output_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.output_dir, 'audit')
+
+    def tearDown(self):
+        """Deletes the outputs"""
+        shutil.rmtree(self.output_dir)
+
+    def test_csv(self):
+        """Test for the CSV, which is the same as saving it with pandas in one step"""
+        result = write_outputs(self.df, self.path)
+        self.assertEqual(result, [self.path + '.csv'], 'Problem with test for csv, paths')
+
+        with open(self.path + '.csv') as result_file:
+            result = result_file.read()
+        expected = self.df.to_csv(index=False)
+        self.assertEqual(result, expected, 'Problem with test for csv, contents')
+
+    def test_parquet(self):
+        """Test for the Parquet file, where the column with dates and text is saved as text"""
+        write_outputs(self.df, self.path, 'parquet')
+        result = pd.read_parquet(self.path + '.parquet').astype(object)
+        result = [result.columns.tolist()] + result.where(result.notna(), 'BLANK').values.tolist()
+        expected = [['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Inventory'],
+                    ['share_a', 'folder_a', 'Ann', '2130-01-01 00:00:00', 'Correct'],
+                    ['share_b', 'folder_b', 'Bill', 'permanent', 'Not in share'],
+                    ['share_a', 'folder_c', 'BLANK', 'BLANK', 'Scan incomplete']]
+        self.assertEqual(result, expected, 'Problem with test for parquet')
+
+    def test_parquet_chunks(self):
+        """Test for a Parquet file with more than one row group, where a text column is blank in the first row group"""
+        df = pd.DataFrame({'Share': pd.Categorical(['a', 'a', 'b', 'b', 'c']),
+                           'Folder': ['f1', 'f2', 'f3', 'f4', 'f5'],
+                           'Suggested_Match': pd.Series([np.nan, np.nan, np.nan, 'x', 'y'], dtype=object)})
+        write_parquet(df, self.path + '.parquet', chunk_rows=2)
+        result = pd.read_parquet(self.path + '.parquet').astype(object)
+        result = result.where(result.notna(), 'BLANK').values.tolist()
+        expected = [['a', 'f1', 'BLANK'], ['a', 'f2', 'BLANK'], ['b', 'f3', 'BLANK'], ['b', 'f4', 'x'],
+                    ['c', 'f5', 'y']]
+        self.assertEqual(result, expected, 'Problem with test for parquet chunks')
+
+    def test_parquet_metrics(self):
+        """Test for a Parquet file with the metrics columns, which keep their types instead of being saved as text"""
+        df = pd.DataFrame({'Folder': ['f1', 'f2', 'f3'],
+                           'File_Count': pd.Series([2, None, 1], dtype='Int64'),
+                           'Modified_After_Review': pd.Series([True, None, False], dtype='boolean')})
+        write_parquet(df, self.path + '.parquet')
+        result = pq.read_schema(self.path + '.parquet')
+        result = [(field.name, str(field.type)) for field in result]
+        expected = [('Folder', 'string'), ('File_Count', 'int64'), ('Modified_After_Review', 'bool')]
+        self.assertEqual(result, expected, 'Problem with test for parquet metrics')
+
+    def test_xlsx_metrics(self):
+        """Test for the spreadsheet with the Modified_After_Review column, which is saved as booleans and blanks"""
+        df = pd.DataFrame({'Share': ['share_a', 'share_a', 'share_a'], 'Folder': ['f1', 'f2', 'f3'],
+                           'Modified_After_Review': pd.Series([True, None, False], dtype='boolean')})
+        write_outputs(df, self.path, 'xlsx')
+        workbook = openpyxl.load_workbook(self.path + '.xlsx')
+        result = [cell.value for cell in workbook['share_a']['C']]
+        expected = ['Modified_After_Review', True, None, False]
+        self.assertEqual(result, expected, 'Problem with test for xlsx metrics')
+
+    def test_xlsx_names(self):
+        """Test for sheet names that are the same once changed, which are numbered from the changed name"""
+        df = pd.DataFrame([['share_a', 'folder_a', name, np.nan, 'Correct'] for name in ('A/B', 'A:B', 'A?B')],
+                          columns=self.df.columns)
+        write_outputs(df, self.path, 'xlsx', 'responsible')
+        workbook = openpyxl.load_workbook(self.path + '.xlsx')
+        result = [sheet.title for sheet in workbook]
+        expected = ['A_B', 'A_B_2', 'A_B_3']
+        self.assertEqual(result, expected, 'Problem with test for xlsx names')
+
+    def test_xlsx_responsible(self):
+        """Test for the spreadsheet with one sheet per person responsible, including a sheet for blanks"""
+        write_outputs(self.df, self.path, 'xlsx', 'responsible')
+        workbook = openpyxl.load_workbook(self.path + '.xlsx')
+        result = [sheet.title for sheet in workbook]
+        expected = ['Ann', 'Bill', '(blank)']
+        self.assertEqual(result, expected, 'Problem with test for xlsx responsible')
+
+    def test_xlsx_share(self):
+        """Test for the spreadsheet with one sheet per share, including the fill for audit cells"""
+        write_outputs(self.df, self.path, 'xlsx')
+        workbook = openpyxl.load_workbook(self.path + '.xlsx')
+
+        # Tests if each sheet has the expected values.
+        result = {sheet.title: [list(row) for row in sheet.values] for sheet in workbook}
+        header = ['Share', 'Folder', 'Responsible', 'Review_Date', 'Audit_Inventory']
+        expected = {'share_a': [header, ['share_a', 'folder_a', 'Ann', datetime(2130, 1, 1), 'Correct'],
+                                ['share_a', 'folder_c', None, None, 'Scan incomplete']],
+                    'share_b': [header, ['share_b', 'folder_b', 'Bill', 'permanent', 'Not in share']]}
+        self.assertEqual(result, expected, 'Problem with test for xlsx share, values')
+
+        # Tests if only the audit cells that are not Correct are filled.
+        result = [workbook['share_a']['E2'].fill.fill_type, workbook['share_a']['E3'].fill.start_color.rgb,
+                  workbook['share_b']['E2'].fill.start_color.rgb]
+        expected = [None, '00FFEB9C', '00FFC7CE']
+        self.assertEqual(result, expected, 'Problem with test for xlsx share, fill')
+
+
+if __name__ == '__main__':
+    unittest.main()
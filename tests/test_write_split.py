@@ -0,0 +1,89 @@
+"""
+Tests for the function write_split(), which saves the rows that need action for each person responsible or share.
+To simplify testing, the audit results only include some of the columns.
+"""
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import unittest
+from hub_audit import write_split
+
+
+class MyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Audit results and a folder to save the split results"""
+        self.df = pd.DataFrame([['share_a', 'folder_a', 'Ann', 'Correct', 'Correct', 'Correct'],
+                                ['share_a', 'folder_b', 'Ann', 'Expired', 'Not in share', 'Correct'],
+                                ['share_b', 'folder_c', 'Bill', 'Correct', 'Correct', 'Correct'],
+                                ['share_b', 'folder_d', np.nan, 'Review', 'Correct', 'Missing'],
+                                ['share_b', 'folder/e', 'A/B', 'Correct', 'Not in inventory', 'Correct']],
+                               columns=['Share', 'Folder', 'Responsible', 'Audit_Dates', 'Audit_Inventory',
+                                        'Audit_Required'])
+        for column in ('Audit_Dates', 'Audit_Inventory', 'Audit_Required'):
+            self.df[column] = self.df[column].astype('category')
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Deletes the split results"""
+        shutil.rmtree(self.folder)
+
+    def read_csv(self, *path):
+        """Reads a saved CSV into a list of rows, with the column names as the first row"""
+        df = pd.read_csv(os.path.join(self.folder, *path), dtype=str).fillna('BLANK')
+        return [df.columns.tolist()] + df.values.tolist()
+
+    def test_index(self):
+        """Test for the index, which has every person responsible and share, including those with no rows"""
+        write_split(self.df, self.folder)
+        result = self.read_csv('index.csv')
+        expected = [['Split', 'Name', 'File', 'Rows', 'Expired', 'Review', 'Not in share', 'Scan incomplete',
+                     'Not in inventory', 'Missing'],
+                    ['responsible', '(blank)', os.path.join('responsible', '(blank).csv'), '1', '0', '1', '0', '0',
+                     '0', '1'],
+                    ['responsible', 'A/B', os.path.join('responsible', 'A_B.csv'), '1', '0', '0', '0', '0', '1', '0'],
+                    ['responsible', 'Ann', os.path.join('responsible', 'Ann.csv'), '1', '1', '0', '1', '0', '0', '0'],
+                    ['responsible', 'Bill', 'BLANK', '0', '0', '0', '0', '0', '0', '0'],
+                    ['share', 'share_a', os.path.join('share', 'share_a.csv'), '1', '1', '0', '1', '0', '0', '0'],
+                    ['share', 'share_b', os.path.join('share', 'share_b.csv'), '2', '0', '1', '0', '0', '1', '1']]
+        self.assertEqual(result, expected, "Problem with test for index")
+
+    def test_names(self):
+        """Test for file names that are the same once changed, or that Windows reserves for devices"""
+        responsible = ['A/B', 'A:B', 'A?B', 'con', 'Nul.txt', 'COM1']
+        df = pd.DataFrame([['share_a', f'folder_{number}', name, 'Expired', 'Correct', 'Correct']
+                           for number, name in enumerate(responsible)], columns=self.df.columns)
+        write_split(df, self.folder, 'responsible')
+        result = [row[1:3] for row in self.read_csv('index.csv')[1:]]
+        expected = [['A/B', os.path.join('responsible', 'A_B.csv')],
+                    ['A:B', os.path.join('responsible', 'A_B_2.csv')],
+                    ['A?B', os.path.join('responsible', 'A_B_3.csv')],
+                    ['COM1', os.path.join('responsible', 'COM1_.csv')],
+                    ['Nul.txt', os.path.join('responsible', 'Nul_.txt.csv')],
+                    ['con', os.path.join('responsible', 'con_.csv')]]
+        self.assertEqual(result, expected, "Problem with test for names")
+
+    def test_rows(self):
+        """Test for the rows in a split CSV, which only has the rows that need action"""
+        paths = write_split(self.df, self.folder, 'share', workers=2)
+        result = [sorted(os.path.relpath(path, self.folder) for path in paths), self.read_csv('share', 'share_b.csv')]
+        expected = [sorted(['index.csv', os.path.join('share', 'share_a.csv'), os.path.join('share', 'share_b.csv')]),
+                    [['Share', 'Folder', 'Responsible', 'Audit_Dates', 'Audit_Inventory', 'Audit_Required'],
+                     ['share_b', 'folder_d', 'BLANK', 'Review', 'Correct', 'Missing'],
+                     ['share_b', 'folder/e', 'A/B', 'Correct', 'Not in inventory', 'Correct']]]
+        self.assertEqual(result, expected, "Problem with test for rows")
+
+    def test_replaced(self):
+        """Test for a file from an earlier run, which is deleted"""
+        os.makedirs(os.path.join(self.folder, 'share'))
+        old_path = os.path.join(self.folder, 'share', 'share_old.csv')
+        with open(old_path, 'w') as old_file:
+            old_file.write('Share\n')
+        write_split(self.df, self.folder, 'share')
+        self.assertFalse(os.path.exists(old_path), "Problem with test for replaced")
+
+
+if __name__ == '__main__':
+    unittest.main()